@@ -0,0 +1,205 @@
+# agents/churn_aggregate.py
+import hashlib
+import json
+from datetime import date, timedelta
+from typing import Dict, Any, Iterable, List, Optional
+
+from agents.commit_columns import CommitColumns, iter_column_chunks
+from agents.diff_analyst import analyze_columns, load_risk_rules, risk_mask, risky_records, summarize_commits
+from utils.repo_store import RepoStore, get_store
+from utils.report_window import is_week_aligned, previous_week_end
+
+
+def _add_counts(target: Dict[str, int], source: Dict[str, int]):
+    for key, value in source.items():
+        target[key] = target.get(key, 0) + value
+
+
+class ChurnAggregate:
+    """
+    Running DiffAnalyst totals: per-author and per-week churn plus an index of
+    risky commits keyed by SHA. update() folds in only new commits and merge()
+    combines aggregates built on separate shards (repos, time ranges, workers).
+
+    Percentile rules depend on each author's whole history, so aggregates only
+    apply the fixed-threshold rules; run analyze_diff over a window for those.
+    """
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        rules = load_risk_rules() if rules is None else rules
+        self.rules = [rule for rule in rules if "author_percentile" not in rule]
+        self.author_churn: Dict[str, int] = {}
+        self.weekly_churn: Dict[str, int] = {}
+        self.author_weekly_churn: Dict[str, Dict[str, int]] = {}
+        self.commit_count = 0
+        self.risky_commits: Dict[str, Dict[str, Any]] = {}
+        self.watermark = 0
+
+    @property
+    def rules_key(self) -> str:
+        return hashlib.sha256(json.dumps(self.rules, sort_keys=True).encode()).hexdigest()[:16]
+
+    def update(self, commits: Iterable[Dict[str, Any]]) -> "ChurnAggregate":
+        """Folds new commits (records or CommitColumns) into the totals in O(len(commits))."""
+        chunks = [commits] if isinstance(commits, CommitColumns) else iter_column_chunks(commits)
+        for columns in chunks:
+            result = analyze_columns(columns, self.rules)
+            _add_counts(self.author_churn, result["author_churn"])
+            _add_counts(self.weekly_churn, result["weekly_churn"])
+            for author, weeks in result["author_weekly_churn"].items():
+                _add_counts(self.author_weekly_churn.setdefault(author, {}), weeks)
+            for record in risky_records(columns, risk_mask(columns, self.rules), with_sha=True):
+                self.risky_commits[record.pop("sha", None) or f"#{len(self.risky_commits)}"] = record
+            self.commit_count += len(columns)
+        return self
+
+    def merge(self, other: "ChurnAggregate") -> "ChurnAggregate":
+        """Returns a new aggregate holding both shards' totals (shards must not overlap)."""
+        if self.rules_key != other.rules_key:
+            raise ValueError("❌ Cannot merge churn aggregates built with different risk rules")
+        merged = ChurnAggregate(self.rules)
+        for part in (self, other):
+            _add_counts(merged.author_churn, part.author_churn)
+            _add_counts(merged.weekly_churn, part.weekly_churn)
+            for author, weeks in part.author_weekly_churn.items():
+                _add_counts(merged.author_weekly_churn.setdefault(author, {}), weeks)
+            merged.risky_commits.update(part.risky_commits)
+            merged.commit_count += part.commit_count
+        return merged
+
+    def report(self, since: Optional[str] = None, until: Optional[str] = None,
+               history_since: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Returns analyze_diff-shaped output. Churn is only kept per week, so
+        since/until must be week-aligned (use window_report for any window).
+        With history_since, the weekly series start there instead, so forecasts
+        get more history than the reported window.
+        """
+        if not is_week_aligned(since, until):
+            raise ValueError(f"❌ Churn aggregates only report whole weeks, got {since} to {until}")
+        until_week = until[:10] if until else None
+
+        def in_window(week: str, start: Optional[str]) -> bool:
+            return (not start or week >= _monday(start[:10])) and (not until_week or week <= until_week)
+
+        def weekly(start: Optional[str]):
+            if not (start or until):
+                return self.author_weekly_churn, self.weekly_churn
+            author_weekly = {
+                author: {week: total for week, total in weeks.items() if in_window(week, start)}
+                for author, weeks in self.author_weekly_churn.items()
+            }
+            author_weekly = {author: weeks for author, weeks in author_weekly.items() if weeks}
+            return author_weekly, {week: total for week, total in self.weekly_churn.items() if in_window(week, start)}
+
+        author_weekly, weekly_churn = weekly(since)
+        if since or until:
+            author_churn = {author: sum(weeks.values()) for author, weeks in author_weekly.items()}
+        else:
+            author_churn = dict(self.author_churn)
+        if history_since:
+            author_weekly, weekly_churn = weekly(history_since)
+
+        risky = [
+            record for record in self.risky_commits.values()
+            if (not since or (record["timestamp"] or "") >= since)
+            and (not until or (record["timestamp"] or "") <= until)
+        ]
+        risky.sort(key=lambda record: record["timestamp"] or "", reverse=True)
+
+        return {
+            "author_churn": author_churn,
+            "risky_commits": risky,
+            "weekly_churn": dict(sorted(weekly_churn.items())),
+            "author_weekly_churn": author_weekly
+        }
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "rules": self.rules,
+            "author_churn": self.author_churn,
+            "weekly_churn": self.weekly_churn,
+            "author_weekly_churn": self.author_weekly_churn,
+            "commit_count": self.commit_count,
+            "risky_commits": self.risky_commits,
+            "watermark": self.watermark
+        })
+
+    @classmethod
+    def from_json(cls, payload: str) -> "ChurnAggregate":
+        data = json.loads(payload)
+        aggregate = cls(data["rules"])
+        aggregate.author_churn = data["author_churn"]
+        aggregate.weekly_churn = data["weekly_churn"]
+        aggregate.author_weekly_churn = data["author_weekly_churn"]
+        aggregate.commit_count = data["commit_count"]
+        aggregate.risky_commits = data["risky_commits"]
+        aggregate.watermark = data["watermark"]
+        return aggregate
+
+
+def _monday(day: str) -> str:
+    parsed = date.fromisoformat(day)
+    return (parsed - timedelta(days=parsed.weekday())).isoformat()
+
+
+# 🔄 Persisted per-repo aggregate, advanced only by commits stored since the last update
+def update_aggregate(owner: str, repo: str, store: Optional[RepoStore] = None,
+                     rules: Optional[List[Dict[str, Any]]] = None) -> ChurnAggregate:
+    """
+    Loads the repo's saved aggregate for these rules, folds in the commits
+    stored after its watermark and saves it again.
+    """
+    store = store or get_store()
+    aggregate = ChurnAggregate(rules)
+    saved = store.load_aggregate(owner, repo, aggregate.rules_key)
+    if saved:
+        aggregate = ChurnAggregate.from_json(saved[1])
+
+    watermark = aggregate.watermark
+
+    def stream():
+        nonlocal watermark
+        for rowid, record in store.iter_commits_after(owner, repo, aggregate.watermark):
+            watermark = rowid
+            yield record
+
+    aggregate.update(stream())
+    if watermark != aggregate.watermark:
+        aggregate.watermark = watermark
+        store.save_aggregate(owner, repo, aggregate.rules_key, watermark, aggregate.to_json())
+        print(f"🧮 Churn aggregate for {owner}/{repo} advanced to row {watermark}")
+    return aggregate
+
+
+# 📐 Exact report for any window of a stored repo
+def window_report(owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None,
+                  history_since: Optional[str] = None, store: Optional[RepoStore] = None) -> Dict[str, Any]:
+    """
+    analyze_diff output for the stored commits in [since, until], weekly series
+    from history_since. Week-aligned windows come from the saved aggregate; a
+    window starting or ending mid-week is analyzed commit by commit, with only
+    the whole weeks before it read from the aggregate. Percentile rules always
+    run over the window's commits.
+    """
+    store = store or get_store()
+    rules = load_risk_rules()
+    aggregate = update_aggregate(owner, repo, store, rules)
+
+    if is_week_aligned(since, until):
+        churn_data = aggregate.report(since=since, until=until, history_since=history_since)
+        if any("author_percentile" in rule for rule in rules):
+            # The aggregate only applies fixed thresholds; percentile rules need the window's commits
+            window = store.query_commits(owner, repo, since, until)
+            churn_data["risky_commits"] = summarize_commits(window, rules)["risky_commits"]
+        return churn_data
+
+    churn_data = summarize_commits(store.query_commits(owner, repo, since, until), rules)
+    if history_since and since:
+        history = aggregate.report(since=history_since, until=previous_week_end(since))
+        churn_data["weekly_churn"] = dict(sorted({**history["weekly_churn"], **churn_data["weekly_churn"]}.items()))
+        author_weekly = history["author_weekly_churn"]
+        for author, weeks in churn_data["author_weekly_churn"].items():
+            author_weekly[author] = {**author_weekly.get(author, {}), **weeks}
+        churn_data["author_weekly_churn"] = author_weekly
+    return churn_data
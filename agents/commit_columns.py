@@ -0,0 +1,166 @@
+# agents/commit_columns.py
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NAT = np.datetime64("NaT", "s")
+
+
+def _parse_timestamp(value: Optional[str]) -> np.datetime64:
+    if not value:
+        return NAT
+    # Stored timestamps are UTC 'Z' strings; numpy only parses naive ones
+    return np.datetime64(value[:-1] if value.endswith("Z") else value, "s")
+
+
+class CommitColumns:
+    """
+    Columnar batch of commit records: one NumPy array per numeric field and an
+    integer code per author into the `authors` vocabulary (first-appearance order).
+    """
+
+    __slots__ = ("authors", "author_idx", "additions", "deletions", "files_changed", "timestamps", "shas")
+
+    def __init__(self, authors: List[Optional[str]], author_idx: np.ndarray, additions: np.ndarray,
+                 deletions: np.ndarray, files_changed: np.ndarray, timestamps: np.ndarray,
+                 shas: Optional[np.ndarray] = None):
+        self.authors = authors
+        self.author_idx = author_idx
+        self.additions = additions
+        self.deletions = deletions
+        self.files_changed = files_changed
+        self.timestamps = timestamps
+        self.shas = shas
+
+    def __len__(self) -> int:
+        return len(self.author_idx)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.to_records()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "CommitColumns":
+        """Builds columns from commit dicts in one pass."""
+        codes: Dict[Optional[str], int] = {}
+        author_idx, additions, deletions, files_changed, timestamps, shas = [], [], [], [], [], []
+
+        for record in records:
+            author = record.get("author")
+            code = codes.get(author)
+            if code is None and author not in codes:
+                code = codes[author] = len(codes)
+            author_idx.append(code)
+            additions.append(record.get("additions", 0))
+            deletions.append(record.get("deletions", 0))
+            files_changed.append(record.get("files_changed", 0))
+            timestamps.append(_parse_timestamp(record.get("timestamp")))
+            shas.append(record.get("sha") or "")
+
+        return cls(
+            authors=list(codes),
+            author_idx=np.asarray(author_idx, dtype=np.int32),
+            additions=np.asarray(additions, dtype=np.int64),
+            deletions=np.asarray(deletions, dtype=np.int64),
+            files_changed=np.asarray(files_changed, dtype=np.int64),
+            timestamps=np.asarray(timestamps, dtype="datetime64[s]"),
+            shas=np.asarray(shas, dtype="U40") if any(shas) else None
+        )
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple[Any, ...]], fields: Sequence[str]) -> "CommitColumns":
+        """Builds columns from row tuples (e.g. a SQLite fetchmany), one column at a time."""
+        columns = dict(zip(fields, zip(*rows))) if rows else {field: () for field in fields}
+        codes: Dict[Optional[str], int] = {}
+        author_idx = [codes.setdefault(author, len(codes)) for author in columns["author"]]
+        shas = columns.get("sha")
+        return cls(
+            authors=list(codes),
+            author_idx=np.asarray(author_idx, dtype=np.int32),
+            additions=np.asarray(columns["additions"], dtype=np.int64),
+            deletions=np.asarray(columns["deletions"], dtype=np.int64),
+            files_changed=np.asarray(columns["files_changed"], dtype=np.int64),
+            timestamps=np.asarray([_parse_timestamp(value) for value in columns["timestamp"]], dtype="datetime64[s]"),
+            shas=np.asarray([sha or "" for sha in shas], dtype="U40") if shas and any(shas) else None
+        )
+
+    @classmethod
+    def concat(cls, batches: Iterable["CommitColumns"]) -> "CommitColumns":
+        """Joins batches in order, merging their author vocabularies."""
+        batches = list(batches)
+        codes: Dict[Optional[str], int] = {}
+        author_idx = []
+        for batch in batches:
+            remap = np.asarray([codes.setdefault(author, len(codes)) for author in batch.authors], dtype=np.int32)
+            author_idx.append(remap[batch.author_idx] if len(batch) else np.empty(0, dtype=np.int32))
+
+        def joined(name: str, dtype: Any) -> np.ndarray:
+            return np.concatenate([getattr(batch, name) for batch in batches]) if batches else np.empty(0, dtype=dtype)
+
+        with_shas = bool(batches) and all(batch.shas is not None for batch in batches)
+        return cls(
+            authors=list(codes),
+            author_idx=np.concatenate(author_idx) if author_idx else np.empty(0, dtype=np.int32),
+            additions=joined("additions", np.int64),
+            deletions=joined("deletions", np.int64),
+            files_changed=joined("files_changed", np.int64),
+            timestamps=joined("timestamps", "datetime64[s]"),
+            shas=np.concatenate([batch.shas for batch in batches]) if with_shas else None
+        )
+
+    @property
+    def total_churn(self) -> np.ndarray:
+        return self.additions + self.deletions
+
+    def metric(self, name: str) -> np.ndarray:
+        if name == "total_churn":
+            return self.total_churn
+        if name in ("additions", "deletions", "files_changed"):
+            return getattr(self, name)
+        raise ValueError(f"❌ Unknown commit metric: {name}")
+
+    def timestamp_strings(self, indices: np.ndarray) -> List[Optional[str]]:
+        values = self.timestamps[indices]
+        strings = np.char.add(np.datetime_as_string(values, unit="s"), "Z").tolist()
+        for i in np.flatnonzero(np.isnat(values)).tolist():
+            strings[i] = None
+        return strings
+
+    def week_starts(self) -> np.ndarray:
+        """Monday of each commit's week, as days since the epoch (NaT weeks become -1)."""
+        days = self.timestamps.astype("datetime64[D]").astype(np.int64)
+        # 1970-01-01 was a Thursday, so (days + 3) % 7 is the weekday with Monday = 0
+        mondays = days - (days + 3) % 7
+        mondays[np.isnat(self.timestamps)] = -1
+        return mondays
+
+    def to_records(self) -> Iterator[Dict[str, Any]]:
+        timestamps = self.timestamp_strings(np.arange(len(self)))
+        for i in range(len(self)):
+            record = {
+                "author": self.authors[self.author_idx[i]],
+                "timestamp": timestamps[i],
+                "additions": int(self.additions[i]),
+                "deletions": int(self.deletions[i]),
+                "files_changed": int(self.files_changed[i])
+            }
+            if self.shas is not None:
+                record["sha"] = str(self.shas[i])
+            yield record
+
+
+def iter_column_chunks(records: Iterable[Dict[str, Any]], chunk_size: int = 65536) -> Iterator[CommitColumns]:
+    """Splits a record stream into CommitColumns batches of at most chunk_size rows."""
+    chunk: List[Dict[str, Any]] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield CommitColumns.from_records(chunk)
+            chunk = []
+    if chunk:
+        yield CommitColumns.from_records(chunk)
+
+
+def week_label(monday: int) -> Optional[str]:
+    if monday < 0:
+        return None
+    return str(np.datetime64(int(monday), "D"))
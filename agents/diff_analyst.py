@@ -1,37 +1,173 @@
 # agents/diff_analyst.py
+import json
+import os
 from langchain_core.tools import tool
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
 
-@tool
-def analyze_diff(input: Dict[str, Any]) -> Dict[str, Any]:
+import numpy as np
+
+from agents.commit_columns import CommitColumns, iter_column_chunks, week_label
+
+# ⚠️ Declarative risk rules: a commit is risky when any rule matches.
+# A rule compares a commit metric against either a fixed 'value' or the
+# author's own 'author_percentile' of that metric.
+DEFAULT_RISK_RULES = [
+    {"name": "high_churn", "metric": "total_churn", "op": ">", "value": 300},
+    {"name": "many_files", "metric": "files_changed", "op": ">", "value": 8},
+]
+
+OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+def load_risk_rules() -> List[Dict[str, Any]]:
     """
-    Analyzes code churn and flags risky commits based on total additions and deletions.
+    Reads rules from RISK_RULES (inline JSON) or RISK_RULES_PATH (a JSON file),
+    falling back to the built-in churn/file-count thresholds.
     """
-    commits = input.get("github_data", [])
-    if not isinstance(commits, list):
-        raise ValueError(f"❌ Expected 'github_data' to be a list of commits, got {type(commits)}: {commits}")
+    if os.getenv("RISK_RULES"):
+        return json.loads(os.environ["RISK_RULES"])
+    if os.getenv("RISK_RULES_PATH"):
+        with open(os.environ["RISK_RULES_PATH"], "r") as f:
+            return json.load(f)
+    return DEFAULT_RISK_RULES
 
-    risky_commits = []
-    churn_by_author = {}
 
-    for commit in commits:
-        author = commit.get("author")
-        additions = commit.get("additions", 0)
-        deletions = commit.get("deletions", 0)
-        total_churn = additions + deletions
+def _author_percentiles(values: np.ndarray, author_idx: np.ndarray, n_authors: int, q: float) -> np.ndarray:
+    # Linear-interpolated percentile per author from one lexsort, returned per commit
+    order = np.lexsort((values, author_idx))
+    sorted_values = values[order].astype(np.float64)
+    counts = np.bincount(author_idx, minlength=n_authors)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
 
-        churn_by_author[author] = churn_by_author.get(author, 0) + total_churn
+    position = (counts - 1).clip(min=0) * (q / 100.0)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    has_commits = counts > 0
+    thresholds = np.zeros(n_authors, dtype=np.float64)
+    lo = sorted_values[(starts + lower)[has_commits]]
+    hi = sorted_values[(starts + upper)[has_commits]]
+    thresholds[has_commits] = lo + (hi - lo) * (position - lower)[has_commits]
+    return thresholds[author_idx]
 
-        if total_churn > 300 or commit.get("files_changed", 0) > 8:
-            risky_commits.append({
-                "author": author,
-                "total_churn": total_churn,
-                "files_changed": commit.get("files_changed", 0),
-                "timestamp": commit.get("timestamp")
-            })
 
-    print("✅ DiffAnalyst analyzed commit data")
+def risk_mask(columns: CommitColumns, rules: List[Dict[str, Any]]) -> np.ndarray:
+    mask = np.zeros(len(columns), dtype=bool)
+    for rule in rules:
+        compare = OPERATORS[rule.get("op", ">")]
+        values = columns.metric(rule["metric"])
+        if "author_percentile" in rule:
+            threshold = _author_percentiles(values, columns.author_idx, len(columns.authors),
+                                            float(rule["author_percentile"]))
+        else:
+            threshold = rule["value"]
+        mask |= compare(values, threshold)
+    return mask
+
+
+def risky_records(columns: CommitColumns, mask: np.ndarray, with_sha: bool = False) -> List[Dict[str, Any]]:
+    risky_idx = np.flatnonzero(mask)
+    churn = columns.additions[risky_idx] + columns.deletions[risky_idx]
+    timestamps = columns.timestamp_strings(risky_idx)
+    records = []
+    for n, i in enumerate(risky_idx.tolist()):
+        record = {
+            "author": columns.authors[columns.author_idx[i]],
+            "total_churn": int(churn[n]),
+            "files_changed": int(columns.files_changed[i]),
+            "timestamp": timestamps[n]
+        }
+        if with_sha and columns.shas is not None:
+            record["sha"] = str(columns.shas[i])
+        records.append(record)
+    return records
+
+
+def analyze_columns(columns: CommitColumns, rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Vectorized churn analysis: per-author totals, per-week rollups and risk
+    flags computed with group-by operations over the commit columns.
+    """
+    rules = DEFAULT_RISK_RULES if rules is None else rules
+    churn = columns.total_churn
+    n_authors = len(columns.authors)
+
+    author_totals = np.bincount(columns.author_idx, weights=churn, minlength=n_authors)
+    author_churn = {author: int(total) for author, total in zip(columns.authors, author_totals)}
+
+    # 📅 (week, author) group-by via one combined key
+    mondays = columns.week_starts()
+    keys, inverse = np.unique(mondays * max(n_authors, 1) + columns.author_idx, return_inverse=True)
+    key_totals = np.bincount(inverse, weights=churn, minlength=len(keys))
+    author_weekly_churn: Dict[Any, Dict[str, int]] = {}
+    weekly_churn: Dict[str, int] = {}
+    for key, total in zip(keys.tolist(), key_totals.tolist()):
+        monday, code = divmod(key, max(n_authors, 1))
+        week = week_label(monday)
+        if week is None:
+            continue
+        author = columns.authors[code]
+        author_weekly_churn.setdefault(author, {})[week] = int(total)
+        weekly_churn[week] = weekly_churn.get(week, 0) + int(total)
+
     return {
-        "author_churn": churn_by_author,
-        "risky_commits": risky_commits
+        "author_churn": author_churn,
+        "risky_commits": risky_records(columns, risk_mask(columns, rules)),
+        "weekly_churn": dict(sorted(weekly_churn.items())),
+        "author_weekly_churn": author_weekly_churn
     }
+
+
+def merge_results(results: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combines analyze_columns outputs of consecutive chunks, keeping commit order."""
+    merged = {"author_churn": {}, "risky_commits": [], "weekly_churn": {}, "author_weekly_churn": {}}
+    for result in results:
+        for author, total in result["author_churn"].items():
+            merged["author_churn"][author] = merged["author_churn"].get(author, 0) + total
+        merged["risky_commits"].extend(result["risky_commits"])
+        for week, total in result["weekly_churn"].items():
+            merged["weekly_churn"][week] = merged["weekly_churn"].get(week, 0) + total
+        for author, weeks in result["author_weekly_churn"].items():
+            target = merged["author_weekly_churn"].setdefault(author, {})
+            for week, total in weeks.items():
+                target[week] = target.get(week, 0) + total
+    merged["weekly_churn"] = dict(sorted(merged["weekly_churn"].items()))
+    return merged
+
+
+def summarize_commits(commits: Iterable[Dict[str, Any]],
+                      rules: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Analyzes a list, a stream or a CommitColumns batch. Streams are processed
+    in fixed-size column chunks, so large windows are never materialized as
+    dicts; percentile rules need each author's full distribution, so those
+    gather the (compact) columns first.
+    """
+    rules = load_risk_rules() if rules is None else rules
+    if isinstance(commits, CommitColumns):
+        return analyze_columns(commits, rules)
+    # Store queries hand out column batches directly; anything else is chunked from its records
+    chunks = commits.iter_columns() if hasattr(commits, "iter_columns") else iter_column_chunks(commits)
+    if any("author_percentile" in rule for rule in rules):
+        return analyze_columns(CommitColumns.concat(chunks), rules)
+    return merge_results(analyze_columns(chunk, rules) for chunk in chunks)
+
+@tool
+def analyze_diff(input: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analyzes code churn and flags risky commits using the configured risk rules.
+    'github_data' may be a list of commits or any iterable that streams them;
+    'risk_rules' optionally overrides the rules for this call.
+    """
+    commits = input.get("github_data", [])
+    if isinstance(commits, (dict, str, bytes)) or not isinstance(commits, Iterable):
+        raise ValueError(f"❌ Expected 'github_data' to be an iterable of commits, got {type(commits)}: {commits}")
+
+    result = summarize_commits(commits, input.get("risk_rules"))
+
+    print("✅ DiffAnalyst analyzed commit data")
+    return result
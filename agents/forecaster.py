@@ -1,28 +1,131 @@
 # agents/forecaster.py
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Hashable, Optional, Tuple
 import numpy as np
-from sklearn.linear_model import LinearRegression
 import datetime
 
+# z-score for the two-sided 95% interval
+Z_95 = 1.96
+
+
+def weekly_matrix(series: Dict[Hashable, Dict[str, float]], first_week: Optional[str] = None,
+                  last_week: Optional[str] = None) -> Tuple[List[Hashable], List[str], np.ndarray]:
+    """
+    Turns {key: {week_start: churn}} into a dense (n_series, n_weeks) array over
+    every week between the first and last observed week, widened to first_week
+    and last_week (Monday dates) when given; missing weeks are 0.
+    """
+    keys = list(series)
+    observed = sorted({week for weeks in series.values() for week in weeks})
+    bounds = sorted(observed + [week for week in (first_week, last_week) if week])
+    if not bounds:
+        return keys, [], np.zeros((len(keys), 0))
+
+    first = np.datetime64(bounds[0], "D")
+    n_weeks = int((np.datetime64(bounds[-1], "D") - first).astype(int) // 7) + 1
+    week_starts = [str(first + np.timedelta64(7 * i, "D")) for i in range(n_weeks)]
+
+    # Column of each observed week, then one scatter into the dense matrix
+    columns = dict(zip(observed, ((np.array(observed, dtype="datetime64[D]") - first).astype(np.int64) // 7).tolist()))
+    rows, cols, values = [], [], []
+    for row, key in enumerate(keys):
+        weeks = series[key]
+        rows.extend([row] * len(weeks))
+        cols.extend(columns[week] for week in weeks)
+        values.extend(weeks.values())
+
+    matrix = np.zeros((len(keys), n_weeks))
+    matrix[rows, cols] = values
+    return keys, week_starts, matrix
+
+
+# 📐 Closed-form least squares for every row at once
+def forecast_linear(Y: np.ndarray, x: Optional[np.ndarray] = None, horizon: float = 1.0,
+                    z: float = Z_95) -> Dict[str, np.ndarray]:
+    """
+    Fits y = a + b*x to each row of Y (shape n_series x n_points) and predicts
+    `horizon` steps past the last x, with a prediction interval per row.
+    """
+    n = Y.shape[1]
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+    x_mean = x.mean()
+    dx = x - x_mean
+    sxx = (dx ** 2).sum()
+    if sxx == 0:
+        raise ValueError("❌ A trend needs at least two distinct x values")
+
+    y_mean = Y.mean(axis=1, keepdims=True)
+    slope = ((Y - y_mean) @ dx) / sxx
+    intercept = y_mean[:, 0] - slope * x_mean
+
+    x_next = x[-1] + horizon
+    forecast = intercept + slope * x_next
+
+    residuals = Y - (intercept[:, None] + slope[:, None] * x)
+    dof = max(n - 2, 1)
+    sigma = np.sqrt((residuals ** 2).sum(axis=1) / dof)
+    spread = z * sigma * np.sqrt(1 + 1 / n + (x_next - x_mean) ** 2 / sxx)
+
+    return {"forecast": forecast, "lower": forecast - spread, "upper": forecast + spread}
+
+
+# 🌊 Simple exponential smoothing, vectorized across rows
+def forecast_ses(Y: np.ndarray, alpha: float = 0.5, horizon: int = 1, z: float = Z_95) -> Dict[str, np.ndarray]:
+    level = Y[:, 0].astype(np.float64)
+    squared_errors = np.zeros(Y.shape[0])
+    for t in range(1, Y.shape[1]):
+        error = Y[:, t] - level
+        squared_errors += error ** 2
+        level = level + alpha * error
+
+    sigma = np.sqrt(squared_errors / max(Y.shape[1] - 1, 1))
+    spread = z * sigma * np.sqrt(1 + (horizon - 1) * alpha ** 2)
+    return {"forecast": level, "lower": level - spread, "upper": level + spread}
+
+
+def _bounded(result: Dict[str, np.ndarray], i: int) -> Dict[str, float]:
+    # Churn can't go negative, so the forecast and both bounds are clipped at 0
+    return {
+        "forecast_churn": round(float(max(result["forecast"][i], 0)), 2),
+        "lower": round(float(max(result["lower"][i], 0)), 2),
+        "upper": round(float(max(result["upper"][i], 0)), 2)
+    }
+
+
+def forecast_many(series: Dict[Hashable, Dict[str, float]], method: str = "linear",
+                  alpha: float = 0.5, first_week: Optional[str] = None,
+                  last_week: Optional[str] = None) -> Dict[Hashable, Dict[str, Any]]:
+    """
+    Forecasts next week's churn for many weekly series (every author, every
+    repo) in one batched fit. Pass the report's first and last week so quiet
+    weeks at either end count as 0 and "next week" follows the window.
+    Churn can't go negative, so bounds are clipped at 0.
+    """
+    keys, week_starts, Y = weekly_matrix(series, first_week, last_week)
+    if len(week_starts) < 2:
+        return {key: {"forecast": "Not enough data to forecast."} for key in keys}
+
+    result = forecast_linear(Y) if method == "linear" else forecast_ses(Y, alpha=alpha)
+    forecast_week = str(np.datetime64(week_starts[-1], "D") + np.timedelta64(7, "D"))
+    return {key: {"forecast_week": forecast_week, **_bounded(result, i)} for i, key in enumerate(keys)}
+
+
 # 🧠 Predict next week's churn or cycle time
 def forecast_next_week(churn_history: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Takes churn history (list of {week_start, total_churn}) and returns forecast for next week.
     """
-    if len(churn_history) < 2:
+    # A trend needs at least two distinct weeks
+    if len({week['week_start'] for week in churn_history}) < 2:
         return {"forecast": "Not enough data to forecast."}
 
     # Convert weekly churn data into regression-ready format
     dates = [datetime.datetime.strptime(week['week_start'], "%Y-%m-%d") for week in churn_history]
-    X = np.array([(d - dates[0]).days for d in dates]).reshape(-1, 1)  # days since first week
-    y = np.array([week['total_churn'] for week in churn_history])
+    x = np.array([(d - dates[0]).days for d in dates], dtype=np.float64)  # days since first week
+    y = np.array([[week['total_churn'] for week in churn_history]], dtype=np.float64)
 
-    # Train linear model
-    model = LinearRegression().fit(X, y)
-    next_week = np.array([[X[-1][0] + 7]])
-    forecast = model.predict(next_week)[0]
+    result = forecast_linear(y, x=x, horizon=7)
 
     return {
         "forecast_week": (dates[-1] + datetime.timedelta(days=7)).strftime("%Y-%m-%d"),
-        "forecast_churn": round(forecast, 2)
+        **_bounded(result, 0)
     }
@@ -0,0 +1,192 @@
+# agents/git_mirror.py
+import base64
+import os
+import re
+import subprocess
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from agents.graphql_ingestor import commit_author_logins, utc_timestamp
+from utils.github_client import GITHUB_TOKEN
+from utils.repo_store import ROOT_DIR, RepoStore, get_store
+
+GIT_MIRROR_DIR = os.getenv("GIT_MIRROR_DIR", os.path.join(ROOT_DIR, "data", "mirrors"))
+GIT_REMOTE_URL = os.getenv("GIT_REMOTE_URL", "https://github.com/{owner}/{repo}.git")
+# Resolve commit emails to GitHub logins (one GraphQL query per batch of unseen emails, cached in the store)
+GIT_RESOLVE_LOGINS = os.getenv("GIT_RESOLVE_LOGINS", "1") != "0"
+
+# Records held back while their authors are resolved, and unseen emails looked up per query
+RESOLVE_BATCH = 500
+LOGIN_LOOKUP_BATCH = 100
+
+# Record separator before each commit header, unit separator between its fields
+COMMIT_MARKER = "\x1e"
+LOG_FORMAT = "%x1e%H%x1f%an%x1f%ae%x1f%aI%x1f%cI"
+
+# 123456+login@users.noreply.github.com / login@users.noreply.github.com
+NOREPLY_EMAIL = re.compile(r"^(?:\d+\+)?([^@]+)@users\.noreply\.github\.com$")
+
+
+def mirror_path(owner: str, repo: str) -> str:
+    return os.path.join(GIT_MIRROR_DIR, owner, f"{repo}.git")
+
+
+def _git(args: List[str], token: Optional[str] = None) -> List[str]:
+    cmd = ["git"]
+    if token:
+        # Same header actions/checkout uses; keeps the token out of the mirror's config
+        basic = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        cmd += ["-c", f"http.extraheader=AUTHORIZATION: basic {basic}"]
+    return cmd + args
+
+
+def ensure_mirror(owner: str, repo: str, token: Optional[str] = GITHUB_TOKEN) -> str:
+    """
+    Clones a bare mirror of the repo on first use and incrementally fetches it
+    afterwards. Returns the mirror's git dir.
+    """
+    path = mirror_path(owner, repo)
+    if not os.path.isdir(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        url = GIT_REMOTE_URL.format(owner=owner, repo=repo)
+        subprocess.run(_git(["clone", "--mirror", "--quiet", url, path], token), check=True)
+        print(f"🪞 Mirrored {owner}/{repo} into {path}")
+    else:
+        subprocess.run(_git(["--git-dir", path, "fetch", "--prune", "--quiet", "origin"], token), check=True)
+    return path
+
+
+def _noreply_login(email: str) -> Optional[str]:
+    match = NOREPLY_EMAIL.match(email or "")
+    return match.group(1) if match else None
+
+
+def _resolve_batch(owner: str, repo: str, batch: List[Dict[str, Any]], store: RepoStore):
+    # Only emails that aren't noreply and aren't cached cost a lookup, via one SHA that used each
+    emails = {record["email"] for record in batch if record["email"] and not _noreply_login(record["email"])}
+    logins = store.get_author_logins(emails)
+    unseen: Dict[str, str] = {}
+    for record in batch:
+        if record["email"] in emails and record["email"] not in logins:
+            unseen.setdefault(record["email"], record["sha"])
+
+    pending = list(unseen.items())
+    for i in range(0, len(pending), LOGIN_LOOKUP_BATCH):
+        chunk = pending[i:i + LOGIN_LOOKUP_BATCH]
+        try:
+            by_sha = commit_author_logins(owner, repo, [sha for _, sha in chunk])
+        except Exception as e:
+            # Left unresolved (and uncached) so the next sync tries again
+            print(f"⚠️ Could not resolve commit authors for {owner}/{repo}: {e}")
+            break
+        resolved = {email: by_sha.get(sha) for email, sha in chunk}
+        store.set_author_logins(resolved)
+        logins.update(resolved)
+
+    for record in batch:
+        email = record.pop("email")
+        record["author"] = _noreply_login(email) or logins.get(email) or record["author"]
+
+
+def resolve_logins(owner: str, repo: str, records: Iterable[Dict[str, Any]],
+                   store: Optional[RepoStore] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Replaces each record's git author name with the GitHub login of its email,
+    so mirror records match the API backends. Records keep their order and
+    are held back RESOLVE_BATCH at a time.
+    """
+    store = store or get_store()
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= RESOLVE_BATCH:
+            _resolve_batch(owner, repo, batch, store)
+            yield from batch
+            batch = []
+    _resolve_batch(owner, repo, batch, store)
+    yield from batch
+
+
+def _numstat_count(value: str) -> int:
+    # Binary files report '-' for both columns
+    return int(value) if value.isdigit() else 0
+
+
+def iter_commits_git(owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None,
+                     fetch: bool = True, resolve: bool = GIT_RESOLVE_LOGINS,
+                     store: Optional[RepoStore] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the same records as the API backends from one streaming
+    `git log --numstat` pass over the default branch of the local mirror.
+    Merge commits are diffed against their first parent, like the REST API.
+    Authors are GitHub logins when 'resolve' is set (see resolve_logins);
+    otherwise only noreply addresses give a login and the rest keep their git name.
+    """
+    records = _iter_log(owner, repo, since, until, fetch)
+    if resolve:
+        return resolve_logins(owner, repo, records, store)
+    return (_without_email(record) for record in records)
+
+
+def _without_email(record: Dict[str, Any]) -> Dict[str, Any]:
+    record["author"] = _noreply_login(record.pop("email")) or record["author"]
+    return record
+
+
+def _iter_log(owner: str, repo: str, since: Optional[str], until: Optional[str],
+              fetch: bool) -> Iterator[Dict[str, Any]]:
+    # Records carry the author's git name plus an 'email' key the callers above consume
+    path = ensure_mirror(owner, repo) if fetch else mirror_path(owner, repo)
+    args = ["--git-dir", path, "log", "HEAD", "--numstat", "--summary", "--no-renames",
+            "--diff-merges=first-parent", f"--format={LOG_FORMAT}"]
+    if since:
+        args.append(f"--since={since}")
+    if until:
+        args.append(f"--until={until}")
+
+    process = subprocess.Popen(_git(args), stdout=subprocess.PIPE, text=True,
+                               encoding="utf-8", errors="replace")
+    record = None
+    statuses: Dict[str, str] = {}
+
+    def finish(record: Dict[str, Any]) -> Dict[str, Any]:
+        record["files"] = [
+            (file_path, adds, dels, statuses.get(file_path, "modified"))
+            for file_path, adds, dels in record["files"]
+        ]
+        statuses.clear()
+        return record
+
+    try:
+        for line in process.stdout:
+            line = line.rstrip("\n")
+            if line.startswith(COMMIT_MARKER):
+                if record:
+                    yield finish(record)
+                sha, name, email, date, committed = line[1:].split("\x1f")
+                record = {
+                    "sha": sha,
+                    "author": name or "unknown",
+                    "email": email,
+                    "timestamp": utc_timestamp(date),
+                    "committed_at": utc_timestamp(committed),
+                    "additions": 0,
+                    "deletions": 0,
+                    "files_changed": 0,
+                    "files": []
+                }
+            elif line.startswith((" create mode ", " delete mode ")) and record:
+                # --summary lines: ' create mode 100644 path/to/file'
+                _, kind, _, _, file_path = line.split(" ", 4)
+                statuses[file_path] = "added" if kind == "create" else "removed"
+            elif line and not line.startswith(" ") and record:
+                added, deleted, file_path = line.split("\t", 2)
+                record["additions"] += _numstat_count(added)
+                record["deletions"] += _numstat_count(deleted)
+                record["files_changed"] += 1
+                record["files"].append((file_path, _numstat_count(added), _numstat_count(deleted)))
+        if record:
+            yield finish(record)
+    finally:
+        process.stdout.close()
+        if process.wait() not in (0, -13):
+            print(f"⚠️ git log exited with {process.returncode} for {owner}/{repo}")
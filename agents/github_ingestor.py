@@ -1,63 +1,206 @@
 # agents/github_ingestor.py
 from langchain_core.tools import tool
-import requests
-from typing import Dict, Any
-from dotenv import load_dotenv
-import os
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 
-load_dotenv()
+from agents.git_mirror import iter_commits_git
+from agents.graphql_ingestor import iter_commits_graphql
+from utils.github_client import github_get, iter_pages, map_concurrent, GITHUB_BACKEND, GITHUB_MAX_WORKERS
+from utils.repo_store import RepoStore, get_store
+from utils.report_window import sync_floor
+
+GITHUB_PER_PAGE = 100
+# GitHub's GraphQL API has no per-file diff stats, so that backend leaves the hotspot index (risky areas) empty
+FILELESS_BACKENDS = ("graphql",)
+
+
+def tracks_files(backend: str = GITHUB_BACKEND) -> bool:
+    """Whether the backend's records carry per-file stats for the hotspot index."""
+    return backend not in FILELESS_BACKENDS
+
+
+def _fetch_commit_stats(owner: str, repo: str, commit: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    sha = commit.get("sha")
+    author = (commit.get("author") or {}).get("login", "unknown")
+    timestamp = commit.get("commit", {}).get("author", {}).get("date")
+    committed_at = commit.get("commit", {}).get("committer", {}).get("date")
+
+    stats_response = github_get(f"/repos/{owner}/{repo}/commits/{sha}")
+
+    if stats_response.status_code != 200:
+        print(f"⚠️ Failed to fetch stats for commit {sha}")
+        return None
+
+    stats_data = stats_response.json()
+    files = stats_data.get("files", [])
+    return {
+        "sha": sha,
+        "author": author,
+        "timestamp": timestamp,
+        # Committer date: what 'since' filters on and what the sync watermark records
+        "committed_at": committed_at,
+        "additions": stats_data.get("stats", {}).get("additions", 0),
+        "deletions": stats_data.get("stats", {}).get("deletions", 0),
+        "files_changed": len(files),
+        # (path, additions, deletions, status) per file, for the hotspot index
+        "files": [
+            (f.get("filename"), f.get("additions", 0), f.get("deletions", 0), f.get("status"))
+            for f in files
+        ]
+    }
+
+
+def _fetch_page_stats(owner: str, repo: str, commits: List[Dict[str, Any]],
+                      max_workers: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+    return map_concurrent(
+        lambda commit: _fetch_commit_stats(owner, repo, commit),
+        commits,
+        max_workers=max_workers or GITHUB_MAX_WORKERS
+    )
+
+
+def _list_params(since: Optional[str], until: Optional[str]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"per_page": GITHUB_PER_PAGE}
+    if since:
+        params["since"] = since
+    if until:
+        params["until"] = until
+    return params
+
+
+# 🌊 Streaming ingestion: one page of commits in memory at a time
+def iter_commits_rest(owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None,
+                      max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields commit records (newest first) for every page in the [since, until]
+    window. Stats for each page are fetched concurrently before it is yielded.
+    """
+    for page in iter_pages(f"/repos/{owner}/{repo}/commits", params=_list_params(since, until)):
+        for record in _fetch_page_stats(owner, repo, page, max_workers):
+            if record is not None:
+                yield record
+
+
+def iter_commits(owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None,
+                 max_workers: Optional[int] = None, backend: str = GITHUB_BACKEND) -> Iterator[Dict[str, Any]]:
+    """
+    Streams commit records from the configured backend ('rest', 'graphql' or
+    'git' for a local mirror). Every backend yields the same record shape.
+    """
+    if backend == "graphql":
+        return iter_commits_graphql(owner, repo, since=since, until=until)
+    if backend == "git":
+        return iter_commits_git(owner, repo, since=since, until=until)
+    return iter_commits_rest(owner, repo, since=since, until=until, max_workers=max_workers)
 
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 
 @tool
 def fetch_commits_api(input: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Pulls latest commits from a GitHub repo using GitHub API.
-    Input must contain 'owner' and 'repo'.
+    Pulls commits from a GitHub repo using GitHub API, following pagination.
+    Input must contain 'owner' and 'repo'; 'since'/'until' (ISO-8601) limit the
+    window, 'max_workers' caps how many commit-stat requests are in flight and
+    'backend' overrides GITHUB_BACKEND.
     """
-    owner = input["owner"]
-    repo = input["repo"]
-    
-    headers = {
-        "Authorization": f"token {GITHUB_TOKEN}",
-        "Accept": "application/vnd.github.v3+json"
-    }
-
-    # Step 1: Get list of recent commits (first page, latest 30)
-    url = f"https://api.github.com/repos/{owner}/{repo}/commits"
-    response = requests.get(url, headers=headers)
-
-    if response.status_code != 200:
-        raise Exception(f"❌ GitHub API error: {response.status_code}, {response.text}")
-    
-    parsed_commits = []
-    commits = response.json()
-
-    # Step 2: For each commit, fetch detailed stats via /commits/{sha}
-    for commit in commits:
-        sha = commit.get("sha")
-        author = commit.get("author", {}).get("login", "unknown")
-        timestamp = commit.get("commit", {}).get("author", {}).get("date")
-
-        commit_url = f"https://api.github.com/repos/{owner}/{repo}/commits/{sha}"
-        stats_response = requests.get(commit_url, headers=headers)
-
-        if stats_response.status_code != 200:
-            print(f"⚠️ Failed to fetch stats for commit {sha}")
-            continue
-
-        stats_data = stats_response.json()
-        additions = stats_data.get("stats", {}).get("additions", 0)
-        deletions = stats_data.get("stats", {}).get("deletions", 0)
-        files_changed = len(stats_data.get("files", []))
-
-        parsed_commits.append({
-            "author": author,
-            "timestamp": timestamp,
-            "additions": additions,
-            "deletions": deletions,
-            "files_changed": files_changed
-        })
+    parsed_commits = list(iter_commits(
+        input["owner"],
+        input["repo"],
+        since=input.get("since"),
+        until=input.get("until"),
+        max_workers=input.get("max_workers", GITHUB_MAX_WORKERS),
+        backend=input.get("backend", GITHUB_BACKEND)
+    ))
 
     print(f"✅ GitHub data fetched: {len(parsed_commits)} commits with stats")
     return {"github_data": parsed_commits}
+
+
+# 🔄 Incremental sync into the local RepoStore
+def sync_commits(owner: str, repo: str, store: Optional[RepoStore] = None,
+                 max_workers: Optional[int] = None, backend: str = GITHUB_BACKEND,
+                 floor: Optional[str] = None) -> int:
+    """
+    Fetches only commits newer than the stored watermark ('since' plus the
+    last-seen SHA) and writes them to the store page by page. A repo without
+    a watermark starts at 'floor' (default sync_floor()), not its whole history.
+    Returns the number of new commits.
+    """
+    store = store or get_store()
+    state = store.get_sync_state(owner, repo)
+    since = (state.get("last_timestamp") if state else None) or floor or sync_floor()
+    last_sha = state.get("last_sha") if state else None
+
+    if backend == "rest":
+        synced, head = _sync_rest(owner, repo, store, since, last_sha, max_workers)
+    else:
+        synced, head = _sync_records(owner, repo, store, last_sha,
+                                     iter_commits(owner, repo, since=since, backend=backend))
+
+    if head is not None:
+        store.set_sync_state(owner, repo, head[0], head[1])
+    print(f"✅ Synced {owner}/{repo}: {synced} new commits")
+    if synced and not tracks_files(backend):
+        print(f"⚠️ The {backend} backend has no per-file stats; risky areas won't include these commits")
+    return synced
+
+
+def _sync_rest(owner: str, repo: str, store: RepoStore, since: Optional[str], last_sha: Optional[str],
+               max_workers: Optional[int]) -> Tuple[int, Optional[Tuple[str, str]]]:
+    # Listing is cheap; only unseen SHAs pay for a /commits/{sha} stats call
+    head = None
+    synced = 0
+    dropped = 0
+    for page in iter_pages(f"/repos/{owner}/{repo}/commits", params=_list_params(since, None)):
+        if head is None and page:
+            head = (page[0].get("sha"), page[0].get("commit", {}).get("committer", {}).get("date"))
+
+        # Everything from the last-seen SHA onwards is already stored
+        new_commits = []
+        reached_last_sha = False
+        for commit in page:
+            if commit.get("sha") == last_sha:
+                reached_last_sha = True
+                break
+            new_commits.append(commit)
+
+        known = store.known_shas(owner, repo, [c.get("sha") for c in new_commits])
+        new_commits = [c for c in new_commits if c.get("sha") not in known]
+
+        records = [r for r in _fetch_page_stats(owner, repo, new_commits, max_workers) if r is not None]
+        store.upsert_commits(owner, repo, records)
+        synced += len(records)
+        dropped += len(new_commits) - len(records)
+
+        if reached_last_sha:
+            break
+
+    # Only advance the watermark when nothing was dropped, so failed commits are retried
+    if dropped:
+        print(f"⚠️ {dropped} commits failed; keeping the previous sync watermark")
+        return synced, None
+    return synced, head
+
+
+def _sync_records(owner: str, repo: str, store: RepoStore, last_sha: Optional[str],
+                  records: Iterable[Dict[str, Any]], batch_size: int = 500) -> Tuple[int, Optional[Tuple[str, str]]]:
+    # Backends that return stats with the listing just need the unseen records written
+    head = None
+    synced = 0
+    batch: List[Dict[str, Any]] = []
+
+    def flush() -> int:
+        known = store.known_shas(owner, repo, [r["sha"] for r in batch])
+        written = store.upsert_commits(owner, repo, [r for r in batch if r["sha"] not in known])
+        batch.clear()
+        return written
+
+    for record in records:
+        if head is None:
+            # Same committer-date watermark as _sync_rest; rebased commits keep old author dates
+            head = (record["sha"], record.get("committed_at") or record["timestamp"])
+        if record["sha"] == last_sha:
+            break
+        batch.append(record)
+        if len(batch) >= batch_size:
+            synced += flush()
+    synced += flush()
+    return synced, head
@@ -0,0 +1,164 @@
+# agents/graphql_ingestor.py
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterator, List, Optional
+
+from utils.github_client import github_graphql
+
+# Commits with stats are expensive to resolve; GitHub times out well before 100 per page
+GITHUB_GRAPHQL_PAGE_SIZE = int(os.getenv("GITHUB_GRAPHQL_PAGE_SIZE", "50"))
+
+COMMITS_QUERY = """
+query($owner: String!, $repo: String!, $since: GitTimestamp, $until: GitTimestamp,
+      $cursor: String, $pageSize: Int!) {
+  repository(owner: $owner, name: $repo) {
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: $pageSize, after: $cursor, since: $since, until: $until) {
+            pageInfo { hasNextPage endCursor }
+            nodes {
+              oid
+              committedDate
+              additions
+              deletions
+              changedFilesIfAvailable
+              author { date user { login } }
+            }
+          }
+        }
+      }
+    }
+  }
+}
+"""
+
+PULL_REVIEWS_QUERY = """
+query($owner: String!, $repo: String!, $cursor: String, $pageSize: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequests(first: $pageSize, after: $cursor, orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number
+        updatedAt
+        author { login }
+        reviews(first: 100) { nodes { author { login } } }
+      }
+    }
+  }
+}
+"""
+
+
+def utc_timestamp(value: Optional[str]) -> Optional[str]:
+    # GraphQL returns local offsets ('+05:30'); the REST path stores UTC 'Z' strings
+    if not value:
+        return value
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def iter_commits_graphql(owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None,
+                         token: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields the same records as the REST iter_commits (newest first), with
+    additions/deletions/changed files resolved in one query per page.
+    """
+    cursor = None
+    while True:
+        data = github_graphql(COMMITS_QUERY, {
+            "owner": owner,
+            "repo": repo,
+            "since": since,
+            "until": until,
+            "cursor": cursor,
+            "pageSize": GITHUB_GRAPHQL_PAGE_SIZE
+        }, token=token)
+
+        branch = (data.get("repository") or {}).get("defaultBranchRef")
+        if not branch:
+            return
+        history = branch["target"]["history"]
+
+        for node in history["nodes"]:
+            author = node.get("author") or {}
+            yield {
+                "sha": node["oid"],
+                "author": (author.get("user") or {}).get("login", "unknown"),
+                "timestamp": utc_timestamp(author.get("date")),
+                "committed_at": utc_timestamp(node.get("committedDate")),
+                "additions": node.get("additions", 0),
+                "deletions": node.get("deletions", 0),
+                "files_changed": node.get("changedFilesIfAvailable") or 0
+            }
+
+        if not history["pageInfo"]["hasNextPage"]:
+            return
+        cursor = history["pageInfo"]["endCursor"]
+
+
+def iter_pull_reviews_graphql(owner: str, repo: str, token: Optional[str] = None,
+                              since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields {'number', 'author', 'updated_at', 'reviewers', 'reviews'} per PR,
+    most recently updated first, with up to 100 reviews per PR fetched in the
+    same query. 'reviews' counts submitted reviews per reviewer.
+    """
+    cursor = None
+    while True:
+        data = github_graphql(PULL_REVIEWS_QUERY, {
+            "owner": owner,
+            "repo": repo,
+            "cursor": cursor,
+            "pageSize": GITHUB_GRAPHQL_PAGE_SIZE
+        }, token=token)
+
+        pulls = (data.get("repository") or {}).get("pullRequests")
+        if not pulls:
+            return
+
+        for node in pulls["nodes"]:
+            updated_at = utc_timestamp(node.get("updatedAt"))
+            if since and (updated_at or "") < since:
+                return
+
+            author = (node.get("author") or {}).get("login")
+            reviews: Dict[str, int] = {}
+            for review in node.get("reviews", {}).get("nodes", []):
+                login = (review.get("author") or {}).get("login")
+                if login and login != author:
+                    reviews[login] = reviews.get(login, 0) + 1
+            yield {
+                "number": node.get("number"),
+                "author": author,
+                "updated_at": updated_at,
+                "reviewers": sorted(reviews),
+                "reviews": reviews
+            }
+
+        if not pulls["pageInfo"]["hasNextPage"]:
+            return
+        cursor = pulls["pageInfo"]["endCursor"]
+
+
+def commit_author_logins(owner: str, repo: str, shas: List[str],
+                         token: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """
+    GitHub login of each commit's author (None when its email belongs to no
+    account), looked up for every SHA in one aliased query.
+    """
+    if not shas:
+        return {}
+    # SHAs are hex, so they can be inlined as object(oid:) arguments
+    fields = " ".join(
+        f'c{i}: object(oid: "{sha}") {{ ... on Commit {{ author {{ user {{ login }} }} }} }}'
+        for i, sha in enumerate(shas)
+    )
+    query = f"query($owner: String!, $repo: String!) {{ repository(owner: $owner, name: $repo) {{ {fields} }} }}"
+    repository = github_graphql(query, {"owner": owner, "repo": repo}, token=token).get("repository") or {}
+
+    logins = {}
+    for i, sha in enumerate(shas):
+        author = (repository.get(f"c{i}") or {}).get("author") or {}
+        logins[sha] = (author.get("user") or {}).get("login")
+    return logins
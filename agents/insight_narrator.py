@@ -1,30 +1,51 @@
 from langchain_core.tools import tool
 from typing import Dict, Any
-import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
+import threading
 import os
 
-from langchain_core.output_parsers import StrOutputParser
-from langchain.prompts import PromptTemplate
+from langchain_core.prompts import PromptTemplate
+
+from utils.artifacts import put_artifact
+from utils.chart_renderer import render_churn_chart
+from utils.llm_cache import completion_key, get_llm_cache
+from utils.metrics import count
 
 # 🔁 Dynamic LLM driver selection
 LLM_DRIVER = os.getenv("LLM_DRIVER", "groq").lower()
+LLM_MODELS = {
+    "groq": "llama-3.1-8b-instant",
+    "openai": "gpt-4o"
+}
+LLM_MODEL = LLM_MODELS.get(LLM_DRIVER, "")
+
+_llm = None
+_chain = None
+_llm_lock = threading.Lock()
 
-if LLM_DRIVER == "groq":
-    from langchain_groq import ChatGroq
-    llm = ChatGroq(
-        api_key=os.getenv("GROQ_API_KEY"),
-        model_name="llama-3.1-8b-instant"
-    )
-elif LLM_DRIVER == "openai":
-    from langchain_openai import ChatOpenAI
-    llm = ChatOpenAI(
-        api_key=os.getenv("OPENAI_API_KEY"),
-        model="gpt-4o"
-    )
-else:
-    raise ValueError(f"❌ Unsupported LLM_DRIVER: {LLM_DRIVER}")
+def get_llm():
+    """
+    Builds the chat client for LLM_DRIVER on first use, so importing this
+    module never loads the provider SDK or needs its API key.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                if LLM_DRIVER == "groq":
+                    from langchain_groq import ChatGroq
+                    _llm = ChatGroq(
+                        api_key=os.getenv("GROQ_API_KEY"),
+                        model_name=LLM_MODEL
+                    )
+                elif LLM_DRIVER == "openai":
+                    from langchain_openai import ChatOpenAI
+                    _llm = ChatOpenAI(
+                        api_key=os.getenv("OPENAI_API_KEY"),
+                        model=LLM_MODEL
+                    )
+                else:
+                    raise ValueError(f"❌ Unsupported LLM_DRIVER: {LLM_DRIVER}")
+    return _llm
 
 # 🧠 Prompt for weekly developer insight
 prompt = PromptTemplate.from_template("""
@@ -33,6 +54,7 @@ You are a software engineering analyst bot.
 Given:
 - Per-author code churn data
 - List of risky commits (high churn, many files changed)
+- Directories with the most churn (total churn, commits touching them, distinct authors)
 
 Generate a short and crisp insight summary for a weekly developer productivity report.
 
@@ -42,58 +64,79 @@ Author churn:
 Risky commits:
 {risky_commits}
 
+Risky areas:
+{risky_areas}
+
 Output a helpful and concise report with insights, risks, and positive highlights.
 """)
 
 # 🔗 LLM chain
-chain = prompt | llm | StrOutputParser()
-
-# 📊 Generate chart
-def generate_churn_chart(author_churn: dict) -> str:
-    authors = list(author_churn.keys())
-    churn_values = list(author_churn.values())
+def get_chain():
+    global _chain
+    if _chain is None:
+        # No output parser: the chat message carries the token usage we report
+        _chain = prompt | get_llm()
+    return _chain
 
-    plt.figure(figsize=(10, 6))
-    bars = plt.bar(authors, churn_values, color='skyblue')
-    plt.xlabel("Author")
-    plt.ylabel("Total Churn")
-    plt.title("Code Churn by Author")
 
-    for bar in bars:
-        yval = bar.get_height()
-        plt.text(bar.get_x() + bar.get_width()/2, yval + 5, yval, ha='center', va='bottom')
+def complete(values: Dict[str, Any]) -> str:
+    message = get_chain().invoke(values)
+    usage = getattr(message, "usage_metadata", None) or {}
+    count("llm_calls")
+    count("llm_prompt_tokens", usage.get("input_tokens", 0))
+    count("llm_completion_tokens", usage.get("output_tokens", 0))
+    return getattr(message, "content", message)
 
-    plt.tight_layout()
-    image_path = "churn_chart.png"
-    plt.savefig(image_path)
 
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png")
-    buffer.seek(0)
-    chart_base64 = base64.b64encode(buffer.read()).decode("utf-8")
-    plt.close()
+def summarize(values: Dict[str, Any]) -> str:
+    """
+    Runs the chain, reusing the stored completion when the same rendered
+    prompt was already sent to the same driver and model.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return complete(values)
+
+    key = completion_key(LLM_DRIVER, LLM_MODEL, prompt.format(**values))
+    summary = cache.get(key)
+    if summary is not None:
+        count("llm_cache_hits")
+        print("⚡ InsightNarrator reused a cached summary")
+        return summary
+
+    count("llm_cache_misses")
+    summary = complete(values)
+    cache.put(key, LLM_DRIVER, LLM_MODEL, summary)
+    return summary
 
-    print(f"📊 Churn chart saved at: {os.path.abspath(image_path)}")
-    return chart_base64
+# 📊 Generate chart
+def generate_churn_chart(author_churn: dict) -> str:
+    """Renders the chart and returns its artifact handle."""
+    chart = put_artifact(render_churn_chart(author_churn))
+    print("📊 Churn chart rendered")
+    return chart
 
 # 🧪 Main tool
 @tool
 def generate_insight(input: Dict[str, Any]) -> Dict[str, str]:
     """
     Uses Groq or OpenAI LLM to generate a developer productivity insight
-    from per-author churn data and risky commits. Also generates a churn chart as a base64 image.
+    from per-author churn data, risky commits and risky areas (churn hotspots).
+    Also renders a churn chart, returned as an artifact handle.
     """
     author_churn = input.get("author_churn", {})
     risky_commits = input.get("risky_commits", [])
+    risky_areas = input.get("risky_areas", [])
 
-    summary = chain.invoke({
+    summary = summarize({
         "author_churn": author_churn,
-        "risky_commits": risky_commits
+        "risky_commits": risky_commits,
+        "risky_areas": risky_areas or "None recorded"
     })
 
-    chart_base64 = generate_churn_chart(author_churn)
+    chart = generate_churn_chart(author_churn)
 
     return {
         "summary": summary,
-        "chart_base64": chart_base64
+        "chart": chart
     }
@@ -0,0 +1,184 @@
+# agents/org_report.py
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from agents.churn_aggregate import window_report
+from agents.diff_analyst import merge_results
+from agents.forecaster import forecast_many
+from agents.github_ingestor import sync_commits
+from utils.github_client import GITHUB_MAX_WORKERS, github_get, iter_pages
+from utils.repo_store import RepoStore, get_store
+from utils.report_window import history_start, resolve_window, week_start
+
+# Repos processed at once in batch mode; each one fetches serially, so this also bounds in-flight GitHub calls
+ORG_REPORT_WORKERS = int(os.getenv("ORG_REPORT_WORKERS", str(GITHUB_MAX_WORKERS)))
+# Key of the org-wide series among the per-repo forecast series
+ORG_SERIES = "__org__"
+
+RepoRef = Tuple[str, str]
+
+
+# 🏢 Which repos to report on
+def list_org_repos(org: str, token: Optional[str] = None, include_archived: bool = False) -> List[RepoRef]:
+    """
+    Lists every repo of a GitHub organization, or of a user account when
+    'org' is not an organization. Archived repos are skipped by default.
+    """
+    is_org = github_get(f"/orgs/{org}", token=token).status_code == 200
+    path = f"/orgs/{org}/repos" if is_org else f"/users/{org}/repos"
+    repos = []
+    for page in iter_pages(path, params={"per_page": 100, "type": "all"}, token=token):
+        for item in page:
+            if item.get("archived") and not include_archived:
+                continue
+            repos.append((item["owner"]["login"], item["name"]))
+    print(f"🏢 Found {len(repos)} repos for {org}")
+    return repos
+
+
+def parse_repo_list(names: Iterable[str], default_owner: Optional[str] = None) -> List[RepoRef]:
+    """Turns 'owner/repo' (or bare 'repo' with default_owner) entries into (owner, repo) pairs."""
+    repos = []
+    for name in names:
+        name = name.strip().strip(",")
+        if not name:
+            continue
+        if "/" in name:
+            owner, repo = name.split("/", 1)
+        elif default_owner:
+            owner, repo = default_owner, name
+        else:
+            raise ValueError(f"❌ Expected 'owner/repo', got '{name}'")
+        repos.append((owner, repo))
+    # Same repo listed twice is reported once
+    return list(dict.fromkeys(repos))
+
+
+# 📦 One repo: ingest, then analyze from the stored aggregate
+def report_repo(owner: str, repo: str, since: Optional[str] = None, until: Optional[str] = None,
+                store: Optional[RepoStore] = None, fetch_workers: int = 1) -> Dict[str, Any]:
+    """Totals cover [since, until] (default: last complete week); weekly series keep forecast history."""
+    store = store or get_store()
+    since, until = resolve_window(since, until)
+    new_commits = sync_commits(owner, repo, store=store, max_workers=fetch_workers, floor=history_start(since))
+    churn_data = window_report(owner, repo, since, until, history_since=history_start(since), store=store)
+    churn_data["risky_areas"] = store.top_hotspots(owner, repo, k=5, directories=True, since=since, until=until)
+    return {
+        "owner": owner,
+        "repo": repo,
+        "new_commits": new_commits,
+        "total_churn": sum(churn_data["author_churn"].values()),
+        "churn_data": churn_data
+    }
+
+
+def iter_org_reports(repos: Iterable[RepoRef], since: Optional[str] = None, until: Optional[str] = None,
+                     max_workers: int = ORG_REPORT_WORKERS,
+                     store: Optional[RepoStore] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Runs report_repo for every repo on one bounded thread pool and yields each
+    result as soon as it completes. A repo that fails yields an entry with an
+    'error' instead of stopping the batch.
+    """
+    repos = list(repos)
+    store = store or get_store()
+    workers = max(1, min(max_workers, len(repos) or 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="org-report") as pool:
+        futures = {
+            pool.submit(report_repo, owner, repo, since, until, store): (owner, repo)
+            for owner, repo in repos
+        }
+        for future in as_completed(futures):
+            owner, repo = futures[future]
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"⚠️ Report failed for {owner}/{repo}: {e}")
+                yield {"owner": owner, "repo": repo, "error": str(e)}
+
+
+# 🧮 Org-level rollup
+def org_rollup(results: List[Dict[str, Any]], top_n: int = 5, since: Optional[str] = None,
+               until: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Combines per-repo results: org churn, top authors across repos, the repos
+    with the most churn and risk, and next-week forecasts for the org and
+    every repo from one batched fit over the window's history through 'until'.
+    """
+    succeeded = [result for result in results if "error" not in result]
+    merged = merge_results(result["churn_data"] for result in succeeded)
+
+    repo_churn = {f"{r['owner']}/{r['repo']}": r["total_churn"] for r in succeeded}
+    repo_risk = {f"{r['owner']}/{r['repo']}": len(r["churn_data"]["risky_commits"]) for r in succeeded}
+    series = {ORG_SERIES: merged["weekly_churn"]}
+    series.update({f"{r['owner']}/{r['repo']}": r["churn_data"]["weekly_churn"] for r in succeeded})
+    forecasts = forecast_many(
+        series,
+        first_week=history_start(since)[:10] if since else None,
+        last_week=week_start(until) if until else None
+    )
+
+    return {
+        "repos": len(results),
+        "failed": sorted(f"{r['owner']}/{r['repo']}" for r in results if "error" in r),
+        "total_churn": sum(repo_churn.values()),
+        "risky_commits": sum(repo_risk.values()),
+        "top_authors": sorted(merged["author_churn"].items(), key=lambda item: (-item[1], item[0]))[:top_n],
+        "top_repos": sorted(repo_churn.items(), key=lambda item: (-item[1], item[0]))[:top_n],
+        "riskiest_repos": sorted(
+            ((name, count) for name, count in repo_risk.items() if count),
+            key=lambda item: (-item[1], item[0])
+        )[:top_n],
+        "weekly_churn": merged["weekly_churn"],
+        "forecast": forecasts[ORG_SERIES],
+        "repo_forecasts": {name: result for name, result in forecasts.items() if name != ORG_SERIES}
+    }
+
+
+def run_org_report(repos: Iterable[RepoRef], since: Optional[str] = None, until: Optional[str] = None,
+                   max_workers: int = ORG_REPORT_WORKERS,
+                   on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Runs the batch, passing each repo's result to on_result as it lands, and
+    returns the rollup with the window it covers (default: last complete week).
+    """
+    since, until = resolve_window(since, until)
+    results = []
+    for result in iter_org_reports(repos, since=since, until=until, max_workers=max_workers):
+        results.append(result)
+        if on_result:
+            on_result(result)
+    rollup = org_rollup(results, since=since, until=until)
+    rollup.update(since=since, until=until)
+    print(f"✅ Org report finished: {rollup['repos']} repos, {len(rollup['failed'])} failed")
+    return rollup
+
+
+# 📝 Text output shared by the CLI and the Slack bot
+def format_repo_line(result: Dict[str, Any]) -> str:
+    name = f"{result['owner']}/{result['repo']}"
+    if "error" in result:
+        return f"❌ {name}: {result['error']}"
+    risky = len(result["churn_data"]["risky_commits"])
+    return f"✅ {name}: churn {result['total_churn']}, {risky} risky commits, {result['new_commits']} new"
+
+
+def format_rollup(rollup: Dict[str, Any], title: Optional[str] = None) -> str:
+    lines = [f"*{title or 'Org Dev Insight Report'}* ({rollup['repos']} repos)"]
+    lines.append(f"Total churn: {rollup['total_churn']} · Risky commits: {rollup['risky_commits']}")
+    if rollup["top_repos"]:
+        lines.append("🔥 Top repos: " + ", ".join(f"{name} ({churn})" for name, churn in rollup["top_repos"]))
+    if rollup["top_authors"]:
+        lines.append("👩‍💻 Top authors: " + ", ".join(f"{author} ({churn})" for author, churn in rollup["top_authors"]))
+    if rollup["riskiest_repos"]:
+        lines.append("⚠️ Most risky commits: " + ", ".join(f"{name} ({count})" for name, count in rollup["riskiest_repos"]))
+    forecast = rollup["forecast"]
+    if "forecast_churn" in forecast:
+        lines.append(f"📈 Next week churn: {forecast['forecast_churn']} "
+                     f"(Week of {forecast['forecast_week']}, 95% range {forecast['lower']}–{forecast['upper']})")
+    else:
+        lines.append(f"📈 {forecast['forecast']}")
+    if rollup["failed"]:
+        lines.append("❌ Failed: " + ", ".join(rollup["failed"]))
+    return "\n".join(lines)
@@ -0,0 +1,137 @@
+# agents/review_layout.py
+import hashlib
+import json
+import os
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Tuple
+
+from utils.repo_store import RepoStore, get_store
+
+# networkx, numpy and scipy are imported on first use
+if TYPE_CHECKING:
+    import networkx as nx
+
+# Graphs with more nodes than this skip force-directed layout entirely
+LAYOUT_NODE_THRESHOLD = int(os.getenv("LAYOUT_NODE_THRESHOLD", "300"))
+# Spring iterations when refining a previous layout instead of starting cold
+LAYOUT_WARM_ITERATIONS = int(os.getenv("LAYOUT_WARM_ITERATIONS", "5"))
+# Share of nodes that must already have a position for a warm start
+LAYOUT_WARM_MIN_OVERLAP = 0.5
+
+Position = Tuple[float, float]
+
+
+# 🏅 Reviewer influence from sparse matrices
+def pagerank(graph: "nx.DiGraph", alpha: float = 0.85, tol: float = 1e-10,
+             max_iter: int = 100) -> Dict[Hashable, float]:
+    """
+    Weighted PageRank by power iteration over a SciPy CSR transition matrix.
+    Edges point author -> reviewer, so rank flows to the people whose reviews
+    the most (and most-reviewed) authors depend on.
+    """
+    import numpy as np
+    import scipy.sparse as sp
+
+    nodes = list(graph)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    index = {node: i for i, node in enumerate(nodes)}
+    rows, cols, weights = [], [], []
+    for u, v, weight in graph.edges(data="weight", default=1):
+        rows.append(index[u])
+        cols.append(index[v])
+        weights.append(float(weight))
+
+    adjacency = sp.csr_array((weights, (rows, cols)), shape=(n, n))
+    out_weight = np.asarray(adjacency.sum(axis=1)).ravel()
+    dangling = out_weight == 0
+    inverse = np.divide(1.0, out_weight, out=np.zeros(n), where=~dangling)
+    transition_t = (sp.diags_array(inverse) @ adjacency).T.tocsr()
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        previous = scores
+        scores = alpha * (transition_t @ scores + previous[dangling].sum() / n) + (1 - alpha) / n
+        if np.abs(scores - previous).sum() < n * tol:
+            break
+    return dict(zip(nodes, scores.tolist()))
+
+
+def top_nodes(scores: Dict[Hashable, float], n: int) -> List[Hashable]:
+    return sorted(scores, key=lambda node: (-scores[node], str(node)))[:n]
+
+
+# 🗺️ Layout
+def layout_key(graph: "nx.DiGraph") -> str:
+    """Hash of the weighted edge set: an unchanged graph reuses its stored layout as-is."""
+    edges = sorted((str(u), str(v), float(w)) for u, v, w in graph.edges(data="weight", default=1))
+    nodes = sorted(str(node) for node in graph)
+    return hashlib.sha256(json.dumps([nodes, edges]).encode()).hexdigest()
+
+
+def _warm_positions(graph: "nx.DiGraph", previous: Dict[Hashable, Position]) -> Dict[Hashable, Position]:
+    # Known nodes keep their old spot; new ones start at the centre of their placed neighbours
+    import random
+
+    rng = random.Random(42)
+    initial = {node: tuple(previous[node]) for node in graph if node in previous}
+    for node in graph:
+        if node in initial:
+            continue
+        placed = [initial[other] for other in graph.to_undirected(as_view=True).neighbors(node) if other in initial]
+        if placed:
+            x = sum(p[0] for p in placed) / len(placed) + rng.uniform(-0.05, 0.05)
+            y = sum(p[1] for p in placed) / len(placed) + rng.uniform(-0.05, 0.05)
+        else:
+            x, y = rng.uniform(-1, 1), rng.uniform(-1, 1)
+        initial[node] = (x, y)
+    return initial
+
+
+def compute_layout(graph: "nx.DiGraph", previous: Optional[Dict[Hashable, Position]] = None,
+                   node_threshold: int = LAYOUT_NODE_THRESHOLD) -> Dict[Hashable, Position]:
+    """
+    Spectral layout above node_threshold; otherwise a spring layout, warm-started
+    from 'previous' positions with few iterations when most nodes already have one.
+    """
+    import networkx as nx
+
+    if graph.number_of_nodes() > node_threshold:
+        pos = nx.spectral_layout(graph)
+    elif previous and sum(node in previous for node in graph) >= LAYOUT_WARM_MIN_OVERLAP * len(graph):
+        initial = _warm_positions(graph, previous)
+        # Optimal distance sized to the previous layout's extent, so a few cool iterations barely move known nodes
+        extent = max(max(xy[i] for xy in initial.values()) - min(xy[i] for xy in initial.values()) for i in (0, 1))
+        pos = nx.spring_layout(graph, pos=initial, k=(extent or 1.0) / len(graph) ** 0.5,
+                               iterations=LAYOUT_WARM_ITERATIONS, seed=42)
+    else:
+        pos = nx.spring_layout(graph, seed=42)
+    return {node: (float(xy[0]), float(xy[1])) for node, xy in pos.items()}
+
+
+def cached_layout(owner: str, repo: str, graph: "nx.DiGraph",
+                  store: Optional[RepoStore] = None) -> Dict[Hashable, Position]:
+    """
+    Per-repo layout cache: returns the stored positions when the graph is
+    unchanged, otherwise recomputes (warm-started from them) and saves.
+    """
+    store = store or get_store()
+    key = layout_key(graph)
+    saved = store.load_layout(owner, repo)
+    if saved and saved[0] == key:
+        return {node: tuple(xy) for node, xy in json.loads(saved[1]).items()}
+
+    previous = json.loads(saved[1]) if saved else None
+    pos = compute_layout(graph, previous)
+    store.save_layout(owner, repo, key, json.dumps(pos))
+    return pos
+
+
+def node_sizes(scores: Dict[Hashable, float], nodes: List[Hashable],
+               smallest: float = 1000, largest: float = 5000) -> Dict[Hashable, float]:
+    top = max((scores.get(node, 0.0) for node in nodes), default=0.0) or 1.0
+    return {node: smallest + (largest - smallest) * scores.get(node, 0.0) / top for node in nodes}
+
+
+def describe_top(scores: Dict[Hashable, float], n: int = 5) -> List[Dict[str, Any]]:
+    return [{"login": node, "pagerank": round(scores[node], 4)} for node in top_nodes(scores, n)]
@@ -1,78 +1,201 @@
-import networkx as nx
-import matplotlib.pyplot as plt
-import base64
-from io import BytesIO
 import os
-import requests
-
-def fetch_review_map(owner: str, repo: str, token: str) -> nx.DiGraph:
-    headers = {"Authorization": f"Bearer {token}"}
-    pulls_url = f"https://api.github.com/repos/{owner}/{repo}/pulls?state=all&per_page=20"
-    
-    response = requests.get(pulls_url, headers=headers)
-    if response.status_code != 200:
-        print(f"❌ Error fetching PRs: {response.status_code} - {response.text}")
-        return nx.DiGraph()
-
-    pulls = response.json()
-    graph = nx.DiGraph()
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional
+
+from agents.graphql_ingestor import iter_pull_reviews_graphql
+from agents.review_layout import cached_layout, compute_layout, describe_top, node_sizes, pagerank, top_nodes
+from utils.artifacts import put_artifact
+from utils.chart_renderer import render_review_map
+from utils.github_client import github_get, iter_pages, map_concurrent, GITHUB_BACKEND, GITHUB_MAX_WORKERS
+from utils.repo_store import RepoStore, get_store
+
+# PRs whose reviews are fetched (and stored) together
+PULLS_PER_BATCH = 100
+# Reviewers drawn on the influence map, by PageRank
+REVIEW_MAP_TOP_N = int(os.getenv("REVIEW_MAP_TOP_N", "30"))
+
+# networkx is imported on first use
+if TYPE_CHECKING:
+    import networkx as nx
+
+def iter_pulls(owner: str, repo: str, token: str, since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yields PRs most-recently-updated first, following pagination.
+    With 'since' (ISO-8601), stops at the first PR last updated before it.
+    """
+    pages = iter_pages(
+        f"/repos/{owner}/{repo}/pulls",
+        params={"state": "all", "sort": "updated", "direction": "desc", "per_page": 100},
+        token=token
+    )
+    for pulls in pages:
+        for pr in pulls:
+            if since and (pr.get("updated_at") or "") < since:
+                return
+            yield pr
+
+def _review_counts(reviews: Iterable[Dict[str, Any]], author: Optional[str]) -> Dict[str, int]:
+    # Submitted reviews per reviewer, excluding the PR author's own comments
+    counts: Dict[str, int] = {}
+    for review in reviews:
+        login = (review.get("user") or {}).get("login")
+        if login and login != author:
+            counts[login] = counts.get(login, 0) + 1
+    return counts
 
-    for pr in pulls:
-        pr_number = pr.get("number")
-        author = pr.get("user", {}).get("login")
+def _fetch_pull_reviews(owner: str, repo: str, pr: Dict[str, Any], token: str) -> Optional[Dict[str, Any]]:
+    pr_number = pr.get("number")
+    author = (pr.get("user") or {}).get("login")
 
-        if not author:
+    reviews_response = github_get(f"/repos/{owner}/{repo}/pulls/{pr_number}/reviews", token=token)
+
+    if reviews_response.status_code != 200:
+        print(f"⚠️ Skipped PR #{pr_number}: Failed to fetch reviews")
+        return None
+
+    reviews = _review_counts(reviews_response.json(), author)
+    return {
+        "number": pr_number,
+        "author": author,
+        "updated_at": pr.get("updated_at"),
+        "reviewers": sorted(reviews),
+        "reviews": reviews
+    }
+
+def _iter_pull_batches(owner: str, repo: str, token: str, since: Optional[str] = None,
+                       size: int = PULLS_PER_BATCH) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for pr in iter_pulls(owner, repo, token, since):
+        if not (pr.get("user") or {}).get("login"):
             continue
+        batch.append(pr)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _fetch_batch_reviews(owner: str, repo: str, batch: List[Dict[str, Any]], token: str,
+                         max_workers: Optional[int] = None) -> List[Optional[Dict[str, Any]]]:
+    return map_concurrent(
+        lambda pr: _fetch_pull_reviews(owner, repo, pr, token),
+        batch,
+        max_workers=max_workers or GITHUB_MAX_WORKERS
+    )
+
+def iter_pull_reviews(owner: str, repo: str, token: str, since: Optional[str] = None,
+                      max_workers: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+    """
+    REST path: yields {'number', 'author', 'updated_at', 'reviewers', 'reviews'}
+    per PR. The /pulls/{n}/reviews calls of each batch of PRs run concurrently.
+    """
+    for batch in _iter_pull_batches(owner, repo, token, since):
+        for pull_review in _fetch_batch_reviews(owner, repo, batch, token, max_workers):
+            if pull_review is not None:
+                yield pull_review
 
-        reviews_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
-        reviews_response = requests.get(reviews_url, headers=headers)
+# 🔄 Incremental review sync into the local RepoStore
+def sync_reviews(owner: str, repo: str, token: Optional[str] = None, store: Optional[RepoStore] = None,
+                 backend: str = GITHUB_BACKEND, max_workers: Optional[int] = None) -> int:
+    """
+    Refetches only PRs updated since the last review sync and folds them into
+    the store's weighted review edges. Returns the number of PRs synced.
+    """
+    store = store or get_store()
+    state = store.get_review_sync_state(owner, repo)
+    since = state.get("last_updated_at") if state else None
 
-        if reviews_response.status_code != 200:
-            print(f"⚠️ Skipped PR #{pr_number}: Failed to fetch reviews")
+    newest = None
+    synced = 0
+    dropped = 0
+    if backend == "graphql":
+        batch = []
+        for pull_review in iter_pull_reviews_graphql(owner, repo, token, since):
+            newest = newest or pull_review.get("updated_at")
+            batch.append(pull_review)
+            if len(batch) >= PULLS_PER_BATCH:
+                synced += store.upsert_pull_reviews(owner, repo, batch)
+                batch = []
+        synced += store.upsert_pull_reviews(owner, repo, batch)
+    else:
+        for batch in _iter_pull_batches(owner, repo, token, since):
+            newest = newest or batch[0].get("updated_at")
+            results = _fetch_batch_reviews(owner, repo, batch, token, max_workers)
+            dropped += results.count(None)
+            synced += store.upsert_pull_reviews(owner, repo, [r for r in results if r is not None])
+
+    # A skipped PR must be refetched next run, so the watermark only moves on a clean sync
+    if newest and not dropped:
+        store.set_review_sync_state(owner, repo, newest)
+    elif dropped:
+        print(f"⚠️ {dropped} PRs of {owner}/{repo} failed; they will be retried next sync")
+    print(f"✅ Synced reviews for {owner}/{repo}: {synced} updated PRs")
+    return synced
+
+def build_review_graph(pull_reviews: Iterable[Dict[str, Any]]) -> "nx.DiGraph":
+    """In-memory graph from pull_reviews records; edge 'weight' counts reviews, 'pulls' counts PRs."""
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    for pr in pull_reviews:
+        if not pr.get("author"):
             continue
+        reviews = pr.get("reviews") or {reviewer: 1 for reviewer in pr["reviewers"]}
+        for reviewer, count in reviews.items():
+            if graph.has_edge(pr["author"], reviewer):
+                graph[pr["author"]][reviewer]["weight"] += count
+                graph[pr["author"]][reviewer]["pulls"] += 1
+            else:
+                graph.add_edge(pr["author"], reviewer, weight=count, pulls=1)
+    return graph
 
-        reviews = reviews_response.json()
-        reviewers = {
-            review["user"]["login"]
-            for review in reviews
-            if review.get("user") and review["user"]["login"] != author
-        }
+def load_review_graph(owner: str, repo: str, store: Optional[RepoStore] = None,
+                      since: Optional[str] = None) -> "nx.DiGraph":
+    """Materializes the stored weighted review edges into a DiGraph in one bulk step."""
+    import networkx as nx
 
-        for reviewer in reviewers:
-            graph.add_edge(author, reviewer)
+    store = store or get_store()
+    graph = nx.DiGraph()
+    graph.add_edges_from(
+        (author, reviewer, {"weight": reviews, "pulls": pulls})
+        for author, reviewer, pulls, reviews in store.review_edges(owner, repo, since=since)
+    )
+    return graph
+
+def fetch_review_map(owner: str, repo: str, token: Optional[str] = None, since: Optional[str] = None,
+                     backend: str = GITHUB_BACKEND, store: Optional[RepoStore] = None) -> "nx.DiGraph":
+    try:
+        sync_reviews(owner, repo, token, store=store, backend=backend)
+    except Exception as e:
+        # Keep going with whatever the store already has
+        print(f"❌ Error fetching PRs: {e}")
+
+    graph = load_review_graph(owner, repo, store=store, since=since)
 
     # ✅ Fallback dummy graph for empty maps
     if graph.number_of_nodes() == 0:
         print("⚠️ No review interactions found. Adding dummy graph.")
-        graph.add_edge("Author", "Reviewer")
+        graph.add_edge("Author", "Reviewer", weight=1, pulls=1)
 
     print(f"✅ Review graph built: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
     return graph
 
-def generate_review_map_image(graph: nx.DiGraph) -> str:
-    plt.figure(figsize=(10, 8))
-    pos = nx.spring_layout(graph, seed=42)
-
-    nx.draw(
-        graph, pos,
-        with_labels=True,
-        node_color='lightblue',
-        edge_color='gray',
-        node_size=3000,
-        font_size=10,
-        arrows=True,
-        width=1.5,
-        alpha=0.9
-    )
-
-    image_path = "review_influence_map.png"
-    plt.savefig(image_path)
-
-    buffer = BytesIO()
-    plt.savefig(buffer, format="png")
-    buffer.seek(0)
-    base64_image = base64.b64encode(buffer.read()).decode("utf-8")
-    plt.close()
+def generate_review_map_image(graph: "nx.DiGraph", owner: Optional[str] = None, repo: Optional[str] = None,
+                              top_n: int = REVIEW_MAP_TOP_N, store: Optional[RepoStore] = None) -> str:
+    """
+    Draws the top_n reviewers by weighted PageRank (node size follows rank).
+    With owner/repo, the layout is cached per repo and warm-started on change.
+    Returns the image's artifact handle.
+    """
+    scores = pagerank(graph)
+    shown = graph.subgraph(top_nodes(scores, top_n)) if top_n and len(graph) > top_n else graph
+    positions = cached_layout(owner, repo, shown, store) if owner and repo else compute_layout(shown)
 
-    print(f"📌 Review influence map saved at: {os.path.abspath(image_path)}")
-    return base64_image
+    image = put_artifact(render_review_map(
+        [(u, v, weight) for u, v, weight in shown.edges(data="weight", default=1)],
+        positions=positions,
+        node_sizes=node_sizes(scores, list(shown)),
+        nodes=list(shown.nodes)
+    ))
+    top = ", ".join(entry["login"] for entry in describe_top(scores))
+    print(f"📌 Review influence map rendered: {shown.number_of_nodes()} of {graph.number_of_nodes()} nodes (top: {top})")
+    return image
@@ -1,113 +1,225 @@
-# scheduled_digest.py
-
-import schedule
-import time
+# agents/scheduled.py
+import argparse
+import hashlib
+import json
 import os
-import base64
-import requests
-
-from langgraph.graph import StateGraph, END
-from langchain_core.runnables import RunnableLambda
-from typing import TypedDict, Dict, Any, List
-
-from agents.github_ingestor import fetch_commits_api
-from agents.diff_analyst import analyze_diff
-from agents.insight_narrator import generate_insight
-
-# 🔐 Slack Env Vars
-SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import main
+from agents.github_ingestor import sync_commits
+from utils.metrics import instrumented_run
+from utils.report_window import default_window, window_label
+from utils.repo_store import RepoStore, get_store
+from utils.slack_uploads import upload_artifact
+
+# 🔐 Default Slack channel for jobs that don't name one
 SLACK_CHANNEL_ID = os.getenv("SLACK_CHANNEL_ID")
 
-# LangGraph State
-class GraphState(TypedDict):
-    owner: str
-    repo: str
-    github_data: List[Dict[str, Any]]
-    churn_data: Dict[str, Any]
-    summary: str
-    chart_base64: str
-
-# Nodes
-def fetch_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    github_data = fetch_commits_api.invoke({
-        "input": {
-            "owner": state["owner"],
-            "repo": state["repo"]
+# ⏰ Defaults for every job; a job definition can override day, time and prewarm_hours
+DIGEST_DAY = os.getenv("DIGEST_DAY", "monday")
+DIGEST_TIME = os.getenv("DIGEST_TIME", "09:00")
+# Commits are synced this many hours before the digest, so the digest only analyzes and narrates
+DIGEST_PREWARM_HOURS = float(os.getenv("DIGEST_PREWARM_HOURS", "3"))
+# Each job starts up to this many seconds late (fixed per job), spreading the burst across the API and the LLM
+DIGEST_JITTER_SECONDS = int(os.getenv("DIGEST_JITTER_SECONDS", "600"))
+DIGEST_MAX_CONCURRENT = int(os.getenv("DIGEST_MAX_CONCURRENT", "2"))
+# A digest missed by more than this (scheduler down) is skipped instead of posted late
+DIGEST_GRACE_HOURS = float(os.getenv("DIGEST_GRACE_HOURS", "6"))
+DIGEST_MAX_ATTEMPTS = int(os.getenv("DIGEST_MAX_ATTEMPTS", "3"))
+# A failed run waits this long before its next attempt, doubling each time
+DIGEST_RETRY_BACKOFF_SECONDS = int(os.getenv("DIGEST_RETRY_BACKOFF_SECONDS", "300"))
+# A run still marked running after this long (the scheduler died mid-run) is claimed again
+DIGEST_LEASE_SECONDS = int(os.getenv("DIGEST_LEASE_SECONDS", "3600"))
+DIGEST_TICK_SECONDS = int(os.getenv("DIGEST_TICK_SECONDS", "30"))
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+# 📋 Job definitions
+def load_jobs() -> List[Dict[str, Any]]:
+    """
+    Reads job definitions from DIGEST_JOBS (inline JSON list) or DIGEST_JOBS_PATH
+    (a JSON file), falling back to one job for GITHUB_OWNER/GITHUB_REPO.
+    Each job needs owner and repo; channel, day, time and prewarm_hours are optional.
+    """
+    if os.getenv("DIGEST_JOBS"):
+        jobs = json.loads(os.environ["DIGEST_JOBS"])
+    elif os.getenv("DIGEST_JOBS_PATH"):
+        with open(os.environ["DIGEST_JOBS_PATH"], "r") as f:
+            jobs = json.load(f)
+    else:
+        jobs = [{"owner": os.getenv("GITHUB_OWNER", "vigyat13"), "repo": os.getenv("GITHUB_REPO", "Nivaan-ChatBot")}]
+
+    loaded = []
+    for job in jobs:
+        job = {
+            "id": f"{job['owner']}/{job['repo']}",
+            "channel": SLACK_CHANNEL_ID,
+            "day": DIGEST_DAY,
+            "time": DIGEST_TIME,
+            "prewarm_hours": DIGEST_PREWARM_HOURS,
+            **job
         }
-    })["github_data"]
-    return {**state, "github_data": github_data}
+        job["day"] = job["day"].lower()
+        if job["day"] not in WEEKDAYS:
+            raise ValueError(f"❌ Unknown digest day '{job['day']}' for job {job['id']}")
+        loaded.append(job)
+    return loaded
 
-def analyze_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    churn_data = analyze_diff.invoke({
-        "input": {
-            "github_data": state["github_data"]
-        }
-    })
-    return {**state, "churn_data": churn_data}
-
-def insight_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    insight = generate_insight.invoke({
-        "input": {
-            "author_churn": state["churn_data"]["author_churn"],
-            "risky_commits": state["churn_data"]["risky_commits"]
-        }
-    })
-    return {
-        **state,
-        "summary": insight["summary"],
-        "chart_base64": insight["chart_base64"]
-    }
-
-# LangGraph setup
-workflow = StateGraph(GraphState)
-workflow.add_node("fetch", RunnableLambda(fetch_fn))
-workflow.add_node("analyze", RunnableLambda(analyze_fn))
-workflow.add_node("insight", RunnableLambda(insight_fn))
-workflow.set_entry_point("fetch")
-workflow.add_edge("fetch", "analyze")
-workflow.add_edge("analyze", "insight")
-workflow.add_edge("insight", END)
-graph = workflow.compile()
 
-# 📤 Post to Slack
-def post_to_slack(summary: str, chart_path: str):
-    with open(chart_path, "rb") as image_file:
-        image_data = image_file.read()
-
-    # Upload image
-    img_response = requests.post(
-        "https://slack.com/api/files.upload",
-        headers={"Authorization": f"Bearer {SLACK_BOT_TOKEN}"},
-        files={"file": ("chart.png", image_data, "image/png")},
-        data={
-            "channels": SLACK_CHANNEL_ID,
-            "initial_comment": summary,
-            "title": "Weekly Dev Report - Code Churn"
-        }
+def job_jitter(job_id: str, max_seconds: int = DIGEST_JITTER_SECONDS) -> timedelta:
+    # Derived from the job id, not random: a restarted scheduler computes the same start time
+    digest = hashlib.sha256(job_id.encode("utf-8")).hexdigest()
+    return timedelta(seconds=int(digest[:8], 16) % max(max_seconds, 1))
+
+
+def _weekly_slots(job: Dict[str, Any], now: datetime) -> List[datetime]:
+    # Last week's, this week's and next week's digest time
+    hour, minute = (int(part) for part in job["time"].split(":"))
+    this_week = (now - timedelta(days=now.weekday() - WEEKDAYS.index(job["day"]))).replace(
+        hour=hour, minute=minute, second=0, microsecond=0
+    )
+    return [this_week + timedelta(weeks=offset) for offset in (-1, 0, 1)]
+
+
+def due_runs(job: Dict[str, Any], now: datetime) -> List[Tuple[str, str]]:
+    """
+    Returns the (phase, period) runs that should be in progress at 'now'. The
+    period is the digest slot both phases belong to, e.g. '2025-06-30T09:00'.
+    """
+    jitter = job_jitter(job["id"])
+    runs = []
+    for slot in _weekly_slots(job, now):
+        period = slot.strftime("%Y-%m-%dT%H:%M")
+        digest_at = slot + jitter
+        prewarm_at = digest_at - timedelta(hours=job["prewarm_hours"])
+        if job["prewarm_hours"] > 0 and prewarm_at <= now < digest_at:
+            runs.append(("prewarm", period))
+        if digest_at <= now < digest_at + timedelta(hours=DIGEST_GRACE_HOURS):
+            runs.append(("digest", period))
+    return runs
+
+
+# 🔥 Phases
+def prewarm(job: Dict[str, Any], period: str):
+    """Pulls new commits into the store ahead of the digest."""
+    commits = sync_commits(job["owner"], job["repo"])
+    print(f"🔥 Pre-warmed {job['id']}: {commits} commits")
+
+
+def period_window(period: str) -> Tuple[str, str]:
+    """The complete weeks before the digest slot, e.g. Monday's digest covers the previous Monday-Sunday."""
+    return default_window(now=datetime.strptime(period, "%Y-%m-%dT%H:%M"))
+
+
+def digest(job: Dict[str, Any], period: str):
+    """
+    Runs the commit branch of the report graph over the period's window (fetch
+    is now an incremental no-op) and posts it. The digest shows no influence
+    map, so the review branch is skipped.
+    """
+    since, until = period_window(period)
+    with instrumented_run(entry="scheduler", owner=job["owner"], repo=job["repo"]):
+        result = main.get_commit_graph().invoke({"owner": job["owner"], "repo": job["repo"], "since": since, "until": until})
+    post_to_slack(
+        job["channel"],
+        f"{result['summary']}\n\n📈 {result['forecast']}",
+        result["chart"],
+        title=f"Weekly Dev Report - {job['id']} ({window_label(since, until)})"
     )
 
-    if img_response.status_code != 200 or not img_response.json().get("ok"):
-        print("❌ Slack post failed:", img_response.json())
-    else:
-        print("✅ Slack post successful.")
 
-# 🕓 Weekly digest job (for demo: every 1 min)
-def weekly_digest():
-    print("⏳ Running scheduled LangGraph report...\n")
-    result = graph.invoke({
-        "owner": "vigyat13",
-        "repo": "Nivaan-ChatBot"
-    })
+PHASES = {"prewarm": prewarm, "digest": digest}
+
 
-    summary = result["summary"]
-    chart_path = "churn_chart.png"
-    post_to_slack(summary, chart_path)
+# 📤 Post to Slack
+def post_to_slack(channel: Optional[str], summary: str, chart: str, title: str = "Weekly Dev Report - Code Churn"):
+    if not channel:
+        raise ValueError("❌ No Slack channel configured (set SLACK_CHANNEL_ID or the job's 'channel')")
+    # Raises SlackApiError on failure, so the run is recorded as failed and retried
+    upload_artifact(main.slack_client, channel, chart, title=title, initial_comment=summary)
+    print(f"✅ Slack post successful: {title}")
+
+
+# 🕓 Scheduler
+class DigestScheduler:
+    """
+    Checks every job on each tick and runs due phases on a bounded pool. A run
+    is claimed in the store when it starts, so a restart never repeats a run
+    that finished or is mid-flight; failed runs retry with backoff up to
+    max_attempts, and runs orphaned by a crash are reclaimed after their lease.
+    """
+
+    def __init__(self, jobs: List[Dict[str, Any]], max_concurrent: int = DIGEST_MAX_CONCURRENT,
+                 store: Optional[RepoStore] = None, max_attempts: int = DIGEST_MAX_ATTEMPTS):
+        self.jobs = jobs
+        self.store = store or get_store()
+        self.max_attempts = max_attempts
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="digest")
+        self._pending: Set[Tuple[str, str, str]] = set()
+        self._lock = threading.Lock()
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """Queues every due run not already queued; returns how many were queued."""
+        now = now or datetime.now()
+        queued = 0
+        for job in self.jobs:
+            for phase, period in due_runs(job, now):
+                run = (job["id"], phase, period)
+                with self._lock:
+                    if run in self._pending:
+                        continue
+                    self._pending.add(run)
+                self._pool.submit(self._run, job, phase, period)
+                queued += 1
+        return queued
+
+    def _run(self, job: Dict[str, Any], phase: str, period: str):
+        try:
+            # Claimed only once a worker picks it up: runs still queued at shutdown aren't lost
+            if not self.store.claim_scheduled_run(job["id"], phase, period, self.max_attempts,
+                                                  DIGEST_LEASE_SECONDS, DIGEST_RETRY_BACKOFF_SECONDS):
+                return
+            print(f"⏳ Running {phase} for {job['id']} ({period})")
+            try:
+                PHASES[phase](job, period)
+                status = "done"
+            except Exception as e:
+                print(f"❌ {phase} failed for {job['id']} ({period}): {e}")
+                status = "failed"
+            self.store.finish_scheduled_run(job["id"], phase, period, status)
+        finally:
+            with self._lock:
+                self._pending.discard((job["id"], phase, period))
+
+    def run_forever(self, tick_seconds: int = DIGEST_TICK_SECONDS):
+        while True:
+            self.tick()
+            time.sleep(tick_seconds)
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
 
-# Schedule job
-schedule.every(1).minutes.do(weekly_digest)  # change to `.monday.at("09:00")` later
 
 if __name__ == "__main__":
-    print("🕔 Scheduler started. Running every 1 minute (for demo).")
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--once", action="store_true", help="Run one tick, wait for its runs and exit")
+    args = parser.parse_args()
+
+    jobs = load_jobs()
+    scheduler = DigestScheduler(jobs)
+    for job in jobs:
+        last = scheduler.store.last_scheduled_run(job["id"], "digest")
+        print(f"🗓️ {job['id']}: {job['day']} {job['time']} (+{job_jitter(job['id']).seconds}s jitter), "
+              f"pre-warm {job['prewarm_hours']}h before, last digest: {last['period'] + ' ' + last['status'] if last else 'never'}")
+
+    if args.once:
+        scheduler.tick()
+        scheduler.shutdown()
+    else:
+        print(f"🕔 Scheduler started for {len(jobs)} jobs, up to {DIGEST_MAX_CONCURRENT} at once.")
+        scheduler.run_forever()
@@ -0,0 +1,293 @@
+# agents/snapshot.py
+"""
+Columnar snapshots of commit, file and review records for seeding and replay.
+
+A snapshot is a directory of .npy arrays plus a manifest.json. Arrays are
+memory-mapped on load, so opening even a million-commit snapshot only reads
+the manifest and array headers, and worker processes replaying the same
+snapshot share its pages through the OS cache.
+
+    python -m agents.snapshot pack data/seed_data.json data/seed_snapshot    # JSON -> snapshot
+    python -m agents.snapshot unpack data/seed_snapshot seed_copy.json        # snapshot -> JSON
+    python -m agents.snapshot info data/seed_snapshot
+"""
+import argparse
+import json
+import os
+import shutil
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from agents.commit_columns import CommitColumns, _parse_timestamp
+
+SNAPSHOT_FORMAT = "fika-snapshot"
+SNAPSHOT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+class _Vocabulary:
+    # String -> dense integer code, in first-seen order
+    def __init__(self):
+        self.codes: Dict[Optional[str], int] = {}
+
+    def code(self, value: Optional[str]) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+        return code
+
+    @property
+    def values(self) -> List[Optional[str]]:
+        return list(self.codes)
+
+
+def _file_fields(entry: Any) -> Tuple[str, int, int, Optional[str]]:
+    # Store records carry (path, additions, deletions, status) tuples; REST-style dicts are accepted too
+    if isinstance(entry, dict):
+        return entry.get("filename"), entry.get("additions", 0), entry.get("deletions", 0), entry.get("status")
+    return tuple(entry)
+
+
+# 📦 Writing
+def write_snapshot(path: str, commits: Iterable[Dict[str, Any]],
+                   pull_reviews: Iterable[Dict[str, Any]] = (), **meta: Any) -> Dict[str, Any]:
+    """
+    Writes commit records (with optional 'files') and pull_reviews records
+    ({'number', 'author', 'updated_at', 'reviews' or 'reviewers'}) as a snapshot
+    directory, replacing any snapshot already at path. Returns the manifest.
+    """
+    logins, paths, statuses = _Vocabulary(), _Vocabulary(), _Vocabulary()
+    shas, authors, timestamps, additions, deletions, files_changed = [], [], [], [], [], []
+    file_offsets, file_paths, file_additions, file_deletions, file_statuses = [0], [], [], [], []
+
+    for record in commits:
+        shas.append((record.get("sha") or "").encode("ascii"))
+        authors.append(logins.code(record.get("author")))
+        timestamps.append(_parse_timestamp(record.get("timestamp")))
+        additions.append(record.get("additions", 0))
+        deletions.append(record.get("deletions", 0))
+        files_changed.append(record.get("files_changed", 0))
+        for entry in record.get("files") or ():
+            filename, added, deleted, status = _file_fields(entry)
+            file_paths.append(paths.code(filename))
+            file_additions.append(added or 0)
+            file_deletions.append(deleted or 0)
+            file_statuses.append(statuses.code(status))
+        file_offsets.append(len(file_paths))
+
+    numbers, pull_authors, updated_at, review_offsets, reviewers, review_counts = [], [], [], [0], [], []
+    for pr in pull_reviews:
+        numbers.append(pr.get("number") or 0)
+        pull_authors.append(logins.code(pr.get("author")))
+        updated_at.append(_parse_timestamp(pr.get("updated_at")))
+        counts = pr.get("reviews") or {reviewer: 1 for reviewer in pr.get("reviewers", [])}
+        for reviewer, count in counts.items():
+            reviewers.append(logins.code(reviewer))
+            review_counts.append(count)
+        review_offsets.append(len(reviewers))
+
+    path_blob, path_offsets = _encode_strings(paths.values)
+    arrays = {
+        "commits.sha": np.asarray(shas, dtype="S40"),
+        "commits.author": np.asarray(authors, dtype=np.int32),
+        "commits.timestamp": np.asarray(timestamps, dtype="datetime64[s]"),
+        "commits.additions": np.asarray(additions, dtype=np.int64),
+        "commits.deletions": np.asarray(deletions, dtype=np.int64),
+        "commits.files_changed": np.asarray(files_changed, dtype=np.int64),
+        "files.offsets": np.asarray(file_offsets, dtype=np.int64),
+        "files.path": np.asarray(file_paths, dtype=np.int32),
+        "files.additions": np.asarray(file_additions, dtype=np.int64),
+        "files.deletions": np.asarray(file_deletions, dtype=np.int64),
+        "files.status": np.asarray(file_statuses, dtype=np.int16),
+        "paths.blob": path_blob,
+        "paths.offsets": path_offsets,
+        "pulls.number": np.asarray(numbers, dtype=np.int64),
+        "pulls.author": np.asarray(pull_authors, dtype=np.int32),
+        "pulls.updated_at": np.asarray(updated_at, dtype="datetime64[s]"),
+        "reviews.offsets": np.asarray(review_offsets, dtype=np.int64),
+        "reviews.reviewer": np.asarray(reviewers, dtype=np.int32),
+        "reviews.count": np.asarray(review_counts, dtype=np.int32),
+    }
+    manifest = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        **meta,
+        "counts": {"commits": len(authors), "files": len(file_paths), "pulls": len(numbers), "reviews": len(reviewers)},
+        "logins": logins.values,
+        "statuses": statuses.values,
+        "arrays": {name: {"dtype": array.dtype.str, "shape": list(array.shape)} for name, array in arrays.items()}
+    }
+
+    # Written next to the target and swapped in, so readers never see half a snapshot
+    staging = f"{path.rstrip(os.sep)}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name, array in arrays.items():
+        np.save(os.path.join(staging, f"{name}.npy"), array)
+    with open(os.path.join(staging, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(staging, path)
+
+    print(f"✅ Snapshot written to {path}: {manifest['counts']}")
+    return manifest
+
+
+def _encode_strings(values: List[Optional[str]]) -> Tuple[np.ndarray, np.ndarray]:
+    # UTF-8 blob + offsets: variable-length strings that still memory-map
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), offsets
+
+
+# 📖 Reading
+class Snapshot:
+    """Read-only view over a snapshot directory; arrays are loaded (memory-mapped) on first use."""
+
+    def __init__(self, path: str, mmap: bool = True):
+        self.path = path
+        self.mmap = mmap
+        with open(os.path.join(path, MANIFEST), "r") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"❌ {path} is not a {SNAPSHOT_FORMAT} directory")
+        if self.manifest.get("version", 0) > SNAPSHOT_VERSION:
+            raise ValueError(f"❌ Snapshot version {self.manifest['version']} is newer than supported ({SNAPSHOT_VERSION})")
+        self.logins: List[Optional[str]] = self.manifest["logins"]
+        self.statuses: List[Optional[str]] = self.manifest["statuses"]
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._paths: Optional[List[str]] = None
+
+    def __len__(self) -> int:
+        return self.manifest["counts"]["commits"]
+
+    def array(self, name: str) -> np.ndarray:
+        array = self._arrays.get(name)
+        if array is None:
+            # Empty arrays can't be memory-mapped, so those are read normally
+            shape = self.manifest["arrays"][name]["shape"]
+            mmap_mode = "r" if self.mmap and np.prod(shape) > 0 else None
+            array = self._arrays[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode=mmap_mode)
+        return array
+
+    def commit_columns(self, with_shas: bool = False) -> CommitColumns:
+        """The commits as one CommitColumns batch backed by the mapped arrays (no copy)."""
+        return CommitColumns(
+            authors=self.logins,
+            author_idx=self.array("commits.author"),
+            additions=self.array("commits.additions"),
+            deletions=self.array("commits.deletions"),
+            files_changed=self.array("commits.files_changed"),
+            timestamps=self.array("commits.timestamp"),
+            shas=self.array("commits.sha").astype("U40") if with_shas else None
+        )
+
+    @property
+    def paths(self) -> List[str]:
+        if self._paths is None:
+            blob = self.array("paths.blob").tobytes()
+            offsets = self.array("paths.offsets")
+            self._paths = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+        return self._paths
+
+    def files(self, i: int) -> List[Tuple[str, int, int, Optional[str]]]:
+        """(path, additions, deletions, status) for commit i, like a store record's 'files'."""
+        offsets = self.array("files.offsets")
+        start, end = int(offsets[i]), int(offsets[i + 1])
+        paths = self.paths
+        return [
+            (paths[code], int(added), int(deleted), self.statuses[status])
+            for code, added, deleted, status in zip(
+                self.array("files.path")[start:end].tolist(), self.array("files.additions")[start:end].tolist(),
+                self.array("files.deletions")[start:end].tolist(), self.array("files.status")[start:end].tolist()
+            )
+        ]
+
+    def iter_commits(self, with_files: bool = False) -> Iterator[Dict[str, Any]]:
+        """Store-shaped commit records, rebuilt one at a time."""
+        columns = self.commit_columns(with_shas=True)
+        for i, record in enumerate(columns.to_records()):
+            if not record["sha"]:
+                del record["sha"]
+            if with_files:
+                record["files"] = self.files(i)
+            yield record
+
+    def pull_reviews(self) -> Iterator[Dict[str, Any]]:
+        """pull_reviews records, as sync_reviews stores them."""
+        offsets = self.array("reviews.offsets")
+        reviewers = self.array("reviews.reviewer")
+        counts = self.array("reviews.count")
+        updated = self.array("pulls.updated_at")
+        for i, (number, author) in enumerate(zip(self.array("pulls.number").tolist(), self.array("pulls.author").tolist())):
+            start, end = int(offsets[i]), int(offsets[i + 1])
+            reviews = {self.logins[code]: int(count) for code, count in zip(reviewers[start:end].tolist(), counts[start:end].tolist())}
+            updated_at = None if np.isnat(updated[i]) else f"{np.datetime_as_string(updated[i], unit='s')}Z"
+            yield {
+                "number": number,
+                "author": self.logins[author],
+                "updated_at": updated_at,
+                "reviewers": sorted(reviews),
+                "reviews": reviews
+            }
+
+
+def load_snapshot(path: str, mmap: bool = True) -> Snapshot:
+    return Snapshot(path, mmap=mmap)
+
+
+def is_snapshot(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, MANIFEST))
+
+
+# 🔁 JSON <-> snapshot
+def pack_json(json_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """Seed JSON ({'owner', 'repo', 'github_data', optional 'pull_reviews'}) -> snapshot."""
+    with open(json_path, "r") as f:
+        data = json.load(f)
+    return write_snapshot(
+        snapshot_path, data.get("github_data", []), data.get("pull_reviews", []),
+        owner=data.get("owner"), repo=data.get("repo")
+    )
+
+
+def unpack_json(snapshot_path: str, json_path: str):
+    """Snapshot -> seed JSON, written record by record so large snapshots never sit in memory as dicts."""
+    snapshot = load_snapshot(snapshot_path)
+    with open(json_path, "w") as f:
+        f.write("{\n")
+        f.write(f'  "owner": {json.dumps(snapshot.manifest.get("owner"))},\n')
+        f.write(f'  "repo": {json.dumps(snapshot.manifest.get("repo"))},\n')
+        has_files = snapshot.manifest["counts"]["files"] > 0
+        for key, records in (("github_data", snapshot.iter_commits(with_files=has_files)),
+                             ("pull_reviews", snapshot.pull_reviews())):
+            f.write(f'  "{key}": [')
+            for n, record in enumerate(records):
+                f.write(("," if n else "") + "\n    " + json.dumps(record))
+            f.write("\n  ]" + (",\n" if key == "github_data" else "\n"))
+        f.write("}\n")
+    print(f"✅ Snapshot {snapshot_path} written to {json_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert between seed JSON and columnar snapshots")
+    commands = parser.add_subparsers(dest="command", required=True)
+    pack = commands.add_parser("pack", help="JSON -> snapshot")
+    pack.add_argument("json_path")
+    pack.add_argument("snapshot_path")
+    unpack = commands.add_parser("unpack", help="snapshot -> JSON")
+    unpack.add_argument("snapshot_path")
+    unpack.add_argument("json_path")
+    info = commands.add_parser("info", help="Print a snapshot's manifest summary")
+    info.add_argument("snapshot_path")
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        pack_json(args.json_path, args.snapshot_path)
+    elif args.command == "unpack":
+        unpack_json(args.snapshot_path, args.json_path)
+    else:
+        manifest = load_snapshot(args.snapshot_path).manifest
+        print(json.dumps({key: manifest.get(key) for key in ("owner", "repo", "version", "counts")}, indent=2))
@@ -0,0 +1,203 @@
+# bench/fake_github.py
+"""
+Local fake of the GitHub REST endpoints the pipeline calls, serving
+SyntheticRepo data with an injected per-request latency.
+
+Repo names encode their size: 'synth-c<commits>-p<pulls>[-<anything>]', so a
+benchmark gets a cold repo (nothing in the store yet) for the same data just
+by changing the suffix. Other names get the default repo.
+
+REST responses carry an ETag and answer a matching If-None-Match with 304;
+POST /graphql serves the commit-history and pull-request queries with cursors.
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from synthetic import SyntheticRepo
+
+REPO_NAME = re.compile(r"^synth-c(\d+)-p(\d+)")
+
+
+class FakeGitHub:
+    def __init__(self, latency_ms: float = 20.0, default_commits: int = 500, default_pulls: int = 100,
+                 org_repos: int = 5):
+        self.latency_s = latency_ms / 1000.0
+        self.default_size = (default_commits, default_pulls)
+        self.org_repos = org_repos
+        self.requests = 0
+        self.bytes_sent = 0
+        self.not_modified = 0
+        self.graphql_requests = 0
+        self._repos: Dict[Tuple[int, int], SyntheticRepo] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def repo(self, name: str) -> SyntheticRepo:
+        match = REPO_NAME.match(name)
+        size = (int(match.group(1)), int(match.group(2))) if match else self.default_size
+        with self._lock:
+            if size not in self._repos:
+                self._repos[size] = SyntheticRepo(commits=size[0], pulls=size[1])
+            return self._repos[size]
+
+    def start(self) -> "FakeGitHub":
+        fake = self
+
+        class Handler(_Handler):
+            server_fake = fake
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="fake-github").start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def count(self, size: int, not_modified: bool = False, graphql: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += size
+            self.not_modified += not_modified
+            self.graphql_requests += graphql
+
+
+def _page(items_total: int, query: Dict[str, Any]) -> Tuple[int, int, bool]:
+    page = int(query.get("page", ["1"])[0])
+    per_page = int(query.get("per_page", ["30"])[0])
+    start = (page - 1) * per_page
+    end = min(start + per_page, items_total)
+    return start, end, end < items_total
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_fake: FakeGitHub
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        fake = self.server_fake
+        time.sleep(fake.latency_s)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+        headers: Dict[str, str] = {}
+
+        if parts[0] == "orgs" and len(parts) == 2:
+            body: Any = {"login": parts[1]}
+        elif parts[0] in ("orgs", "users") and parts[-1] == "repos":
+            body = [{"name": f"synth-c1000-p100-{i}", "owner": {"login": parts[1]}, "archived": False}
+                    for i in range(fake.org_repos)]
+        elif parts[0] == "repos" and len(parts) >= 4:
+            repo = fake.repo(parts[2])
+            body = self._repo_route(repo, parts[3:], query, url.path, headers)
+            if body is None:
+                return self._send(404, b"{}", {})
+        else:
+            return self._send(404, b"{}", {})
+
+        data = json.dumps(body).encode("utf-8")
+        headers["ETag"] = f'"{hashlib.sha1(data).hexdigest()}"'
+        if self.headers.get("If-None-Match") == headers["ETag"]:
+            fake.count(0, not_modified=True)
+            return self._send(304, b"", headers)
+        fake.count(len(data))
+        self._send(200, data, headers)
+
+    def do_POST(self):
+        fake = self.server_fake
+        time.sleep(fake.latency_s)
+        if urlparse(self.path).path.rstrip("/") != "/graphql":
+            return self._send(404, b"{}", {})
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", "0"))) or b"{}")
+        variables = payload.get("variables") or {}
+        repo = fake.repo(variables.get("repo", ""))
+        start = int(variables.get("cursor") or 0)
+        size = int(variables.get("pageSize") or 50)
+
+        # Cursors are plain offsets into the newest-first commits / pulls
+        if "history(" in payload.get("query", ""):
+            total = repo.since_index(variables["since"]) if variables.get("since") else repo.n_commits
+            end = min(start + size, total)
+            history = {"nodes": [self._commit_node(repo, i) for i in range(start, end)],
+                       "pageInfo": {"hasNextPage": end < total, "endCursor": str(end)}}
+            body = {"data": {"repository": {"defaultBranchRef": {"target": {"history": history}}}}}
+        else:
+            end = min(start + size, repo.n_pulls)
+            pulls = {"nodes": [self._pull_node(repo, i) for i in range(start, end)],
+                     "pageInfo": {"hasNextPage": end < repo.n_pulls, "endCursor": str(end)}}
+            body = {"data": {"repository": {"pullRequests": pulls}}}
+
+        data = json.dumps(body).encode("utf-8")
+        fake.count(len(data), graphql=True)
+        self._send(200, data, {})
+
+    @staticmethod
+    def _commit_node(repo: SyntheticRepo, i: int) -> Dict[str, Any]:
+        item = repo.list_item(i)
+        return {
+            "oid": item["sha"],
+            "committedDate": item["commit"]["committer"]["date"],
+            "additions": int(repo.additions[i]),
+            "deletions": int(repo.deletions[i]),
+            "changedFilesIfAvailable": int(repo.files_changed[i]),
+            "author": {"date": repo.timestamp(i), "user": {"login": item["author"]["login"]}}
+        }
+
+    @staticmethod
+    def _pull_node(repo: SyntheticRepo, i: int) -> Dict[str, Any]:
+        pull = repo.pull(i)
+        return {
+            "number": pull["number"],
+            "updatedAt": pull["updated_at"],
+            "author": {"login": pull["user"]["login"]},
+            "reviews": {"nodes": [{"author": {"login": r["user"]["login"]}} for r in repo.reviews(pull["number"])]}
+        }
+
+    def _repo_route(self, repo: SyntheticRepo, route, query, path: str, headers: Dict[str, str]):
+        if route == ["commits"]:
+            total = repo.since_index(query["since"][0]) if "since" in query else repo.n_commits
+            start, end, more = _page(total, query)
+            self._link(path, query, more, headers)
+            return [repo.list_item(i) for i in range(start, end)]
+        if len(route) == 2 and route[0] == "commits":
+            return repo.detail(SyntheticRepo.index(route[1]))
+        if route == ["pulls"]:
+            start, end, more = _page(repo.n_pulls, query)
+            self._link(path, query, more, headers)
+            # Newest updates first, like sort=updated&direction=desc
+            return [repo.pull(i) for i in range(start, end)]
+        if len(route) == 3 and route[0] == "pulls" and route[2] == "reviews":
+            return repo.reviews(int(route[1]))
+        return None
+
+    def _link(self, path: str, query: Dict[str, Any], more: bool, headers: Dict[str, str]):
+        if not more:
+            return
+        params = {key: values[0] for key, values in query.items()}
+        params["page"] = str(int(params.get("page", "1")) + 1)
+        encoded = "&".join(f"{key}={value}" for key, value in params.items())
+        headers["Link"] = f'<http://{self.headers["Host"]}{path}?{encoded}>; rel="next"'
+
+    def _send(self, status: int, data: bytes, headers: Dict[str, str]):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
@@ -0,0 +1,76 @@
+# bench/import_time.py
+"""
+Import-time guard for the entry points the bot and CLI load at start-up.
+
+Each module is imported in a fresh interpreter. The run fails (exit 1) when an
+import takes longer than its budget or pulls in a dependency that should only
+load on first use by a pipeline node.
+
+    python bench/import_time.py            # default budget
+    IMPORT_BUDGET_MS=300 python bench/import_time.py
+"""
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "500"))
+REPEAT = int(os.getenv("IMPORT_REPEAT", "3"))
+
+# Module -> extra sys.path entry needed to import it the way its runner does
+ENTRY_POINTS = {
+    "main": ROOT_DIR,
+    "langgraph_pipeline": os.path.join(ROOT_DIR, "bot"),
+    "agents.review_map": ROOT_DIR,
+}
+
+# Heavy packages that must stay out of sys.modules until a node needs them
+LAZY_PACKAGES = [
+    "langgraph", "langchain", "langchain_core", "langchain_groq", "langchain_openai",
+    "matplotlib", "networkx", "sklearn",
+]
+
+PROBE = """
+import json, sys, time
+sys.path.insert(0, {path!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+loaded = sorted({{name.split(".")[0] for name in sys.modules}} & set({lazy!r}))
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(module: str, path: str) -> Dict[str, Any]:
+    """Best-of-REPEAT import time of module in a clean interpreter."""
+    runs = []
+    for _ in range(REPEAT):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE.format(path=path, module=module, lazy=LAZY_PACKAGES)],
+            cwd=ROOT_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "module": module,
+        "ms": round(min(run["seconds"] for run in runs) * 1000, 1),
+        "eagerly_loaded": runs[0]["loaded"]
+    }
+
+
+def main() -> int:
+    results: List[Dict[str, Any]] = [measure(module, path) for module, path in ENTRY_POINTS.items()]
+    failed = False
+    for result in results:
+        over_budget = result["ms"] > IMPORT_BUDGET_MS
+        status = "❌" if over_budget or result["eagerly_loaded"] else "✅"
+        failed |= status == "❌"
+        print(f"{status} import {result['module']}: {result['ms']} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+        if result["eagerly_loaded"]:
+            print(f"   ⚠️ eagerly loaded: {', '.join(result['eagerly_loaded'])}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+# bench/run_bench.py
+"""
+Timed scenarios for each pipeline stage against synthetic data.
+
+GitHub is replaced by a local fake server (bench/fake_github.py) with
+injected latency, and the LLM by a stub that sleeps and answers with a fixed
+summary, so runs are repeatable offline. Every run writes a JSON file under
+bench/results/; pass an earlier one to --compare to flag regressions.
+
+    python bench/run_bench.py
+    python bench/run_bench.py --scenarios analyze_diff,analyze_columns --commits 1000,100000,1000000
+    python bench/run_bench.py --compare bench/results/bench-20250701-120000.json
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fake_github import FakeGitHub
+from synthetic import EPOCH, SyntheticRepo
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+RESULTS_DIR = os.path.join(ROOT_DIR, "bench", "results")
+BENCH_LATENCY_MS = float(os.getenv("BENCH_LATENCY_MS", "20"))
+BENCH_LLM_LATENCY_MS = float(os.getenv("BENCH_LLM_LATENCY_MS", "100"))
+BENCH_REPEAT = int(os.getenv("BENCH_REPEAT", "3"))
+# A scenario whose median time grows by more than this against the baseline fails --compare
+BENCH_REGRESSION_PCT = float(os.getenv("BENCH_REGRESSION_PCT", "20"))
+
+
+def configure(fake: FakeGitHub, workdir: str):
+    """Points the project at the fake server and throwaway stores; must run before project imports."""
+    os.environ.update({
+        "GITHUB_API_URL": fake.url,
+        "GITHUB_BACKEND": "rest",
+        "GITHUB_CACHE": "0",
+        "LLM_CACHE": "0",
+        "REPO_STORE_PATH": os.path.join(workdir, "repo_store.db"),
+        "METRICS_PATH": os.path.join(workdir, "runs.jsonl"),
+        "ARTIFACT_DIR": os.path.join(workdir, "artifacts"),
+    })
+    sys.path.insert(0, ROOT_DIR)
+
+
+def install_stub_llm(latency_s: float):
+    """Swaps the InsightNarrator chat model for a stub with fixed latency and token usage."""
+    from langchain_core.messages import AIMessage
+    from langchain_core.runnables import RunnableLambda
+    import agents.insight_narrator as insight_narrator
+
+    def respond(prompt_value) -> AIMessage:
+        time.sleep(latency_s)
+        prompt_tokens = len(prompt_value.to_string()) // 4
+        return AIMessage(
+            content="Stub summary: churn is concentrated in a few authors; review the risky commits.",
+            usage_metadata={"input_tokens": prompt_tokens, "output_tokens": 20, "total_tokens": prompt_tokens + 20}
+        )
+
+    insight_narrator._llm = RunnableLambda(respond)
+    insight_narrator._chain = None
+
+
+def reset_caches():
+    # In-process chart cache would turn every repeat after the first into a hit
+    import utils.chart_renderer as chart_renderer
+    chart_renderer._renderer = None
+
+
+def cold_repo(commits: int, pulls: int) -> str:
+    # A new name means nothing for it is in the store yet; the fake serves the same data
+    return f"synth-c{commits}-p{pulls}-{uuid.uuid4().hex[:8]}"
+
+
+class SyntheticStream:
+    """Re-iterable stream of store-shaped records, like the pipeline's CommitQuery."""
+
+    def __init__(self, repo: SyntheticRepo):
+        self.repo = repo
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.repo.records()
+
+
+# ⏱️ Scenarios: prepare(size) returns run(), which returns how many items it processed
+def scenario_fetch_commits_api(size: int) -> Callable[[], int]:
+    from agents.github_ingestor import fetch_commits_api
+
+    def run() -> int:
+        result = fetch_commits_api.invoke({"input": {"owner": "bench", "repo": cold_repo(size, 0)}})
+        return len(result["github_data"])
+    return run
+
+
+def scenario_analyze_diff(size: int) -> Callable[[], int]:
+    from agents.diff_analyst import analyze_diff
+
+    stream = SyntheticStream(SyntheticRepo(commits=size, pulls=0))
+
+    def run() -> int:
+        analyze_diff.invoke({"input": {"github_data": stream}})
+        return size
+    return run
+
+
+def scenario_analyze_columns(size: int) -> Callable[[], int]:
+    import numpy as np
+    from agents.commit_columns import CommitColumns
+    from agents.diff_analyst import summarize_commits
+
+    repo = SyntheticRepo(commits=size, pulls=0)
+    columns = CommitColumns(
+        authors=repo.authors,
+        author_idx=repo.author_idx,
+        additions=repo.additions,
+        deletions=repo.deletions,
+        files_changed=repo.files_changed.astype(np.int64),
+        timestamps=np.datetime64("2025-06-30T00:00:00", "s") - repo.age_s.astype("timedelta64[s]")
+    )
+
+    def run() -> int:
+        summarize_commits(columns)
+        return size
+    return run
+
+
+def scenario_render_churn_chart(size: int) -> Callable[[], int]:
+    from utils.chart_renderer import render_churn_chart
+
+    author_churn = {f"dev{i:03d}": 1000 + 37 * i for i in range(size)}
+
+    def run() -> int:
+        reset_caches()
+        render_churn_chart(author_churn)
+        return size
+    return run
+
+
+def scenario_fetch_review_map(size: int) -> Callable[[], int]:
+    from agents.review_map import fetch_review_map
+
+    def run() -> int:
+        graph = fetch_review_map("bench", cold_repo(0, size), None)
+        print(f"   {graph.number_of_edges()} review edges")
+        return size
+    return run
+
+
+def scenario_graph_invoke(size: int) -> Callable[[], int]:
+    import main
+    from utils.metrics import instrumented_run
+
+    main.get_graph()
+    # The synthetic history ends at EPOCH; report on its last week so the window isn't empty
+    until = EPOCH.strftime("%Y-%m-%dT%H:%M:%SZ")
+    since = (EPOCH - timedelta(weeks=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def run() -> int:
+        reset_caches()
+        repo = cold_repo(size, max(size // 10, 1))
+        with instrumented_run(entry="bench", owner="bench", repo=repo):
+            main.get_graph().invoke({"owner": "bench", "repo": repo, "since": since, "until": until})
+        return size
+    return run
+
+
+SCENARIOS: Dict[str, Tuple[Callable[[int], Callable[[], int]], str]] = {
+    "fetch_commits_api": (scenario_fetch_commits_api, "fetch_commits"),
+    "analyze_diff": (scenario_analyze_diff, "commits"),
+    "analyze_columns": (scenario_analyze_columns, "commits"),
+    "render_churn_chart": (scenario_render_churn_chart, "chart_authors"),
+    "fetch_review_map": (scenario_fetch_review_map, "pulls"),
+    "graph_invoke": (scenario_graph_invoke, "graph_commits"),
+}
+
+
+def _last_run_nodes(metrics_path: str) -> Optional[Dict[str, float]]:
+    # Per-node wall time of the most recent instrumented run (graph scenarios only)
+    if not os.path.exists(metrics_path):
+        return None
+    with open(metrics_path, "r") as f:
+        lines = f.read().splitlines()
+    if not lines:
+        return None
+    run = json.loads(lines[-1])
+    return {node["node"]: node["wall_s"] for node in run["nodes"]}
+
+
+def measure(name: str, size: int, repeat: int) -> Dict[str, Any]:
+    prepare, _ = SCENARIOS[name]
+    run = prepare(size)
+    timings = []
+    nodes = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = run()
+        timings.append(time.perf_counter() - started)
+        if name == "graph_invoke":
+            nodes = _last_run_nodes(os.environ["METRICS_PATH"])
+    median = statistics.median(timings)
+    result = {
+        "scenario": name,
+        "size": size,
+        "runs_s": [round(t, 4) for t in timings],
+        "min_s": round(min(timings), 4),
+        "median_s": round(median, 4),
+        "items_per_s": round(items / median, 1) if median else None,
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    }
+    if nodes:
+        result["nodes_s"] = nodes
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold_pct: float) -> bool:
+    """Prints median deltas against a baseline run; returns False when any exceeds threshold_pct."""
+    with open(baseline_path, "r") as f:
+        baseline = {(r["scenario"], r["size"]): r for r in json.load(f)["results"]}
+    ok = True
+    print(f"\n📊 Against {baseline_path} (fail above +{threshold_pct:.0f}%)")
+    for result in results:
+        before = baseline.get((result["scenario"], result["size"]))
+        if not before or not before["median_s"]:
+            continue
+        delta = (result["median_s"] / before["median_s"] - 1) * 100
+        regressed = delta > threshold_pct
+        ok &= not regressed
+        print(f"{'❌' if regressed else '✅'} {result['scenario']}[{result['size']}]: "
+              f"{before['median_s']}s -> {result['median_s']}s ({delta:+.1f}%)")
+    return ok
+
+
+def _sizes(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+
+def _git_sha() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--commits", default="1000,10000,100000", help="Sizes for the analyze scenarios")
+    parser.add_argument("--fetch-commits", default="500,2000")
+    parser.add_argument("--pulls", default="200,1000")
+    parser.add_argument("--chart-authors", default="20,100")
+    parser.add_argument("--graph-commits", default="500,2000")
+    parser.add_argument("--repeat", type=int, default=BENCH_REPEAT)
+    parser.add_argument("--latency-ms", type=float, default=BENCH_LATENCY_MS)
+    parser.add_argument("--llm-latency-ms", type=float, default=BENCH_LLM_LATENCY_MS)
+    parser.add_argument("--output", help="Results file (default bench/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare medians against")
+    args = parser.parse_args()
+
+    fake = FakeGitHub(latency_ms=args.latency_ms).start()
+    workdir = tempfile.mkdtemp(prefix="fika-bench-")
+    configure(fake, workdir)
+    install_stub_llm(args.llm_latency_ms / 1000.0)
+
+    results = []
+    for name in args.scenarios.split(","):
+        if name not in SCENARIOS:
+            raise ValueError(f"❌ Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+        for size in _sizes(getattr(args, SCENARIOS[name][1])):
+            print(f"⏱️ {name}[{size}] x{args.repeat}...")
+            result = measure(name, size, args.repeat)
+            results.append(result)
+            print(f"   ✅ median {result['median_s']}s ({result['items_per_s']}/s), max RSS {result['max_rss_mb']} MB")
+
+    fake.stop()
+    report = {
+        "meta": {
+            "timestamp": datetime.now().strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_sha": _git_sha(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "latency_ms": args.latency_ms,
+            "llm_latency_ms": args.llm_latency_ms,
+            "repeat": args.repeat,
+            "github_requests": fake.requests,
+        },
+        "results": results
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
+
+    if args.compare and not compare(results, args.compare, BENCH_REGRESSION_PCT):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
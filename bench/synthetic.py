@@ -0,0 +1,127 @@
+# bench/synthetic.py
+"""
+Deterministic synthetic repositories for benchmarks.
+
+Commit, file and review data are generated from a seed into NumPy arrays, so
+a million-commit repo costs a few dozen MB and any record can be rebuilt on
+demand in the shape the pipeline expects (store records) or the shape GitHub
+returns (REST list items, commit details, pulls, reviews).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+EPOCH = datetime(2025, 6, 30, tzinfo=timezone.utc)
+
+
+class SyntheticRepo:
+    """
+    'commits' commits by 'authors' authors spread over 'weeks' weeks (newest
+    first, like the GitHub API), each touching a few files in 'directories'
+    top-level directories, plus 'pulls' PRs reviewed by 'reviewers_per_pull'
+    other authors each.
+    """
+
+    def __init__(self, commits: int = 1000, authors: int = 20, pulls: int = 200,
+                 reviewers_per_pull: int = 2, files_per_commit: float = 4.0,
+                 directories: int = 30, weeks: int = 26, seed: int = 42):
+        rng = np.random.default_rng(seed)
+        self.n_commits = commits
+        self.n_pulls = pulls
+        self.authors = [f"dev{i:03d}" for i in range(authors)]
+        self.directories = [f"pkg{i:02d}" for i in range(directories)]
+        self.reviewers_per_pull = min(reviewers_per_pull, max(authors - 1, 0))
+
+        # Skewed activity: a few authors and directories get most of the work
+        author_weights = 1.0 / np.arange(1, authors + 1)
+        self.author_idx = rng.choice(authors, size=commits, p=author_weights / author_weights.sum()).astype(np.int32)
+        self.additions = rng.lognormal(3.5, 1.2, size=commits).astype(np.int64)
+        self.deletions = (self.additions * rng.uniform(0.1, 0.9, size=commits)).astype(np.int64)
+        self.files_changed = np.maximum(1, rng.poisson(files_per_commit, size=commits)).astype(np.int32)
+        dir_weights = 1.0 / np.arange(1, directories + 1) ** 0.8
+        self.dir_idx = rng.choice(directories, size=commits, p=dir_weights / dir_weights.sum()).astype(np.int32)
+        # Seconds before EPOCH, increasing with the index: commit 0 is the newest
+        span = weeks * 7 * 24 * 3600
+        self.age_s = np.sort(rng.integers(0, span, size=commits)).astype(np.int64)
+
+        self.pull_author = rng.integers(0, authors, size=pulls).astype(np.int32)
+        self.pull_age_s = np.sort(rng.integers(0, span, size=pulls)).astype(np.int64)
+        self.pull_reviews = rng.integers(1, 4, size=(pulls, max(self.reviewers_per_pull, 1))).astype(np.int32)
+
+    # 🔑 Identifiers
+    @staticmethod
+    def sha(i: int) -> str:
+        return f"{i:040x}"
+
+    @staticmethod
+    def index(sha: str) -> int:
+        return int(sha, 16)
+
+    def timestamp(self, i: int) -> str:
+        return (EPOCH - timedelta(seconds=int(self.age_s[i]))).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def since_index(self, since: str) -> int:
+        """Number of commits at or after 'since' (they are the first ones)."""
+        cutoff = (EPOCH - datetime.strptime(since[:19], "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)).total_seconds()
+        return int(np.searchsorted(self.age_s, cutoff, side="right"))
+
+    def files(self, i: int) -> List[Dict[str, Any]]:
+        n = int(self.files_changed[i])
+        base = self.directories[int(self.dir_idx[i])]
+        additions = np.full(n, int(self.additions[i]) // n)
+        additions[0] += int(self.additions[i]) - int(additions.sum())
+        deletions = np.full(n, int(self.deletions[i]) // n)
+        deletions[0] += int(self.deletions[i]) - int(deletions.sum())
+        return [
+            {"filename": f"{base}/module{(i * 7 + k) % 50}.py", "additions": int(additions[k]),
+             "deletions": int(deletions[k]), "status": "modified"}
+            for k in range(n)
+        ]
+
+    # 📦 Store-shaped records (what ingestion produces)
+    def record(self, i: int, with_files: bool = False) -> Dict[str, Any]:
+        record = {
+            "sha": self.sha(i),
+            "author": self.authors[int(self.author_idx[i])],
+            "timestamp": self.timestamp(i),
+            "additions": int(self.additions[i]),
+            "deletions": int(self.deletions[i]),
+            "files_changed": int(self.files_changed[i])
+        }
+        if with_files:
+            record["files"] = [(f["filename"], f["additions"], f["deletions"], f["status"]) for f in self.files(i)]
+        return record
+
+    def records(self, with_files: bool = False) -> Iterator[Dict[str, Any]]:
+        for i in range(self.n_commits):
+            yield self.record(i, with_files)
+
+    # 🌐 GitHub REST shapes
+    def list_item(self, i: int) -> Dict[str, Any]:
+        timestamp = self.timestamp(i)
+        return {
+            "sha": self.sha(i),
+            "author": {"login": self.authors[int(self.author_idx[i])]},
+            "commit": {"author": {"date": timestamp}, "committer": {"date": timestamp}}
+        }
+
+    def detail(self, i: int) -> Dict[str, Any]:
+        return {
+            **self.list_item(i),
+            "stats": {"additions": int(self.additions[i]), "deletions": int(self.deletions[i])},
+            "files": self.files(i)
+        }
+
+    def pull(self, i: int) -> Dict[str, Any]:
+        updated_at = (EPOCH - timedelta(seconds=int(self.pull_age_s[i]))).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return {"number": i + 1, "user": {"login": self.authors[int(self.pull_author[i])]}, "updated_at": updated_at}
+
+    def reviews(self, number: int) -> List[Dict[str, Any]]:
+        i = number - 1
+        author = int(self.pull_author[i])
+        reviews = []
+        for k in range(self.reviewers_per_pull):
+            reviewer = self.authors[(author + 1 + (i + k * 3) % (len(self.authors) - 1)) % len(self.authors)]
+            reviews.extend({"user": {"login": reviewer}, "state": "COMMENTED"} for _ in range(int(self.pull_reviews[i, k])))
+        return reviews
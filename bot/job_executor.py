@@ -0,0 +1,143 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+REPORT_QUEUE_DEPTH = int(os.getenv("REPORT_QUEUE_DEPTH", "10"))
+
+ProgressFn = Callable[[str], None]
+
+
+class QueueFullError(Exception):
+    """Raised when a new report would exceed the queue depth."""
+
+
+class Job:
+    """One report run, shared by every requester with the same key."""
+
+    def __init__(self, key: Hashable):
+        self.key = key
+        self.future: Future = Future()
+        self.listeners: List[ProgressFn] = []
+        self.started = False
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Optional[ProgressFn]):
+        if listener:
+            with self._lock:
+                self.listeners.append(listener)
+
+    def progress(self, message: str):
+        with self._lock:
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(message)
+            except Exception as e:
+                print(f"⚠️ Progress listener failed for {self.key}: {e}")
+
+
+class JobExecutor:
+    """
+    Runs report jobs on a bounded worker pool with single-flight semantics:
+    a request whose key matches a queued or running job joins it instead of
+    starting another run, and every requester's future gets the same result.
+    At most max_queue jobs wait for a worker; beyond that submit() raises
+    QueueFullError so callers can shed load instead of piling up threads.
+    """
+
+    def __init__(self, max_workers: int = REPORT_WORKERS, max_queue: int = REPORT_QUEUE_DEPTH):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report")
+        self._inflight: Dict[Hashable, Job] = {}
+        self._queued = 0
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, key: Hashable, fn: Callable[[ProgressFn], Any],
+               on_progress: Optional[ProgressFn] = None) -> Future:
+        """
+        Schedules fn(progress) under key, or joins the in-flight job with the
+        same key. on_progress receives this job's status messages.
+        """
+        with self._lock:
+            job = self._inflight.get(key)
+            joined = job is not None
+            if joined:
+                job.add_listener(on_progress)
+                self.coalesced += 1
+            else:
+                if self._queued >= self.max_queue:
+                    self.rejected += 1
+                    raise QueueFullError(f"❌ Report queue is full ({self.max_queue} waiting)")
+                job = Job(key)
+                job.add_listener(on_progress)
+                self._inflight[key] = job
+                self._queued += 1
+                self.submitted += 1
+            ahead = self._ahead(job)
+
+        # Listeners may post to Slack, so they're called outside the lock
+        if joined:
+            if on_progress:
+                if ahead:
+                    on_progress(f"⏳ Same report is already queued behind {ahead} other report(s); you'll get its result")
+                else:
+                    on_progress("⏳ Same report is already running; you'll get its result")
+            return job.future
+
+        if ahead:
+            job.progress(f"🕒 Queued behind {ahead} other report(s)")
+        self._pool.submit(self._run, job, fn)
+        return job.future
+
+    def _running(self) -> int:
+        return sum(1 for job in self._inflight.values() if job.started)
+
+    def _ahead(self, job: Job) -> int:
+        # Workers take jobs in submission order: a job waits when the jobs queued
+        # before it fill every free worker, and then all of those plus the running ones are ahead
+        if job.started:
+            return 0
+        waiting = [other for other in self._inflight.values() if not other.started]
+        position = waiting.index(job)
+        running = self._running()
+        return running + position if position >= self.max_workers - running else 0
+
+    def _run(self, job: Job, fn: Callable[[ProgressFn], Any]):
+        with self._lock:
+            self._queued -= 1
+            job.started = True
+        try:
+            result = fn(job.progress)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+                self._inflight.pop(job.key, None)
+            job.future.set_exception(e)
+            return
+        with self._lock:
+            self.completed += 1
+            self._inflight.pop(job.key, None)
+        job.future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "running": self._running(),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "failed": self.failed
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
@@ -1,50 +1,75 @@
 import os
 import sys
-import base64
-from datetime import datetime, timedelta
 
 # Dynamically add root directory to import path so `main.py` can be imported
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.abspath(os.path.join(current_dir, ".."))
 sys.path.insert(0, root_dir)
 
-from main import graph  # ✅ make sure main.py contains LangGraph setup
+import main  # ✅ the LangGraph pipeline is compiled on first run, not at bot start-up
+from utils.metrics import instrumented_run
+from utils.report_window import default_window, window_label
 
-def get_last_week_range():
-    """Returns the Monday date of the last complete week."""
-    today = datetime.today()
-    last_monday = today - timedelta(days=today.weekday() + 7)
-    return last_monday.strftime("%Y-%m-%d")
+# Status line sent when each pipeline node finishes
+PROGRESS_MESSAGES = {
+    "fetch": "📥 Commits synced",
+    "analyze": "🧮 Churn analyzed",
+    "insight": "🧠 Summary written",
+}
 
-def run_pipeline(owner=None, repo=None):
+def run_pipeline(owner=None, repo=None, on_progress=None, since=None, until=None):
     print("🔁 Running LangGraph pipeline via Slack bot...")
 
     # Fallback to .env if not provided
     owner = owner or os.getenv("GITHUB_OWNER", "vigyat13")
     repo = repo or os.getenv("GITHUB_REPO", "Nivaan-ChatBot")
 
-    print(f"📂 Repo: {owner}/{repo}")
+    # 🗓️ The report covers exactly the week its title names
+    if not (since and until):
+        since, until = default_window()
 
-    result = graph.invoke({
-        "owner": owner,
-        "repo": repo
-    })
+    print(f"📂 Repo: {owner}/{repo} ({since} to {until})")
+
+    # Stream node updates so callers can report progress; the result is the input plus every update
+    result = {"owner": owner, "repo": repo, "since": since, "until": until}
+    with instrumented_run(entry="bot", owner=owner, repo=repo):
+        for namespace, update in main.get_graph().stream(dict(result), stream_mode="updates", subgraphs=True):
+            for node, delta in update.items():
+                if not namespace:
+                    result.update(delta or {})
+                if on_progress and node in PROGRESS_MESSAGES:
+                    on_progress(PROGRESS_MESSAGES[node])
 
     summary_raw = result.get("summary", "[No summary generated]")
-    week_start = get_last_week_range()
-    summary = f"**Weekly Developer Productivity Report (Week of {week_start})**\n\n{summary_raw}"
-
-    # Chart path is always saved to the root dir
-    chart_path = os.path.join(root_dir, "churn_chart.png")
-    try:
-        with open(chart_path, "rb") as f:
-            chart_base64 = base64.b64encode(f.read()).decode("utf-8")
-    except FileNotFoundError:
-        print("❌ Error: churn_chart.png not found at", chart_path)
-        chart_base64 = ""
+    summary = f"**Weekly Developer Productivity Report ({window_label(since, until)})**\n\n{summary_raw}"
+
+    # Chart comes back from the pipeline as an artifact handle; nothing is read from disk
+    chart = result.get("chart", "")
+    if not chart:
+        print("❌ Error: pipeline returned no churn chart")
 
     return {
         "summary": summary,
-        "chart_base64": chart_base64
+        "chart": chart
     }
 
+
+def run_org_pipeline(org=None, repos=None, on_result=None, since=None, until=None):
+    """
+    Batch mode: ingests and analyzes every repo of 'org' (or the given
+    owner/repo list) on one bounded pool. on_result gets each repo's result
+    as it completes; the return value carries the org rollup.
+    """
+    from agents.org_report import list_org_repos, parse_repo_list, run_org_report, format_rollup
+
+    print("🏢 Running org report via Slack bot...")
+    repo_refs = parse_repo_list(repos, default_owner=org) if repos else list_org_repos(org)
+    if not (since and until):
+        since, until = default_window()
+    rollup = run_org_report(repo_refs, since=since, until=until, on_result=on_result)
+
+    scope = f"`{org}`" if org else f"{len(repo_refs)} repos"
+    return {
+        "summary": format_rollup(rollup, title=f"Org Developer Report for {scope} ({window_label(since, until)})"),
+        "rollup": rollup
+    }
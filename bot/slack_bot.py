@@ -1,74 +1,193 @@
 import os
-import base64
+import threading
 import traceback
 from slack_bolt import App
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 from dotenv import load_dotenv
-from langgraph_pipeline import run_pipeline  # ✅ Must accept owner, repo args
+from langgraph_pipeline import run_pipeline, run_org_pipeline  # ✅ Must accept owner, repo args
+from utils.report_window import default_window
+from job_executor import JobExecutor, QueueFullError
+from utils.artifacts import get_artifacts
+from utils.slack_uploads import upload_artifact
+from utils.metrics import registry, start_metrics_server
 
 # Load environment variables from .env
 load_dotenv()
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
+# Per-repo result lines collected into each threaded Slack message during batch reports
+ORG_STREAM_BATCH = int(os.getenv("ORG_STREAM_BATCH", "10"))
 
 # Initialize Slack App
 app = App(token=SLACK_BOT_TOKEN)
 
-@app.command("/dev-report")
-def handle_dev_report(ack, body, respond, command):
-    ack()  # Acknowledge the command early
-
-    user = body.get("user_name")
-    channel_id = body.get("channel_id")
-    text = command.get("text", "").strip()  # Extract command text
-
-    print(f"✅ /dev-report command received from @{user} in channel {channel_id} with text: '{text}'")
+# 🧵 Reports run on a bounded pool; identical in-flight requests share one run
+executor = JobExecutor()
+registry.register_gauge("report_jobs", lambda: {
+    state: value for state, value in executor.stats().items() if state in ("queued", "running")
+}, label="state")
+registry.register_gauge("artifacts_in_memory", lambda: get_artifacts().stats(), label="measure")
 
+def deliver_report(future, channel_id, respond, owner, repo):
+    """Posts a finished (or failed) report for one requester."""
     try:
-        # Parse optional owner and repo from text
-        if text:
-            parts = text.split()
-            owner = parts[0] if len(parts) > 0 else os.getenv("GITHUB_OWNER", "vigyat13")
-            repo = parts[1] if len(parts) > 1 else os.getenv("GITHUB_REPO", "Nivaan-ChatBot")
-        else:
-            owner = os.getenv("GITHUB_OWNER", "vigyat13")
-            repo = os.getenv("GITHUB_REPO", "Nivaan-ChatBot")
-
-        respond(f"🔍 Generating report for *{owner}/{repo}*...")
-
-        # Run LangGraph pipeline
-        result = run_pipeline(owner=owner, repo=repo)
+        result = future.result()
         summary = result.get("summary", "")
-        chart_base64 = result.get("chart_base64", "")
+        chart = result.get("chart", "")
 
-        if not chart_base64:
+        if not chart:
             respond("⚠️ No chart generated. Please ensure the pipeline ran correctly.")
             return
 
-        # Save chart to file
-        chart_path = "churn_chart.png"
-        with open(chart_path, "wb") as f:
-            f.write(base64.b64decode(chart_base64))
-        print("📊 Chart saved locally")
-
-        # Upload to Slack
-        response = app.client.files_upload_v2(
-            channel=channel_id,
-            file=chart_path,
-            filename="churn_chart.png",
+        # Upload straight from memory; an unchanged chart links the earlier upload
+        file_id = upload_artifact(
+            app.client, channel_id, chart,
             title=f"Developer Report: {owner}/{repo}",
             initial_comment=summary
         )
 
-        print("📎 File uploaded to Slack:", response["file"]["id"])
+        print("📎 File posted to Slack:", file_id)
 
     except Exception as e:
         print("❌ Exception occurred while handling /dev-report:\n", traceback.format_exc())
         respond("❌ Something went wrong while generating the report. Please try again later.")
 
+class StatusMessage:
+    """
+    One requester's progress as a single channel message, posted on the first
+    update and edited in place after that. respond() (response_url) allows only
+    five uses per command, so it is kept for the acknowledgement and errors.
+    """
+
+    def __init__(self, channel_id, header):
+        self.channel_id = channel_id
+        self.header = header
+        self.ts = None
+        self.lines = []
+        self._lock = threading.Lock()
+
+    def __call__(self, message):
+        with self._lock:
+            self.lines.append(message)
+            text = "\n".join([self.header] + self.lines)
+            try:
+                if self.ts is None:
+                    self.ts = app.client.chat_postMessage(channel=self.channel_id, text=text)["ts"]
+                else:
+                    app.client.chat_update(channel=self.channel_id, ts=self.ts, text=text)
+            except Exception as e:
+                print(f"⚠️ Could not post report progress to Slack: {e}")
+
+class RepoResultStream:
+    """Streams batch-mode per-repo results into one Slack thread, a few lines per message."""
+
+    def __init__(self, channel_id, header):
+        self.channel_id = channel_id
+        self.header = header
+        self.thread_ts = None
+        self.lines = []
+
+    def __call__(self, result):
+        from agents.org_report import format_repo_line
+
+        self.lines.append(format_repo_line(result))
+        if len(self.lines) >= ORG_STREAM_BATCH:
+            self.flush()
+
+    def flush(self):
+        if not self.lines:
+            return
+        text, self.lines = "\n".join(self.lines), []
+        try:
+            if self.thread_ts is None:
+                self.thread_ts = app.client.chat_postMessage(channel=self.channel_id, text=self.header)["ts"]
+            app.client.chat_postMessage(channel=self.channel_id, thread_ts=self.thread_ts, text=text)
+        except Exception as e:
+            print(f"⚠️ Could not stream repo results to Slack: {e}")
+
+def run_org_job(channel_id, org, repos, since=None, until=None):
+    stream = RepoResultStream(channel_id, f"📦 Per-repo results for {org or ', '.join(repos)}")
+    try:
+        return run_org_pipeline(org=org, repos=repos, on_result=stream, since=since, until=until)
+    finally:
+        stream.flush()
+
+def deliver_org_report(future, channel_id, respond):
+    """Posts a finished (or failed) org rollup for one requester."""
+    try:
+        result = future.result()
+        app.client.chat_postMessage(channel=channel_id, text=result["summary"])
+        print(f"📨 Org report posted to {channel_id}")
+    except Exception:
+        print("❌ Exception occurred while handling /dev-report org:\n", traceback.format_exc())
+        respond("❌ Something went wrong while generating the org report. Please try again later.")
+
+def handle_batch_report(channel_id, respond, org, repos):
+    """`/dev-report org <org>` or `/dev-report owner/repo owner/repo ...`"""
+    scope = f"org *{org}*" if org else f"*{len(repos)}* repos"
+    respond(f"🏢 Generating batch report for {scope}; per-repo results will stream into a thread...")
+
+    since, until = default_window()
+    try:
+        future = executor.submit(
+            ("org", org, tuple(repos or ()), since, until),
+            lambda progress: run_org_job(channel_id, org, repos, since, until),
+            on_progress=StatusMessage(channel_id, f"🏢 Batch report for {scope}")
+        )
+    except QueueFullError:
+        respond("🚦 Too many reports are queued right now. Please try again in a minute.")
+        return
+
+    future.add_done_callback(lambda done: deliver_org_report(done, channel_id, respond))
+
+@app.command("/dev-report")
+def handle_dev_report(ack, body, respond, command):
+    ack()  # Acknowledge the command early
+
+    user = body.get("user_name")
+    channel_id = body.get("channel_id")
+    text = command.get("text", "").strip()  # Extract command text
+
+    print(f"✅ /dev-report command received from @{user} in channel {channel_id} with text: '{text}'")
+
+    # Batch mode: an org name, or one or more owner/repo names
+    parts = text.split()
+    if len(parts) == 2 and parts[0].lower() == "org":
+        handle_batch_report(channel_id, respond, parts[1], None)
+        return
+    if parts and all("/" in part for part in parts):
+        handle_batch_report(channel_id, respond, None, [part.strip(",") for part in parts])
+        return
+
+    # Parse optional owner and repo from text
+    if text:
+        parts = text.split()
+        owner = parts[0] if len(parts) > 0 else os.getenv("GITHUB_OWNER", "vigyat13")
+        repo = parts[1] if len(parts) > 1 else os.getenv("GITHUB_REPO", "Nivaan-ChatBot")
+    else:
+        owner = os.getenv("GITHUB_OWNER", "vigyat13")
+        repo = os.getenv("GITHUB_REPO", "Nivaan-ChatBot")
+
+    respond(f"🔍 Generating report for *{owner}/{repo}*...")
+
+    # The listener returns right away; the job edits one status message and posts the result itself
+    since, until = default_window()
+    try:
+        future = executor.submit(
+            (owner, repo, since, until),
+            lambda progress: run_pipeline(owner=owner, repo=repo, on_progress=progress, since=since, until=until),
+            on_progress=StatusMessage(channel_id, f"🔍 Report for *{owner}/{repo}*")
+        )
+    except QueueFullError:
+        respond("🚦 Too many reports are queued right now. Please try again in a minute.")
+        return
+
+    future.add_done_callback(lambda done: deliver_report(done, channel_id, respond, owner, repo))
+
 # Entry point
 if __name__ == "__main__":
     print("🚀 Starting Fika MVP Slack bot...")
+    start_metrics_server()  # 📈 /metrics when METRICS_PORT is set
     handler = SocketModeHandler(app, SLACK_APP_TOKEN)
     handler.start()
 
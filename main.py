@@ -1,102 +1,209 @@
 import os
 import argparse
-from langgraph.graph import StateGraph, END
-from langchain_core.runnables import RunnableLambda
-from typing import TypedDict, Dict, Any, List
+import threading
+from typing import TypedDict, Dict, Any, Iterable, List
 
-from agents.github_ingestor import fetch_commits_api
-from agents.diff_analyst import analyze_diff
-from agents.insight_narrator import generate_insight
-from agents.forecaster import forecast_next_week
-from agents.review_map import fetch_review_map, generate_review_map_image
+# 💤 Agents (langchain, numpy, matplotlib, networkx, LLM clients) are imported
+# inside the node that needs them, and the graph is compiled on first access,
+# so importing this module stays cheap for the bot and CLI.
 
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from dotenv import load_dotenv
 
+from utils.metrics import instrument_node, instrumented_run
+
 # Load environment variables
 load_dotenv()
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 SLACK_CHANNEL = os.getenv("SLACK_CHANNEL", "#general")
-GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 slack_client = WebClient(token=SLACK_BOT_TOKEN)
 
+# Key of the whole-team series among the per-author forecast series
+TEAM_SERIES = "__team__"
+
 # Shared state
-class GraphState(TypedDict):
+class CommitState(TypedDict):
     owner: str
     repo: str
-    github_data: List[Dict[str, Any]]
+    since: str
+    until: str
+    github_data: Iterable[Dict[str, Any]]
     churn_data: Dict[str, Any]
     summary: str
-    chart_base64: str
+    # Artifact handles (utils/artifacts.py), not image bytes: state stays small however big the charts get
+    chart: str
     forecast: str
+    author_forecasts: Dict[str, Dict[str, Any]]
+
+class GraphState(CommitState):
     influence_map: str
+    pull_reviews: Iterable[Dict[str, Any]]
 
 # Nodes
+# Each node returns only the keys it produces, so nodes running in the same step never write the same key
 
 def fetch_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    github_data = fetch_commits_api.invoke({
-        "input": {"owner": state["owner"], "repo": state["repo"]}
-    })["github_data"]
-    return {**state, "github_data": github_data}
+    from agents.github_ingestor import sync_commits
+    from utils.repo_store import get_store
+    from utils.report_window import history_start, resolve_window
+
+    # 🔁 Replays (seed data, snapshots) pass their commits in; nothing to sync or query
+    if state.get("github_data") is not None:
+        return {}
+    # 🗓️ No since/until means the default window (last complete week), never all of history
+    since, until = resolve_window(state.get("since"), state.get("until"))
+    # Only commits newer than the last sync hit the network; the report streams from the local store
+    sync_commits(state["owner"], state["repo"], floor=history_start(since))
+    github_data = get_store().query_commits(state["owner"], state["repo"], since=since, until=until)
+    return {"github_data": github_data, "since": since, "until": until}
 
 def analyze_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    churn_data = analyze_diff.invoke({
-        "input": {"github_data": state["github_data"]}
-    })
-    return {**state, "churn_data": churn_data}
+    from agents.churn_aggregate import window_report
+    from agents.diff_analyst import analyze_diff
+    from agents.github_ingestor import tracks_files
+    from utils.github_client import GITHUB_BACKEND
+    from utils.repo_store import CommitQuery, get_store
+    from utils.report_window import history_start
+
+    if not isinstance(state["github_data"], CommitQuery):
+        # 🔁 Replayed commits are analyzed as given
+        churn_data = analyze_diff.invoke({"input": {"github_data": state["github_data"]}})
+    else:
+        # 🧮 Stored repos fold only newly synced commits into their saved aggregate, so a weekly
+        # report costs the weekly delta; weekly series reach back further for the forecasts
+        since, until = state["since"], state["until"]
+        churn_data = window_report(state["owner"], state["repo"], since, until, history_since=history_start(since))
+    # 🔥 Risky areas rank the per-file churn the store keeps for the window, no extra API calls
+    churn_data["risky_areas"] = get_store().top_hotspots(
+        state["owner"], state["repo"], k=5, directories=True, since=state.get("since"), until=state.get("until")
+    )
+    if not churn_data["risky_areas"] and not tracks_files():
+        print(f"⚠️ No risky areas: GITHUB_BACKEND={GITHUB_BACKEND} records no per-file stats (use rest or git)")
+    return {"churn_data": churn_data}
 
 def insight_fn(state: Dict[str, Any]) -> Dict[str, Any]:
+    from agents.insight_narrator import generate_insight
+
     insight = generate_insight.invoke({
         "input": {
             "author_churn": state["churn_data"]["author_churn"],
-            "risky_commits": state["churn_data"]["risky_commits"]
+            "risky_commits": state["churn_data"]["risky_commits"],
+            "risky_areas": state["churn_data"].get("risky_areas", [])
         }
     })
-    return {**state, "summary": insight["summary"], "chart_base64": insight["chart_base64"]}
+    return {"summary": insight["summary"], "chart": insight["chart"]}
 
 def forecast_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    # For demo, generate dummy weekly churn history from current churn
-    churn_history = []
-    for i in range(4):
-        churn_history.append({"week_start": f"2024-06-{i*7+1:02d}", "total_churn": sum(state["churn_data"]["author_churn"].values())})
-    forecast = forecast_next_week(churn_history)
-    return {**state, "forecast": f"Next week churn: {forecast['forecast_churn']} (Week of {forecast['forecast_week']})"}
+    from agents.forecaster import forecast_many
+    from utils.report_window import history_start, week_start
+
+    # 📈 Team total and every author forecast in one batched fit over the real weekly series;
+    # a stored repo's series spans the report's history through 'until', quiet weeks included
+    churn_data = state["churn_data"]
+    series = {TEAM_SERIES: churn_data.get("weekly_churn", {}), **churn_data.get("author_weekly_churn", {})}
+    since, until = state.get("since"), state.get("until")
+    forecasts = forecast_many(
+        series,
+        first_week=history_start(since)[:10] if since else None,
+        last_week=week_start(until) if until else None
+    )
+    team = forecasts[TEAM_SERIES]
+    if "forecast_churn" not in team:
+        return {"forecast": team["forecast"], "author_forecasts": {}}
+    author_forecasts = {author: result for author, result in forecasts.items() if author != TEAM_SERIES}
+    return {
+        "forecast": f"Next week churn: {team['forecast_churn']} "
+                    f"(Week of {team['forecast_week']}, 95% range {team['lower']}–{team['upper']})",
+        "author_forecasts": author_forecasts
+    }
 
 def influence_fn(state: Dict[str, Any]) -> Dict[str, Any]:
-    graph = fetch_review_map(state["owner"], state["repo"], GITHUB_TOKEN)
-    influence_map = generate_review_map_image(graph)
-    return {**state, "influence_map": influence_map}
+    from agents.review_map import build_review_graph, fetch_review_map, generate_review_map_image
+
+    if state.get("pull_reviews") is not None:
+        graph = build_review_graph(state["pull_reviews"])
+    else:
+        graph = fetch_review_map(state["owner"], state["repo"])
+    influence_map = generate_review_map_image(graph, state["owner"], state["repo"])
+    return {"influence_map": influence_map}
 
 # LangGraph Setup
-workflow = StateGraph(GraphState)
-workflow.add_node("fetch", RunnableLambda(fetch_fn))
-workflow.add_node("analyze", RunnableLambda(analyze_fn))
-workflow.add_node("insight", RunnableLambda(insight_fn))
-workflow.add_node("forecast_result", RunnableLambda(forecast_fn))
-workflow.add_node("influence", RunnableLambda(influence_fn))
-workflow.set_entry_point("fetch")
-workflow.add_edge("fetch", "analyze")
-workflow.add_edge("analyze", "insight")
-workflow.add_edge("insight", "forecast_result")
-workflow.add_edge("forecast_result", "influence")
-workflow.add_edge("influence", END)
-graph = workflow.compile()
+# 📏 Every node is wrapped by instrument_node: wall/CPU time, memory, HTTP, cache and LLM token counters
+def build_commit_graph():
+    """fetch -> analyze, then the LLM insight and the forecast in parallel."""
+    from langgraph.graph import StateGraph, START, END
+    from langchain_core.runnables import RunnableLambda
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--owner", default="vigyat13")
-    parser.add_argument("--repo", default="Nivaan-ChatBot")
-    parser.add_argument("--slack", action="store_true")
-    args = parser.parse_args()
+    workflow = StateGraph(CommitState)
+    workflow.add_node("fetch", RunnableLambda(instrument_node("fetch", fetch_fn)))
+    workflow.add_node("analyze", RunnableLambda(instrument_node("analyze", analyze_fn)))
+    workflow.add_node("insight", RunnableLambda(instrument_node("insight", insight_fn)))
+    workflow.add_node("forecast_result", RunnableLambda(instrument_node("forecast_result", forecast_fn)))
+    workflow.add_edge(START, "fetch")
+    workflow.add_edge("fetch", "analyze")
+    workflow.add_edge("analyze", "insight")
+    workflow.add_edge("analyze", "forecast_result")
+    workflow.add_edge("insight", END)
+    workflow.add_edge("forecast_result", END)
+    return workflow.compile()
+
+def build_graph():
+    """
+    The commit branch and the review branch (PR sync + influence map) share no
+    inputs, so both start at once and join at END. The commit branch is its
+    own subgraph: LangGraph runs nodes in lock-step supersteps, and a flat
+    graph would make analyze wait for the review fetch to finish.
+    """
+    from langgraph.graph import StateGraph, START, END
+    from langchain_core.runnables import RunnableLambda
+
+    workflow = StateGraph(GraphState)
+    workflow.add_node("commits", build_commit_graph())
+    workflow.add_node("influence", RunnableLambda(instrument_node("influence", influence_fn)))
+    workflow.add_edge(START, "commits")
+    workflow.add_edge(START, "influence")
+    workflow.add_edge("commits", END)
+    workflow.add_edge("influence", END)
+    return workflow.compile()
+
+_graph = None
+_commit_graph = None
+_graph_lock = threading.Lock()
+
+def get_graph():
+    """Returns the compiled pipeline, building it on first use."""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_graph()
+    return _graph
+
+def get_commit_graph():
+    """Returns the compiled commit branch alone (no PR review sync or influence map), built on first use."""
+    global _commit_graph
+    if _commit_graph is None:
+        with _graph_lock:
+            if _commit_graph is None:
+                _commit_graph = build_commit_graph()
+    return _commit_graph
 
+def __getattr__(name: str):
+    # `from main import graph` keeps working; the graph is compiled on first access
+    if name == "graph":
+        return get_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def run_single(args):
     print("\n🔁 Running LangGraph pipeline...")
-    result = graph.invoke({"owner": args.owner, "repo": args.repo})
+    with instrumented_run(profile_path=args.profile, entry="cli", owner=args.owner, repo=args.repo):
+        result = get_graph().invoke({"owner": args.owner, "repo": args.repo, "since": args.since, "until": args.until})
 
     print("\n📢 Summary:", result["summary"])
     print("\n📈 Forecast:", result["forecast"])
-    print("\n🗺️ Influence Map (Base64):", result["influence_map"][:100], "...")
+    print("\n🗺️ Influence Map:", result["influence_map"])
 
     if args.slack:
         try:
@@ -107,3 +214,51 @@ if __name__ == "__main__":
             print(f"✅ Posted to Slack: {SLACK_CHANNEL}")
         except SlackApiError as e:
             print(f"❌ Slack error: {e.response['error']}")
+
+def run_batch(args):
+    """--org / --repos: every repo through one bounded pool, printed as each one finishes."""
+    from agents.org_report import (
+        ORG_REPORT_WORKERS, list_org_repos, parse_repo_list, run_org_report, format_repo_line, format_rollup
+    )
+    from utils.report_window import window_label
+
+    if args.repos:
+        repos = parse_repo_list(args.repos.split(","), default_owner=args.org)
+    else:
+        repos = list_org_repos(args.org)
+
+    workers = args.workers or ORG_REPORT_WORKERS
+    print(f"\n🏢 Running batch report for {len(repos)} repos with {workers} workers...")
+    rollup = run_org_report(
+        repos, since=args.since, until=args.until, max_workers=workers,
+        on_result=lambda result: print(format_repo_line(result))
+    )
+
+    scope = f" for `{args.org}`" if args.org else ""
+    text = format_rollup(rollup, title=f"Org Dev Insight Report{scope} ({window_label(rollup['since'], rollup['until'])})")
+    print("\n" + text)
+
+    if args.slack:
+        try:
+            slack_client.chat_postMessage(channel=SLACK_CHANNEL, text=text)
+            print(f"✅ Posted to Slack: {SLACK_CHANNEL}")
+        except SlackApiError as e:
+            print(f"❌ Slack error: {e.response['error']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--owner", default="vigyat13")
+    parser.add_argument("--repo", default="Nivaan-ChatBot")
+    parser.add_argument("--org", help="Report on every repo of this org (or user)")
+    parser.add_argument("--repos", help="Comma-separated owner/repo list to report on")
+    parser.add_argument("--workers", type=int, help="Repos processed at once in batch mode (ORG_REPORT_WORKERS)")
+    parser.add_argument("--since")
+    parser.add_argument("--until")
+    parser.add_argument("--slack", action="store_true")
+    parser.add_argument("--profile", help="Write merged cProfile stats of every node to this file")
+    args = parser.parse_args()
+
+    if args.org or args.repos:
+        run_batch(args)
+    else:
+        run_single(args)
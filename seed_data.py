@@ -1,27 +1,49 @@
 # seed_data.py
+import argparse
 import json
-import base64
 from main import graph  # Importing real LangGraph pipeline
+from agents.snapshot import is_snapshot, load_snapshot
+from utils.artifacts import get_artifact
+
+def load_seed_state(path: str) -> dict:
+    """Seed JSON, or a columnar snapshot directory (memory-mapped, see agents/snapshot.py)."""
+    if is_snapshot(path):
+        snapshot = load_snapshot(path)
+        state = {
+            "owner": snapshot.manifest.get("owner"),
+            "repo": snapshot.manifest.get("repo"),
+            "github_data": snapshot.commit_columns()
+        }
+        if snapshot.manifest["counts"]["pulls"]:
+            state["pull_reviews"] = list(snapshot.pull_reviews())
+        print(f"📦 Replaying snapshot {path}: {len(snapshot)} commits")
+        return state
+
+    with open(path, "r") as f:
+        return json.load(f)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", nargs="?", default="data/seed_data.json", help="Seed JSON file or snapshot directory")
+    args = parser.parse_args()
+
     print("\n🌱 Using seed data to simulate GitHub pipeline...\n")
 
-    with open("data/seed_data.json", "r") as f:
-        seed_state = json.load(f)
+    seed_state = load_seed_state(args.path)
 
     result = graph.invoke(seed_state)
 
     print("\n💬 Final Summary:")
     print(result.get("summary", "No summary generated."))
 
-    if "chart_base64" in result:
+    if "chart" in result:
         with open("churn_chart_from_seed.png", "wb") as f:
-            f.write(base64.b64decode(result["chart_base64"]))
+            f.write(get_artifact(result["chart"]))
         print("\n📊 Chart image saved as 'churn_chart_from_seed.png'")
 
     if "influence_map" in result:
         with open("review_influence_map_from_seed.png", "wb") as f:
-            f.write(base64.b64decode(result["influence_map"]))
+            f.write(get_artifact(result["influence_map"]))
         print("\n🗺️ Review map saved as 'review_influence_map_from_seed.png'")
 
     if "forecast" in result:
@@ -0,0 +1,30 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Tests import the repo packages and reuse the bench's fake GitHub server
+sys.path[:0] = [ROOT_DIR, os.path.join(ROOT_DIR, "bench")]
+
+from fake_github import FakeGitHub
+from utils import github_client
+from utils.http_cache import HttpCache
+
+
+@pytest.fixture
+def fake_github():
+    fake = FakeGitHub(latency_ms=0).start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def github(fake_github, monkeypatch):
+    """Points utils.github_client at the fake server, with a fresh in-memory ETag cache."""
+    monkeypatch.setattr(github_client, "GITHUB_API_URL", fake_github.url)
+    monkeypatch.setattr(github_client, "GITHUB_GRAPHQL_URL", f"{fake_github.url}/graphql")
+    monkeypatch.setattr(github_client, "GITHUB_CACHE", True)
+    monkeypatch.setattr(github_client, "_cache", HttpCache(":memory:"))
+    return fake_github
@@ -0,0 +1,63 @@
+# tests/test_caches.py
+import requests
+
+from utils.http_cache import HttpCache
+from utils.llm_cache import LlmCache
+
+
+def _response(url: str, body: bytes, etag: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = body
+    response.headers["ETag"] = etag
+    return response
+
+
+def test_llm_cache_evicts_least_recently_used():
+    cache = LlmCache(":memory:", max_bytes=10)
+    cache.put("a", "openai", "m", "12345")
+    cache.put("b", "openai", "m", "12345")
+    assert cache.get("a") == "12345"  # 'b' is now the least recently used
+
+    cache.put("c", "openai", "m", "12345")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == cache.get("c") == "12345"
+    assert cache.stats()["bytes"] == 10
+
+
+def test_llm_cache_expires_entries():
+    cache = LlmCache(":memory:", ttl=-1)
+    cache.put("a", "openai", "m", "done")
+
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "entries": 0, "bytes": 0}
+
+
+def test_http_cache_replacing_an_entry_keeps_the_size_right():
+    cache = HttpCache(":memory:", max_bytes=8)
+    cache.store("u1", _response("u1", b"1234", '"a"'))
+    cache.store("u1", _response("u1", b"123456", '"b"'))
+    assert cache.stats()["bytes"] == 6
+    assert cache.conditional_headers("u1") == {"If-None-Match": '"b"'}
+
+    cache.store("u2", _response("u2", b"1234", '"c"'))
+
+    assert cache.load("u1") is None
+    assert cache.load("u2").content == b"1234"
+    assert cache.stats()["bytes"] == 4
+
+
+def test_http_cache_counts_only_cacheable_responses_as_misses():
+    cache = HttpCache(":memory:")
+    failed = _response("u1", b"{}", '"a"')
+    failed.status_code = 404
+    unvalidated = _response("u2", b"{}", '"b"')
+    del unvalidated.headers["ETag"]
+
+    cache.store("u1", failed)
+    cache.store("u2", unvalidated)
+    cache.store("u3", _response("u3", b"{}", '"c"'))
+
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,24 @@
+# tests/test_chart_renderer.py
+import networkx as nx
+
+from utils.chart_renderer import _draw_review_map
+
+
+def test_review_map_keeps_isolated_nodes_and_places_uncached_ones(monkeypatch):
+    drawn = {}
+
+    def fake_draw(graph, pos, **kwargs):
+        drawn.update(nodes=set(graph), pos=pos)
+
+    monkeypatch.setattr(nx, "draw", fake_draw)
+
+    png = _draw_review_map(
+        [("alice", "bob", 3)],
+        positions={"alice": (0.0, 0.0), "bob": (1.0, 1.0)},
+        nodes=["alice", "bob", "carol"]
+    )
+
+    assert png.startswith(b"\x89PNG")
+    assert drawn["nodes"] == {"alice", "bob", "carol"}
+    assert tuple(drawn["pos"]["alice"]) == (0.0, 0.0)
+    assert "carol" in drawn["pos"]
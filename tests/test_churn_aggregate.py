@@ -0,0 +1,48 @@
+# tests/test_churn_aggregate.py
+import pytest
+
+from agents.churn_aggregate import update_aggregate, window_report
+from agents.diff_analyst import analyze_diff
+from synthetic import SyntheticRepo
+from utils.repo_store import RepoStore
+
+
+@pytest.fixture
+def store():
+    store = RepoStore(":memory:")
+    store.upsert_commits("acme", "widgets", SyntheticRepo(commits=2000).records())
+    return store
+
+
+def _analyze(store, since, until):
+    return analyze_diff.invoke({"input": {"github_data": store.query_commits("acme", "widgets", since, until)}})
+
+
+@pytest.mark.parametrize("since, until", [
+    ("2025-06-11T12:00:00Z", "2025-06-25T08:30:00Z"),  # Wednesday to Wednesday
+    ("2025-06-09T00:00:00Z", "2025-06-22T23:59:59Z"),  # whole weeks
+])
+def test_window_report_matches_analyze_diff(store, since, until):
+    expected = _analyze(store, since, until)
+
+    report = window_report("acme", "widgets", since, until, store=store)
+
+    assert report["author_churn"] == expected["author_churn"]
+    assert report["weekly_churn"] == expected["weekly_churn"]
+    assert report["author_weekly_churn"] == expected["author_weekly_churn"]
+    assert len(report["risky_commits"]) == len(expected["risky_commits"])
+
+
+def test_mid_week_history_keeps_whole_weeks_before_the_window(store):
+    since, until = "2025-06-11T12:00:00Z", "2025-06-25T08:30:00Z"
+
+    report = window_report("acme", "widgets", since, until, history_since="2025-05-19T00:00:00Z", store=store)
+
+    history = _analyze(store, "2025-05-19T00:00:00Z", "2025-06-08T23:59:59Z")["weekly_churn"]
+    window = _analyze(store, since, until)["weekly_churn"]
+    assert report["weekly_churn"] == {**history, **window}
+
+
+def test_aggregate_refuses_partial_weeks(store):
+    with pytest.raises(ValueError):
+        update_aggregate("acme", "widgets", store).report(since="2025-06-11T12:00:00Z")
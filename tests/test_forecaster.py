@@ -0,0 +1,37 @@
+# tests/test_forecaster.py
+import numpy as np
+import pytest
+
+from agents.forecaster import forecast_linear, forecast_many, forecast_next_week
+
+
+def test_single_distinct_week_is_not_enough_data():
+    history = [{"week_start": "2025-06-02", "total_churn": 10}, {"week_start": "2025-06-02", "total_churn": 30}]
+
+    assert forecast_next_week(history) == {"forecast": "Not enough data to forecast."}
+    with pytest.raises(ValueError):
+        forecast_linear(np.array([[10.0, 30.0]]), x=np.array([0.0, 0.0]))
+
+
+def test_falling_trend_is_clipped_at_zero_like_forecast_many():
+    weeks = ["2025-06-02", "2025-06-09", "2025-06-16"]
+    churn = [300, 150, 10]
+
+    single = forecast_next_week([{"week_start": w, "total_churn": c} for w, c in zip(weeks, churn)])
+    batched = forecast_many({"team": dict(zip(weeks, churn))})["team"]
+
+    assert single == batched
+    assert single["forecast_week"] == "2025-06-23"
+    assert single["forecast_churn"] == 0 and single["lower"] == 0
+
+
+def test_quiet_weeks_before_until_count_as_zero():
+    series = {"team": {"2025-06-02": 100, "2025-06-09": 100, "2025-06-16": 100}}
+
+    trimmed = forecast_many(series)["team"]
+    padded = forecast_many(series, first_week="2025-06-02", last_week="2025-06-30")["team"]
+
+    assert trimmed["forecast_week"] == "2025-06-23"
+    # Two commit-free weeks end the report, so next week follows them and the trend drops
+    assert padded["forecast_week"] == "2025-07-07"
+    assert padded["forecast_churn"] < trimmed["forecast_churn"]
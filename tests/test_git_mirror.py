@@ -0,0 +1,86 @@
+# tests/test_git_mirror.py
+import os
+import subprocess
+
+from agents import git_mirror
+from agents.git_mirror import iter_commits_git
+from utils.repo_store import RepoStore
+
+AUTHORS = [
+    ("Ada Lovelace", "ada@example.com"),
+    ("Grace Hopper", "12345+grace@users.noreply.github.com"),
+    ("A. Lovelace", "ada@example.com"),
+    ("Build Bot", "bot@example.com"),
+]
+
+
+def _make_mirror(tmp_path, last_authored=None):
+    work = tmp_path / "work"
+    subprocess.run(["git", "init", "--quiet", str(work)], check=True)
+    for i, (name, email) in enumerate(AUTHORS):
+        (work / f"file{i}.txt").write_text("line\n" * (i + 1))
+        subprocess.run(["git", "-C", str(work), "add", "."], check=True)
+        env = dict(os.environ)
+        if last_authored and i == len(AUTHORS) - 1:
+            env["GIT_AUTHOR_DATE"] = last_authored
+        subprocess.run(["git", "-C", str(work), "-c", f"user.name={name}", "-c", f"user.email={email}",
+                        "commit", "--quiet", "-m", f"commit {i}"], check=True, env=env)
+    mirrors = tmp_path / "mirrors"
+    subprocess.run(["git", "clone", "--mirror", "--quiet", str(work), str(mirrors / "acme" / "widgets.git")], check=True)
+    return mirrors
+
+
+def test_authors_are_resolved_to_github_logins_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(git_mirror, "GIT_MIRROR_DIR", str(_make_mirror(tmp_path)))
+    lookups = []
+
+    def fake_logins(owner, repo, shas):
+        lookups.append(len(shas))
+        # Resolves by SHA, so the stub answers by the commit's position in AUTHORS
+        log = subprocess.run(["git", "--git-dir", git_mirror.mirror_path(owner, repo), "log", "--format=%H %ae"],
+                             capture_output=True, text=True, check=True).stdout.split("\n")
+        emails = dict(line.split(" ") for line in log if line)
+        return {sha: {"ada@example.com": "ada"}.get(emails[sha]) for sha in shas}
+
+    monkeypatch.setattr(git_mirror, "commit_author_logins", fake_logins)
+    store = RepoStore(":memory:")
+
+    records = list(iter_commits_git("acme", "widgets", fetch=False, resolve=True, store=store))
+
+    # Newest first; the bot's email has no account, so it keeps its git name
+    assert [r["author"] for r in records] == ["Build Bot", "ada", "grace", "ada"]
+    assert lookups == [2]
+    assert all("email" not in r for r in records)
+
+    list(iter_commits_git("acme", "widgets", fetch=False, resolve=True, store=store))
+    assert lookups == [2]
+
+
+def test_without_resolution_only_noreply_emails_give_logins(tmp_path, monkeypatch):
+    monkeypatch.setattr(git_mirror, "GIT_MIRROR_DIR", str(_make_mirror(tmp_path)))
+
+    records = list(iter_commits_git("acme", "widgets", fetch=False, resolve=False))
+
+    assert [r["author"] for r in records] == ["Build Bot", "A. Lovelace", "grace", "Ada Lovelace"]
+    assert records[0]["files"] == [("file3.txt", 4, 0, "added")]
+
+
+def test_sync_watermark_uses_the_committer_date(tmp_path, monkeypatch):
+    from agents.github_ingestor import sync_commits
+    from utils.repo_store import RepoStore
+
+    # The newest commit was rebased: authored long ago, committed now
+    monkeypatch.setattr(git_mirror, "GIT_MIRROR_DIR", str(_make_mirror(tmp_path, "2020-01-01T00:00:00Z")))
+    monkeypatch.setattr(git_mirror, "commit_author_logins", lambda owner, repo, shas: {})
+    monkeypatch.setattr(git_mirror, "ensure_mirror", lambda owner, repo: git_mirror.mirror_path(owner, repo))
+    store = RepoStore(":memory:")
+    path = git_mirror.mirror_path("acme", "widgets")
+    head = subprocess.run(["git", "--git-dir", path, "log", "-1", "--format=%H %cI"],
+                          capture_output=True, text=True, check=True).stdout.split()
+
+    sync_commits("acme", "widgets", store=store, backend="git", floor="2000-01-01T00:00:00Z")
+
+    state = store.get_sync_state("acme", "widgets")
+    assert state["last_sha"] == head[0]
+    assert state["last_timestamp"] == git_mirror.utc_timestamp(head[1])
+    assert state["last_timestamp"] > "2020-01-02"
@@ -0,0 +1,46 @@
+# tests/test_github_client.py
+from agents.github_ingestor import iter_commits_rest
+from utils import github_client
+from utils.github_client import github_get, iter_pages
+
+REPO = "/repos/acme/synth-c250-p10/commits"
+
+
+def test_etag_304_is_served_from_cache(github):
+    first = github_get(REPO, params={"per_page": 100})
+    second = github_get(REPO, params={"per_page": 100})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert github.not_modified == 1
+    # The cached Link header survives the 304, so pagination still works
+    assert second.links["next"]["url"] == first.links["next"]["url"]
+
+
+def test_cache_is_not_shared_across_tokens(github):
+    github_get(REPO, token="token-a")
+    github_get(REPO, token="token-b")
+    assert github.not_modified == 0
+
+    github_get(REPO, token="token-a")
+    assert github.not_modified == 1
+
+
+def test_link_pagination_walks_every_page(github, monkeypatch):
+    monkeypatch.setattr(github_client, "GITHUB_CACHE", False)
+
+    pages = list(iter_pages(REPO, params={"per_page": 100}))
+
+    assert [len(page) for page in pages] == [100, 100, 50]
+    shas = [commit["sha"] for page in pages for commit in page]
+    assert len(set(shas)) == 250
+    assert github.requests == 3
+
+
+def test_iter_commits_rest_fetches_stats_for_every_listed_commit(github):
+    records = list(iter_commits_rest("acme", "synth-c120-p10", max_workers=4))
+    repo = github.repo("synth-c120-p10")
+
+    assert [r["sha"] for r in records] == [repo.sha(i) for i in range(120)]
+    assert records[0]["additions"] == repo.record(0)["additions"]
+    assert records[0]["files_changed"] == len(records[0]["files"]) == repo.record(0)["files_changed"]
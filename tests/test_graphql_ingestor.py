@@ -0,0 +1,52 @@
+# tests/test_graphql_ingestor.py
+from agents import graphql_ingestor
+from agents.graphql_ingestor import iter_commits_graphql, iter_pull_reviews_graphql
+
+
+def test_commit_history_follows_cursors(github, monkeypatch):
+    monkeypatch.setattr(graphql_ingestor, "GITHUB_GRAPHQL_PAGE_SIZE", 40)
+    repo = github.repo("synth-c130-p10")
+
+    records = list(iter_commits_graphql("acme", "synth-c130-p10"))
+
+    assert github.graphql_requests == 4
+    assert [r["sha"] for r in records] == [repo.sha(i) for i in range(130)]
+    assert records == [{**repo.record(i), "committed_at": repo.timestamp(i)} for i in range(130)]
+
+
+def test_commit_history_stops_at_since(github, monkeypatch):
+    monkeypatch.setattr(graphql_ingestor, "GITHUB_GRAPHQL_PAGE_SIZE", 25)
+    repo = github.repo("synth-c300-p10")
+    since = repo.timestamp(59)
+
+    records = list(iter_commits_graphql("acme", "synth-c300-p10", since=since))
+
+    assert len(records) == repo.since_index(since)
+    assert all(r["timestamp"] >= since for r in records)
+
+
+def test_pull_reviews_follow_cursors(github, monkeypatch):
+    monkeypatch.setattr(graphql_ingestor, "GITHUB_GRAPHQL_PAGE_SIZE", 7)
+    repo = github.repo("synth-c100-p30")
+
+    pulls = list(iter_pull_reviews_graphql("acme", "synth-c100-p30"))
+
+    assert [p["number"] for p in pulls] == list(range(1, 31))
+    assert github.graphql_requests == 5
+    expected = {}
+    for review in repo.reviews(1):
+        login = review["user"]["login"]
+        expected[login] = expected.get(login, 0) + 1
+    assert pulls[0]["reviews"] == expected
+
+
+def test_graphql_sync_warns_that_risky_areas_stay_empty(github, capsys):
+    from agents.github_ingestor import sync_commits
+    from utils.repo_store import RepoStore
+
+    store = RepoStore(":memory:")
+    synced = sync_commits("acme", "synth-c60-p10", store=store, backend="graphql", floor="2000-01-01T00:00:00Z")
+
+    assert synced == 60
+    assert store.top_hotspots("acme", "synth-c60-p10", k=5, directories=True) == []
+    assert "no per-file stats" in capsys.readouterr().out
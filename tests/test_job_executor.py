@@ -0,0 +1,29 @@
+# tests/test_job_executor.py
+import threading
+
+from bot.job_executor import JobExecutor
+
+
+def test_queue_position_counts_only_other_reports():
+    executor = JobExecutor(max_workers=1, max_queue=5)
+    release = threading.Event()
+    messages = {"a": [], "b": [], "b2": [], "c": []}
+
+    def blocked(progress):
+        release.wait(5)
+        return "done"
+
+    first = executor.submit("a", blocked, on_progress=messages["a"].append)
+    while not executor.stats()["running"]:
+        pass
+    executor.submit("b", blocked, on_progress=messages["b"].append)
+    executor.submit("b", blocked, on_progress=messages["b2"].append)
+    executor.submit("c", blocked, on_progress=messages["c"].append)
+    release.set()
+
+    assert first.result(5) == "done"
+    assert messages["a"] == []
+    assert messages["b"] == ["🕒 Queued behind 1 other report(s)"]
+    assert messages["b2"] == ["⏳ Same report is already queued behind 1 other report(s); you'll get its result"]
+    assert messages["c"] == ["🕒 Queued behind 2 other report(s)"]
+    executor.shutdown()
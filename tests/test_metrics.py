@@ -0,0 +1,28 @@
+# tests/test_metrics.py
+from utils import metrics
+from utils.metrics import Registry, instrumented_run
+
+
+def test_gauges_use_their_own_label_name():
+    registry = Registry()
+    registry.register_gauge("report_jobs", lambda: {"queued": 2, "running": 1})
+    registry.register_gauge("artifacts_in_memory", lambda: {"entries": 3, "bytes": 2048}, label="measure")
+
+    text = registry.render()
+
+    assert 'fika_report_jobs{state="queued"} 2' in text
+    assert 'fika_artifacts_in_memory{measure="bytes"} 2048' in text
+    assert 'fika_artifacts_in_memory{state=' not in text
+
+
+def test_runs_are_only_emitted_to_a_configured_path(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(metrics, "METRICS_PATH", "")
+    with instrumented_run(entry="test"):
+        pass
+    assert capsys.readouterr().out == ""
+
+    path = tmp_path / "runs.jsonl"
+    monkeypatch.setattr(metrics, "METRICS_PATH", str(path))
+    with instrumented_run(entry="test"):
+        pass
+    assert len(path.read_text().splitlines()) == 1
@@ -0,0 +1,30 @@
+# tests/test_rate_limiter.py
+import threading
+import time
+
+from utils.rate_limiter import RateLimitScheduler
+
+
+def test_pool_rotates_to_the_token_with_most_budget():
+    scheduler = RateLimitScheduler(["a", "b"])
+    scheduler._states["a"].remaining = 10
+    scheduler._states["b"].remaining = 50
+
+    assert scheduler.acquire() == "b"
+    assert scheduler.acquire("a") == "a"
+
+
+def test_concurrent_waits_count_wall_clock_once():
+    scheduler = RateLimitScheduler(["a"])
+    scheduler._states["a"].blocked_until = time.time() + 0.3
+
+    threads = [threading.Thread(target=scheduler.acquire) for _ in range(8)]
+    started = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    assert scheduler.requests == 8
+    assert 0.25 <= scheduler.throttled_seconds <= elapsed + 0.05
@@ -0,0 +1,33 @@
+# tests/test_repo_store.py
+from utils.repo_store import RepoStore
+
+
+def _commit(sha, author, timestamp, files):
+    return {
+        "sha": sha, "author": author, "timestamp": timestamp,
+        "additions": sum(f[1] for f in files), "deletions": sum(f[2] for f in files),
+        "files_changed": len(files), "files": files
+    }
+
+
+def test_windowed_hotspots_rank_by_churn_inside_the_window():
+    store = RepoStore(":memory:")
+    store.upsert_commits("acme", "widgets", [
+        _commit("a1", "ann", "2025-05-01T10:00:00Z", [("core/db.py", 900, 100, "modified")]),
+        _commit("a2", "bob", "2025-06-10T10:00:00Z", [("core/db.py", 5, 0, "modified"), ("web/ui.py", 40, 10, "modified")]),
+        _commit("a3", "cat", "2025-06-11T10:00:00Z", [("web/ui.py", 20, 0, "modified")]),
+        _commit("a4", "dan", "2025-06-20T10:00:00Z", [("api/routes.py", 500, 0, "added")]),
+    ])
+
+    all_time = store.top_hotspots("acme", "widgets", k=3, directories=True)
+    window = store.top_hotspots("acme", "widgets", k=3, directories=True,
+                                since="2025-06-09T00:00:00Z", until="2025-06-15T23:59:59Z")
+
+    assert [spot["path"] for spot in all_time] == ["core/", "api/", "web/"]
+    # Touched after the window, so api/ is left out; core/ only counts its in-window churn
+    assert window == [
+        {"path": "web/", "churn": 70, "touches": 2, "authors": 2, "last_touched": "2025-06-11T10:00:00Z"},
+        {"path": "core/", "churn": 5, "touches": 1, "authors": 1, "last_touched": "2025-06-10T10:00:00Z"},
+    ]
+    files = store.top_hotspots("acme", "widgets", k=1, prefix="web/", since="2025-06-09T00:00:00Z")
+    assert files[0]["path"] == "web/ui.py" and files[0]["churn"] == 70
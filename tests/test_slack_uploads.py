@@ -0,0 +1,39 @@
+# tests/test_slack_uploads.py
+from utils.artifacts import ArtifactStore
+from utils import slack_uploads
+from utils.repo_store import RepoStore
+from utils.slack_uploads import upload_artifact
+
+
+class FakeSlackClient:
+    """Answers like slack_sdk: files_upload_v2 returns only the file's id and title."""
+
+    def __init__(self):
+        self.uploads = []
+        self.messages = []
+
+    def files_upload_v2(self, **kwargs):
+        self.uploads.append(kwargs)
+        return {"file": {"id": f"F{len(self.uploads)}", "title": kwargs["title"]}}
+
+    def files_info(self, file):
+        return {"file": {"id": file, "permalink": f"https://slack.example/files/{file}"}}
+
+    def chat_postMessage(self, **kwargs):
+        self.messages.append(kwargs)
+        return {"ts": "1"}
+
+
+def test_unchanged_chart_is_linked_instead_of_uploaded(monkeypatch):
+    artifacts = ArtifactStore(directory=None)
+    monkeypatch.setattr(slack_uploads, "get_artifact", artifacts.get)
+    handle = artifacts.put(b"png bytes")
+    client = FakeSlackClient()
+    store = RepoStore(":memory:")
+
+    first = upload_artifact(client, "C1", handle, title="Report", initial_comment="summary", store=store)
+    second = upload_artifact(client, "C1", handle, title="Report", initial_comment="summary", store=store)
+
+    assert first == second == "F1"
+    assert len(client.uploads) == 1
+    assert "https://slack.example/files/F1" in client.messages[0]["text"]
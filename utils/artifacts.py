@@ -0,0 +1,201 @@
+# utils/artifacts.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+from utils.metrics import count
+from utils.repo_store import ROOT_DIR
+
+# Content-addressed artifact files (chart PNGs); empty keeps artifacts in memory only
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR", os.path.join(ROOT_DIR, "data", "artifacts"))
+# Artifacts unused for this long are deleted, then the least recently used go until the directory fits
+ARTIFACT_RETENTION_DAYS = float(os.getenv("ARTIFACT_RETENTION_DAYS", "14"))
+ARTIFACT_MAX_BYTES = int(os.getenv("ARTIFACT_MAX_BYTES", str(512 * 1024 * 1024)))
+# Bytes of artifacts also kept in memory; least recently used ones go first
+ARTIFACT_MEMORY_MAX_BYTES = int(os.getenv("ARTIFACT_MEMORY_MAX_BYTES", str(64 * 1024 * 1024)))
+# The directory is pruned on write, at most this often
+ARTIFACT_PRUNE_SECONDS = int(os.getenv("ARTIFACT_PRUNE_SECONDS", "3600"))
+
+HANDLE_PREFIX = "sha256:"
+
+
+def artifact_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_handle(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+def handle_key(handle: str) -> str:
+    if not is_handle(handle):
+        raise ValueError(f"❌ Not an artifact handle: {handle!r:.80}")
+    return handle[len(HANDLE_PREFIX):]
+
+
+class ArtifactStore:
+    """
+    Holds binary report artifacts by content hash. Graph state and job results
+    carry the short handle ('sha256:<hex>') instead of the bytes or their
+    base64, so passing state around never copies an image.
+
+    Identical content is stored once. With a directory, artifacts are also
+    written there (atomically, one file per hash) so they outlive the process
+    and can be shared by the bot and the scheduler; files unused for
+    retention_days, then the least recently used beyond max_bytes, are pruned.
+    """
+
+    def __init__(self, directory: Optional[str] = ARTIFACT_DIR, max_bytes: int = ARTIFACT_MAX_BYTES,
+                 retention_days: float = ARTIFACT_RETENTION_DAYS, memory_max_bytes: int = ARTIFACT_MEMORY_MAX_BYTES,
+                 prune_seconds: int = ARTIFACT_PRUNE_SECONDS):
+        self.directory = directory or None
+        self.max_bytes = max_bytes
+        self.retention_days = retention_days
+        self.memory_max_bytes = memory_max_bytes
+        self.prune_seconds = prune_seconds
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._last_prune = 0.0
+        self._lock = threading.Lock()
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, handle: str) -> Optional[str]:
+        """File backing the artifact (it may not exist), or None for a memory-only store."""
+        if not self.directory:
+            return None
+        key = handle_key(handle)
+        return os.path.join(self.directory, key[:2], key)
+
+    # 🧠 Memory tier
+    def _remember(self, key: str, data: bytes) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return False
+            self._entries[key] = data
+            self._size += len(data)
+            # The newest artifact always stays, even when it alone is over budget
+            while self._size > self.memory_max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+            return True
+
+    def put(self, data: bytes) -> str:
+        key = artifact_key(data)
+        handle = HANDLE_PREFIX + key
+        added = self._remember(key, data)
+
+        path = self.path(handle)
+        if path is None:
+            deduped = not added
+        elif os.path.exists(path):
+            # Same bytes already on disk: refresh its retention instead of writing a copy
+            os.utime(path)
+            deduped = True
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            staging = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(staging, "wb") as f:
+                f.write(data)
+            os.replace(staging, path)
+            deduped = False
+            self._maybe_prune()
+        count("artifact_dedup_hits" if deduped else "artifact_writes")
+        return handle
+
+    def get(self, handle: str) -> bytes:
+        key = handle_key(handle)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        path = self.path(handle)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except (TypeError, FileNotFoundError):
+            raise ValueError(f"❌ Artifact {handle} is no longer available")
+        self._remember(key, data)
+        return data
+
+    # 🧹 Retention
+    def _maybe_prune(self):
+        with self._lock:
+            if time.time() - self._last_prune < self.prune_seconds:
+                return
+            self._last_prune = time.time()
+        try:
+            self.prune()
+        except OSError as e:
+            print(f"⚠️ Artifact pruning failed: {e}")
+
+    def _files(self) -> List[Tuple[float, int, str]]:
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return sorted(files)
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Deletes expired artifacts, then the least recently used until under max_bytes; returns how many."""
+        if not self.directory:
+            return 0
+        now = now or time.time()
+        cutoff = now - self.retention_days * 86400
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            # Oldest first: stop once nothing is expired and the directory fits
+            if mtime >= cutoff and total <= self.max_bytes:
+                break
+            # Leftover staging files from a crashed writer only go once expired
+            if path.endswith(".tmp") and mtime >= cutoff:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            print(f"🧹 Pruned {removed} artifacts from {self.directory}")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size}
+
+
+_artifacts: Optional[ArtifactStore] = None
+_artifacts_lock = threading.Lock()
+
+
+def get_artifacts() -> ArtifactStore:
+    """Returns the process-wide artifact store at ARTIFACT_DIR."""
+    global _artifacts
+    if _artifacts is None:
+        with _artifacts_lock:
+            if _artifacts is None:
+                _artifacts = ArtifactStore()
+    return _artifacts
+
+
+def put_artifact(data: bytes) -> str:
+    return get_artifacts().put(data)
+
+
+def get_artifact(handle: str) -> bytes:
+    return get_artifacts().get(handle)
@@ -0,0 +1,194 @@
+# utils/chart_renderer.py
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from utils.metrics import count
+
+CHART_CACHE_MAX_BYTES = int(os.getenv("CHART_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+# Worker processes for rendering; 0 renders in the calling thread
+CHART_PROCESSES = int(os.getenv("CHART_PROCESSES", "0"))
+
+
+def _new_figure(figsize: Tuple[float, float]):
+    # Figure + Agg canvas directly: no pyplot global state, no GUI backend
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    figure = Figure(figsize=figsize)
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _png_bytes(figure) -> bytes:
+    buffer = BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _draw_churn_chart(author_churn: List[Tuple[str, int]]) -> bytes:
+    figure = _new_figure((10, 6))
+    ax = figure.add_subplot()
+    bars = ax.bar([str(author) for author, _ in author_churn], [churn for _, churn in author_churn], color='skyblue')
+    ax.set_xlabel("Author")
+    ax.set_ylabel("Total Churn")
+    ax.set_title("Code Churn by Author")
+    # Value labels sit a fixed number of points above each bar, whatever the y scale
+    ax.bar_label(bars, padding=3)
+
+    figure.tight_layout()
+    return _png_bytes(figure)
+
+
+def _draw_review_map(edges: List[Tuple[Any, ...]], title: Optional[str] = None,
+                     positions: Optional[Dict[str, Tuple[float, float]]] = None,
+                     node_sizes: Optional[Dict[str, float]] = None,
+                     nodes: Optional[List[Any]] = None) -> bytes:
+    import networkx as nx
+
+    # Edges are (author, reviewer) or (author, reviewer, weight); 'nodes' keeps ones without edges
+    graph = nx.DiGraph()
+    graph.add_nodes_from(nodes or [])
+    graph.add_edges_from((edge[0], edge[1], {"weight": edge[2] if len(edge) > 2 else 1}) for edge in edges)
+    figure = _new_figure((10, 8))
+    ax = figure.add_subplot()
+    known = {node: tuple(positions[node]) for node in graph if node in positions} if positions else {}
+    if len(known) == len(graph):
+        pos = known
+    else:
+        # Nodes the cached layout doesn't cover are placed around the ones it does
+        pos = nx.spring_layout(graph, pos=known or None, fixed=list(known) or None, seed=42)
+    weights = [weight for _, _, weight in graph.edges(data="weight")]
+    heaviest = max(weights, default=1) or 1
+
+    nx.draw(
+        graph, pos,
+        ax=ax,
+        with_labels=True,
+        node_color='lightblue',
+        edge_color='gray',
+        node_size=[node_sizes.get(node, 3000) for node in graph] if node_sizes else 3000,
+        font_size=10,
+        arrows=True,
+        width=[0.5 + 2.5 * weight / heaviest for weight in weights],
+        alpha=0.9
+    )
+    if title:
+        ax.set_title(title)
+    return _png_bytes(figure)
+
+
+RENDERERS = {
+    "churn_chart": _draw_churn_chart,
+    "review_map": _draw_review_map,
+}
+
+
+def _render(kind: str, args: Tuple[Any, ...]) -> bytes:
+    return RENDERERS[kind](*args)
+
+
+class ChartRenderer:
+    """
+    Renders charts to PNG bytes in a single pass and keeps recent PNGs in an
+    LRU cache keyed by a hash of the chart kind and its input data, so an
+    unchanged report never re-renders. With processes > 0, renders run in a
+    process pool so concurrent reports don't contend inside one interpreter.
+    """
+
+    def __init__(self, max_bytes: int = CHART_CACHE_MAX_BYTES, processes: int = CHART_PROCESSES):
+        self.max_bytes = max_bytes
+        self.processes = processes
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @staticmethod
+    def key(kind: str, args: Sequence[Any]) -> str:
+        payload = json.dumps([kind, list(args)], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                # spawn: forking a process that runs HTTP/DB threads is unsafe
+                self._pool = ProcessPoolExecutor(self.processes, mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def render(self, kind: str, *args: Any) -> bytes:
+        key = self.key(kind, args)
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                count("chart_cache_hits")
+                return png
+            self.misses += 1
+        count("chart_cache_misses")
+
+        if self.processes > 0:
+            png = self._get_pool().submit(_render, kind, args).result()
+        else:
+            png = _render(kind, args)
+
+        with self._lock:
+            if key not in self._entries and len(png) <= self.max_bytes:
+                self._entries[key] = png
+                self._size += len(png)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return png
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "bytes": self._size}
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool:
+            pool.shutdown()
+
+
+_renderer: Optional[ChartRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> ChartRenderer:
+    """Returns the shared renderer."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ChartRenderer()
+    return _renderer
+
+
+# 📊 Public chart helpers, PNG bytes out
+
+def render_churn_chart(author_churn: Dict[str, int]) -> bytes:
+    return get_renderer().render("churn_chart", list(author_churn.items()))
+
+
+def render_review_map(edges: Sequence[Tuple[Any, ...]], title: Optional[str] = None,
+                      positions: Optional[Dict[str, Tuple[float, float]]] = None,
+                      node_sizes: Optional[Dict[str, float]] = None,
+                      nodes: Optional[Sequence[Any]] = None) -> bytes:
+    return get_renderer().render("review_map", [list(edge) for edge in edges], title, positions, node_sizes,
+                                 list(nodes) if nodes is not None else None)
+
+
+def to_base64(png: bytes) -> str:
+    return base64.b64encode(png).decode("utf-8")
@@ -0,0 +1,195 @@
+# utils/github_client.py
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from dotenv import load_dotenv
+
+from utils.http_cache import HttpCache
+from utils.metrics import count
+from utils.rate_limiter import RateLimitScheduler
+
+load_dotenv()
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+# Comma-separated pool of tokens to rotate across; falls back to GITHUB_TOKEN
+GITHUB_TOKENS = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",") if t.strip()] or [GITHUB_TOKEN]
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "5"))
+# Ingestion backend: 'rest', 'graphql' or 'git' (local mirror; reviews still use REST)
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "rest").lower()
+GITHUB_MAX_WORKERS = int(os.getenv("GITHUB_MAX_WORKERS", "8"))
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "30"))
+GITHUB_CACHE = os.getenv("GITHUB_CACHE", "1") != "0"
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+_cache: Optional[HttpCache] = None
+_scheduler: Optional[RateLimitScheduler] = None
+
+
+# 🔌 One keep-alive session per process, sized for the worker pool
+def get_session() -> requests.Session:
+    """
+    Returns the shared requests.Session used by every GitHub caller.
+    Connections are pooled, so repeated calls reuse the same TLS connection.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(GITHUB_MAX_WORKERS, 10))
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_cache() -> Optional[HttpCache]:
+    """Returns the shared ETag cache, or None when GITHUB_CACHE=0."""
+    global _cache
+    if not GITHUB_CACHE:
+        return None
+    if _cache is None:
+        with _session_lock:
+            if _cache is None:
+                _cache = HttpCache()
+    return _cache
+
+
+def get_scheduler() -> RateLimitScheduler:
+    """Returns the shared rate-limit scheduler over the GITHUB_TOKENS pool."""
+    global _scheduler
+    if _scheduler is None:
+        with _session_lock:
+            if _scheduler is None:
+                _scheduler = RateLimitScheduler(GITHUB_TOKENS)
+    return _scheduler
+
+
+def github_headers(token: Optional[str] = None) -> Dict[str, str]:
+    token = token or GITHUB_TOKEN
+    headers = {"Accept": "application/vnd.github.v3+json"}
+    if token:
+        headers["Authorization"] = f"token {token}"
+    return headers
+
+
+def github_url(path_or_url: str) -> str:
+    if path_or_url.startswith(("http://", "https://")):
+        return path_or_url
+    return f"{GITHUB_API_URL}{path_or_url}"
+
+
+def _request(url: str, token: Optional[str], extra_headers: Dict[str, str],
+             method: str = "GET", json_body: Optional[Dict[str, Any]] = None,
+             conditional: Optional[Callable[[Optional[str]], Dict[str, str]]] = None
+             ) -> Tuple[requests.Response, Optional[str]]:
+    # ⏳ Every attempt goes through the scheduler, which may wait or switch tokens;
+    # cache validators are looked up per attempt for the token actually sent
+    scheduler = get_scheduler()
+    for attempt in range(GITHUB_MAX_RETRIES + 1):
+        used_token = scheduler.acquire(token)
+        headers = github_headers(used_token)
+        headers.update(extra_headers)
+        if conditional:
+            headers.update(conditional(used_token))
+        response = get_session().request(method, url, headers=headers, json=json_body, timeout=GITHUB_TIMEOUT)
+        count("http_requests")
+        count("http_bytes", len(response.content))
+
+        delay = scheduler.record(used_token, response)
+        if delay is None or attempt == GITHUB_MAX_RETRIES:
+            break
+        print(f"⏳ GitHub rate limit hit ({response.status_code}), retrying in {delay:.1f}s")
+    return response, used_token
+
+
+def _send(url: str, token: Optional[str], extra_headers: Dict[str, str],
+          method: str = "GET", json_body: Optional[Dict[str, Any]] = None) -> requests.Response:
+    return _request(url, token, extra_headers, method=method, json_body=json_body)[0]
+
+
+def github_get(path_or_url: str, params: Optional[Dict[str, Any]] = None,
+               token: Optional[str] = None) -> requests.Response:
+    """
+    GET a GitHub REST endpoint (path like '/repos/o/r/commits' or a full URL)
+    through the pooled session and the rate-limit scheduler. Cached URLs are
+    revalidated with If-None-Match, and a 304 is answered from the on-disk
+    cache as a regular 200 response. Entries are kept per token, so a body
+    fetched with one token is never served to a request made with another.
+    """
+    url = requests.Request("GET", github_url(path_or_url), params=params).prepare().url
+    cache = get_cache()
+    if not cache:
+        return _send(url, token, {})
+
+    response, used_token = _request(url, token, {}, conditional=lambda t: cache.conditional_headers(url, t))
+    if response.status_code == 304:
+        cached = cache.load(url, used_token)
+        if cached is not None:
+            count("http_cache_hits")
+            return cached
+        # Entry was evicted between the lookup and the 304; refetch unconditionally
+        response, used_token = _request(url, token, {})
+    cache.store(url, response, used_token)
+    return response
+
+
+def github_graphql(query: str, variables: Optional[Dict[str, Any]] = None,
+                   token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    POSTs a GraphQL query and returns its 'data'. Raises on HTTP or GraphQL errors.
+    """
+    response = _send(GITHUB_GRAPHQL_URL, token, {}, method="POST",
+                     json_body={"query": query, "variables": variables or {}})
+    if response.status_code != 200:
+        raise Exception(f"❌ GitHub GraphQL error: {response.status_code}, {response.text}")
+
+    payload = response.json()
+    if payload.get("errors"):
+        raise Exception(f"❌ GitHub GraphQL error: {payload['errors']}")
+    return payload.get("data") or {}
+
+
+# 📄 Link: rel="next" pagination
+def iter_pages(path_or_url: str, params: Optional[Dict[str, Any]] = None,
+               token: Optional[str] = None) -> Iterator[List[Any]]:
+    """
+    Yields one page (a JSON list) at a time, following the Link rel="next"
+    header until GitHub stops sending one. Only the current page is held in memory.
+    """
+    url = path_or_url
+    while url:
+        response = github_get(url, params=params, token=token)
+        if response.status_code != 200:
+            raise Exception(f"❌ GitHub API error: {response.status_code}, {response.text}")
+
+        yield response.json()
+
+        # The next link already carries every query parameter
+        url = response.links.get("next", {}).get("url")
+        params = None
+
+
+# 🧵 Bounded fan-out, results come back in input order
+def map_concurrent(fn: Callable[[Any], Any], items: Iterable[Any],
+                   max_workers: Optional[int] = None) -> List[Any]:
+    """
+    Applies fn to every item using at most max_workers in-flight calls.
+    """
+    items = list(items)
+    workers = max(1, min(max_workers or GITHUB_MAX_WORKERS, len(items) or 1))
+    if workers == 1:
+        return [fn(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="github") as pool:
+        # Each call runs in a copy of the caller's context, so per-node metrics still see it
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
@@ -0,0 +1,107 @@
+# utils/http_cache.py
+import hashlib
+import json
+import os
+from typing import Dict, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from utils.repo_store import ROOT_DIR
+from utils.sqlite_lru import SqliteLru
+
+GITHUB_CACHE_PATH = os.getenv("GITHUB_CACHE_PATH", os.path.join(ROOT_DIR, "data", "http_cache.db"))
+GITHUB_CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Response headers worth replaying on a cache hit
+KEPT_HEADERS = ("ETag", "Last-Modified", "Link", "Content-Type")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scoped_responses (
+    scope TEXT NOT NULL,
+    url TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (scope, url)
+);
+CREATE INDEX IF NOT EXISTS idx_scoped_responses_last_access ON scoped_responses (last_access);
+"""
+
+
+def token_scope(token: Optional[str]) -> str:
+    """Cache partition for a token: a short hash, so tokens with different repo access never share entries."""
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+class HttpCache(SqliteLru):
+    """
+    On-disk conditional-request cache. Stores the ETag/Last-Modified validators
+    and body of every 200 response per (token, URL), and evicts
+    least-recently-used entries once the stored bodies exceed max_bytes.
+    """
+
+    SCHEMA = SCHEMA
+    TABLE = "scoped_responses"
+    KEY = ("scope", "url")
+
+    def __init__(self, path: str = GITHUB_CACHE_PATH, max_bytes: int = GITHUB_CACHE_MAX_BYTES):
+        super().__init__(path, max_bytes)
+
+    def conditional_headers(self, url: str, token: Optional[str] = None) -> Dict[str, str]:
+        """Returns If-None-Match / If-Modified-Since headers for a URL cached under this token."""
+        with self._lock:
+            row = self._fetch((token_scope(token), url), "etag, last_modified")
+        if not row:
+            return {}
+        headers = {}
+        if row["etag"]:
+            headers["If-None-Match"] = row["etag"]
+        if row["last_modified"]:
+            headers["If-Modified-Since"] = row["last_modified"]
+        return headers
+
+    def load(self, url: str, token: Optional[str] = None) -> Optional[requests.Response]:
+        """Rebuilds the 200 response cached for url under this token, marking it recently used."""
+        key = (token_scope(token), url)
+        with self._lock, self._conn:
+            row = self._fetch(key, "headers, body")
+            if not row:
+                return None
+            self._touch(key)
+            self.hits += 1
+
+        response = requests.Response()
+        response.status_code = 200
+        response.url = url
+        response.encoding = "utf-8"
+        response._content = row["body"]
+        response.headers = CaseInsensitiveDict(json.loads(row["headers"]))
+        response.headers["X-From-Cache"] = "1"
+        return response
+
+    def store(self, url: str, response: requests.Response, token: Optional[str] = None):
+        """Caches a 200 response, fetched with this token, if it carries a validator."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        headers = {k: response.headers[k] for k in KEPT_HEADERS if k in response.headers}
+        body = response.content
+        with self._lock, self._conn:
+            self.misses += 1
+            self._put_row({
+                "scope": token_scope(token),
+                "url": url,
+                "etag": etag,
+                "last_modified": last_modified,
+                "headers": json.dumps(headers),
+                "body": body,
+                "size": len(body)
+            })
@@ -0,0 +1,94 @@
+# utils/llm_cache.py
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+
+from utils.repo_store import ROOT_DIR
+from utils.sqlite_lru import SqliteLru
+
+LLM_CACHE = os.getenv("LLM_CACHE", "1") != "0"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(ROOT_DIR, "data", "llm_cache.db"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS completions (
+    key TEXT PRIMARY KEY,
+    driver TEXT NOT NULL,
+    model TEXT NOT NULL,
+    completion TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_completions_last_access ON completions (last_access);
+"""
+
+
+def completion_key(driver: str, model: str, prompt: str) -> str:
+    """Content address of a completion: the same rendered prompt to the same model gets the same key."""
+    digest = hashlib.sha256()
+    for part in (driver, model, prompt):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class LlmCache(SqliteLru):
+    """
+    On-disk cache of LLM completions keyed by completion_key(). Entries older
+    than ttl seconds are treated as misses, and least-recently-used entries are
+    evicted once the stored completions exceed max_bytes.
+    """
+
+    SCHEMA = SCHEMA
+    TABLE = "completions"
+    KEY = ("key",)
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES):
+        super().__init__(path, max_bytes)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached completion for key, or None if missing or expired."""
+        with self._lock, self._conn:
+            row = self._fetch((key,), "completion, size, created_at")
+            if row and time.time() - row["created_at"] > self.ttl:
+                self._delete((key,), row["size"])
+                row = None
+            if not row:
+                self.misses += 1
+                return None
+            self._touch((key,))
+            self.hits += 1
+        return row["completion"]
+
+    def put(self, key: str, driver: str, model: str, completion: str):
+        with self._lock, self._conn:
+            self._put_row({
+                "key": key,
+                "driver": driver,
+                "model": model,
+                "completion": completion,
+                "size": len(completion.encode("utf-8")),
+                "created_at": time.time()
+            })
+
+
+_cache: Optional[LlmCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LlmCache]:
+    """Returns the shared completion cache, or None when LLM_CACHE=0."""
+    global _cache
+    if not LLM_CACHE:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LlmCache()
+    return _cache
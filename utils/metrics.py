@@ -0,0 +1,301 @@
+# utils/metrics.py
+import contextvars
+import functools
+import json
+import os
+import resource
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Append one JSON line per pipeline run to this file; empty emits nothing
+METRICS_PATH = os.getenv("METRICS_PATH", "")
+# Prometheus text endpoint for long-running processes (the Slack bot); 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+# Track Python allocation peaks per node with tracemalloc (slows allocation-heavy nodes;
+# peaks blur when nodes overlap)
+METRICS_TRACEMALLOC = os.getenv("METRICS_TRACEMALLOC", "0") == "1"
+
+# Counters callers can bump while a node runs:
+#   http_requests, http_bytes, http_cache_hits, llm_calls, llm_prompt_tokens,
+#   llm_completion_tokens, llm_cache_hits, llm_cache_misses, chart_cache_hits, chart_cache_misses
+
+
+class Counters:
+    """Thread-safe named counters; a node's worker threads all add to the same instance."""
+
+    def __init__(self):
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, value: float = 1):
+        with self._lock:
+            self._values[name] = self._values.get(name, 0) + value
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._values)
+
+
+class RunMetrics:
+    """Node records of one pipeline run, plus its cProfile data when profiling."""
+
+    def __init__(self, labels: Dict[str, Any], profile_path: Optional[str] = None):
+        self.labels = labels
+        self.profile_path = profile_path
+        self.started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self.nodes: List[Dict[str, Any]] = []
+        self.profiles: List[Any] = []
+        self.wall_s = 0.0
+        self.error: Optional[str] = None
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add_node(self, record: Dict[str, Any], profiler=None):
+        with self._lock:
+            self.nodes.append(record)
+            if profiler is not None:
+                self.profiles.append(profiler)
+
+    def finish(self):
+        self.wall_s = round(time.perf_counter() - self._start, 4)
+
+    def totals(self) -> Dict[str, float]:
+        totals: Dict[str, float] = {}
+        for record in self.nodes:
+            for name, value in record.get("counters", {}).items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            **self.labels,
+            "wall_s": self.wall_s,
+            "error": self.error,
+            "max_rss_mb": _max_rss_mb(),
+            "totals": self.totals(),
+            "nodes": sorted(self.nodes, key=lambda record: record["started"])
+        }
+
+    def dump_profile(self, path: str):
+        import pstats
+
+        if not self.profiles:
+            return
+        stats = pstats.Stats(self.profiles[0])
+        for profiler in self.profiles[1:]:
+            stats.add(profiler)
+        stats.dump_stats(path)
+        print(f"🔬 Profile of {len(self.profiles)} nodes written to {path} (python -m pstats {path})")
+
+
+_node_counters: contextvars.ContextVar[Optional[Counters]] = contextvars.ContextVar("node_counters", default=None)
+_current_run: contextvars.ContextVar[Optional[RunMetrics]] = contextvars.ContextVar("current_run", default=None)
+
+
+def _max_rss_mb() -> float:
+    # Linux reports ru_maxrss in KiB
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+# 📈 Process-wide totals behind the Prometheus endpoint
+class Registry:
+    def __init__(self):
+        self._nodes: Dict[str, Dict[str, float]] = {}
+        self._counters: Dict[Tuple[str, str], float] = {}
+        self._runs = {"runs": 0, "errors": 0, "wall_s": 0.0}
+        self._gauges: Dict[str, Tuple[str, Callable[[], Dict[str, float]]]] = {}
+        self._lock = threading.Lock()
+
+    def add_counter(self, node: str, name: str, value: float):
+        with self._lock:
+            self._counters[(node, name)] = self._counters.get((node, name), 0) + value
+
+    def observe_node(self, record: Dict[str, Any]):
+        with self._lock:
+            node = self._nodes.setdefault(record["node"], {"runs": 0, "errors": 0, "wall_s": 0.0, "cpu_s": 0.0})
+            node["runs"] += 1
+            node["errors"] += 1 if record.get("error") else 0
+            node["wall_s"] += record["wall_s"]
+            node["cpu_s"] += record["cpu_s"]
+            for name, value in record.get("counters", {}).items():
+                self._counters[(record["node"], name)] = self._counters.get((record["node"], name), 0) + value
+
+    def observe_run(self, run: RunMetrics):
+        with self._lock:
+            self._runs["runs"] += 1
+            self._runs["errors"] += 1 if run.error else 0
+            self._runs["wall_s"] += run.wall_s
+
+    def register_gauge(self, name: str, fn: Callable[[], Dict[str, float]], label: str = "state"):
+        """fn returns {value of 'label': number}; it is read on every scrape."""
+        with self._lock:
+            self._gauges[name] = (label, fn)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+        with self._lock:
+            nodes = {name: dict(values) for name, values in self._nodes.items()}
+            counters = dict(self._counters)
+            runs = dict(self._runs)
+            gauges = dict(self._gauges)
+
+        lines = [
+            "# TYPE fika_runs_total counter", f"fika_runs_total {runs['runs']}",
+            "# TYPE fika_run_errors_total counter", f"fika_run_errors_total {runs['errors']}",
+            "# TYPE fika_run_seconds_total counter", f"fika_run_seconds_total {runs['wall_s']:.6f}",
+        ]
+        for metric, key in (("fika_node_runs_total", "runs"), ("fika_node_errors_total", "errors"),
+                            ("fika_node_seconds_total", "wall_s"), ("fika_node_cpu_seconds_total", "cpu_s")):
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{node="{node}"}} {values[key]:g}' for node, values in sorted(nodes.items()))
+        for name in sorted({name for _, name in counters}):
+            lines.append(f"# TYPE fika_{name}_total counter")
+            lines.extend(
+                f'fika_{name}_total{{node="{node}"}} {value:g}'
+                for (node, counter), value in sorted(counters.items()) if counter == name
+            )
+        lines.append("# TYPE fika_process_max_rss_bytes gauge")
+        lines.append(f"fika_process_max_rss_bytes {int(_max_rss_mb() * 1024 * 1024)}")
+        for name, (label_name, fn) in sorted(gauges.items()):
+            try:
+                values = fn()
+            except Exception as e:
+                print(f"⚠️ Gauge {name} failed: {e}")
+                continue
+            lines.append(f"# TYPE fika_{name} gauge")
+            lines.extend(f'fika_{name}{{{label_name}="{label}"}} {value:g}' for label, value in sorted(values.items()))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# 🔢 Counting from anywhere in a node's call tree
+def count(name: str, value: float = 1):
+    """Adds value to the named counter of the node running in this context."""
+    counters = _node_counters.get()
+    if counters is not None:
+        counters.add(name, value)
+    else:
+        registry.add_counter("", name, value)
+
+
+def instrument_node(name: str, fn: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Wraps a graph node to record wall time, thread CPU time, memory and the
+    counters bumped while it runs. CPU time covers the node's own thread, not
+    the fetch pools it fans out to.
+    """
+    @functools.wraps(fn)
+    def node(state: Dict[str, Any]) -> Dict[str, Any]:
+        run = _current_run.get()
+        counters = Counters()
+        token = _node_counters.set(counters)
+        profiler = None
+        if run is not None and run.profile_path:
+            import cProfile
+            profiler = cProfile.Profile()
+        tracing = METRICS_TRACEMALLOC and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        rss_before = _max_rss_mb()
+        started = time.perf_counter()
+        cpu_started = time.thread_time()
+        error = None
+        try:
+            if profiler:
+                profiler.enable()
+            return fn(state)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            _node_counters.reset(token)
+            record = {
+                "node": name,
+                "started": round(started - run._start, 4) if run else 0.0,
+                "wall_s": round(time.perf_counter() - started, 4),
+                "cpu_s": round(time.thread_time() - cpu_started, 4),
+                "max_rss_mb": _max_rss_mb(),
+                "rss_growth_mb": round(_max_rss_mb() - rss_before, 1),
+                "counters": counters.snapshot(),
+                "error": error
+            }
+            if tracing:
+                record["py_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+            registry.observe_node(record)
+            if run is not None:
+                run.add_node(record, profiler)
+
+    return node
+
+
+@contextmanager
+def instrumented_run(profile_path: Optional[str] = None, **labels: Any) -> Iterator[RunMetrics]:
+    """
+    Collects every instrumented node that runs inside the block (including
+    LangGraph worker threads, which inherit the context) and emits one JSON
+    record when it exits. With profile_path, each node runs under cProfile and
+    the merged stats are written there.
+    """
+    run = RunMetrics(labels, profile_path)
+    token = _current_run.set(run)
+    if METRICS_TRACEMALLOC and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    try:
+        yield run
+    except Exception as e:
+        run.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current_run.reset(token)
+        run.finish()
+        registry.observe_run(run)
+        emit_run(run)
+        if profile_path:
+            run.dump_profile(profile_path)
+
+
+def emit_run(run: RunMetrics):
+    if not METRICS_PATH:
+        return
+    line = json.dumps(run.to_dict(), default=str)
+    os.makedirs(os.path.dirname(os.path.abspath(METRICS_PATH)), exist_ok=True)
+    with open(METRICS_PATH, "a") as f:
+        f.write(line + "\n")
+
+
+# 🌐 Prometheus endpoint
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> Optional[ThreadingHTTPServer]:
+    """Serves /metrics on a daemon thread; returns None when port is 0."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics").start()
+    print(f"📈 Prometheus metrics on :{port}/metrics")
+    return server
@@ -0,0 +1,139 @@
+# utils/rate_limiter.py
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+
+GITHUB_RATE_RESERVE = float(os.getenv("GITHUB_RATE_RESERVE", "0.1"))
+GITHUB_BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", "1"))
+GITHUB_BACKOFF_MAX = float(os.getenv("GITHUB_BACKOFF_MAX", "60"))
+
+# Assumed hourly budget until GitHub reports the real one
+DEFAULT_LIMIT = 5000
+
+
+class TokenState:
+    def __init__(self, token: Optional[str]):
+        self.token = token
+        self.limit = DEFAULT_LIMIT
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.next_allowed = 0.0
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+        self.requests = 0
+
+
+class RateLimitScheduler:
+    """
+    Spreads GitHub requests across a pool of tokens.
+    - Reads X-RateLimit-Remaining/Reset after every response and, once a token
+      drops below the reserve fraction, paces it so its remaining budget lasts
+      until the reset (a token bucket refilled by GitHub's own counters).
+    - Primary-limit 403s park the token until X-RateLimit-Reset; secondary-limit
+      403/429s honour Retry-After, or back off exponentially when it is absent.
+    - Always hands out the unblocked token with the most budget left.
+    """
+
+    def __init__(self, tokens: List[Optional[str]], reserve: float = GITHUB_RATE_RESERVE):
+        self.reserve = reserve
+        self._states = {token: TokenState(token) for token in (tokens or [None])}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.throttled_responses = 0
+        self.throttled_seconds = 0.0
+        # End of the throttle window already counted, so threads waiting together count it once
+        self._throttled_until = 0.0
+
+    def acquire(self, token: Optional[str] = None) -> Optional[str]:
+        """
+        Blocks until a token may send its next request and returns it.
+        A token passed explicitly is used as-is (and tracked); otherwise the pool picks.
+        throttled_seconds grows by the wall-clock time spent waiting, however
+        many threads wait at once.
+        """
+        while True:
+            with self._lock:
+                if token is not None and token not in self._states:
+                    self._states[token] = TokenState(token)
+                candidates = [self._states[token]] if token is not None else list(self._states.values())
+
+                now = time.time()
+                ready = [s for s in candidates if max(s.blocked_until, s.next_allowed) <= now]
+                if ready:
+                    state = max(ready, key=lambda s: s.limit if s.remaining is None else s.remaining)
+                    state.requests += 1
+                    if state.remaining is not None:
+                        state.remaining = max(state.remaining - 1, 0)
+                    self.requests += 1
+                    return state.token
+
+                wait = min(max(s.blocked_until, s.next_allowed) for s in candidates) - now
+
+            wait = max(wait, 0.01)
+            with self._lock:
+                until = now + wait
+                self.throttled_seconds += max(until - max(now, self._throttled_until), 0.0)
+                self._throttled_until = max(self._throttled_until, until)
+            time.sleep(wait)
+
+    def record(self, token: Optional[str], response: requests.Response) -> Optional[float]:
+        """
+        Updates the token's budget from the response headers.
+        Returns None when the response can be used, or the number of seconds
+        the token is parked for when the request should be retried.
+        """
+        headers = response.headers
+        now = time.time()
+        with self._lock:
+            state = self._states.setdefault(token, TokenState(token))
+
+            if "X-RateLimit-Limit" in headers:
+                state.limit = int(headers["X-RateLimit-Limit"])
+            if "X-RateLimit-Remaining" in headers:
+                state.remaining = int(headers["X-RateLimit-Remaining"])
+            if "X-RateLimit-Reset" in headers:
+                state.reset_at = float(headers["X-RateLimit-Reset"])
+
+            throttled = response.status_code == 429 or (
+                response.status_code == 403
+                and ("Retry-After" in headers or state.remaining == 0 or "rate limit" in response.text.lower())
+            )
+
+            if not throttled:
+                state.backoff = 0.0
+                # 🪣 Pace the token once it is inside its reserve
+                if state.remaining is not None and state.reset_at > now \
+                        and state.remaining < state.limit * self.reserve:
+                    state.next_allowed = now + (state.reset_at - now) / max(state.remaining, 1)
+                return None
+
+            self.throttled_responses += 1
+            if "Retry-After" in headers:
+                delay = float(headers["Retry-After"])
+            elif state.remaining == 0 and state.reset_at > now:
+                delay = state.reset_at - now
+            else:
+                state.backoff = min(max(state.backoff * 2, GITHUB_BACKOFF_BASE), GITHUB_BACKOFF_MAX)
+                delay = state.backoff
+            state.blocked_until = now + delay
+            return delay
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "throttled_responses": self.throttled_responses,
+                "throttled_seconds": round(self.throttled_seconds, 3),
+                "tokens": [
+                    {
+                        "token": f"…{s.token[-4:]}" if s.token else None,
+                        "requests": s.requests,
+                        "remaining": s.remaining,
+                        "reset_at": s.reset_at
+                    }
+                    for s in self._states.values()
+                ]
+            }
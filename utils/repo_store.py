@@ -0,0 +1,671 @@
+# utils/repo_store.py
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from utils.sqlite_lru import connect
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_STORE_PATH = os.getenv("REPO_STORE_PATH", os.path.join(ROOT_DIR, "data", "repo_store.db"))
+
+COMMIT_FIELDS = ("sha", "author", "timestamp", "additions", "deletions", "files_changed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    author TEXT,
+    timestamp TEXT,
+    additions INTEGER NOT NULL DEFAULT 0,
+    deletions INTEGER NOT NULL DEFAULT 0,
+    files_changed INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (owner, repo, sha)
+);
+CREATE INDEX IF NOT EXISTS idx_commits_timestamp ON commits (owner, repo, timestamp);
+
+CREATE TABLE IF NOT EXISTS commit_files (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    path TEXT NOT NULL,
+    additions INTEGER NOT NULL,
+    deletions INTEGER NOT NULL,
+    status TEXT,
+    PRIMARY KEY (owner, repo, sha, path)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS hotspots (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    churn INTEGER NOT NULL,
+    touches INTEGER NOT NULL,
+    authors INTEGER NOT NULL,
+    last_touched TEXT,
+    PRIMARY KEY (owner, repo, path)
+);
+CREATE INDEX IF NOT EXISTS idx_hotspots_churn ON hotspots (owner, repo, is_dir, churn);
+
+CREATE TABLE IF NOT EXISTS hotspot_authors (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    path TEXT NOT NULL,
+    author TEXT NOT NULL,
+    PRIMARY KEY (owner, repo, path, author)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS churn_aggregates (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    rules_key TEXT NOT NULL,
+    watermark INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (owner, repo, rules_key)
+);
+
+CREATE TABLE IF NOT EXISTS pull_requests (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    author TEXT,
+    updated_at TEXT,
+    PRIMARY KEY (owner, repo, number)
+);
+CREATE INDEX IF NOT EXISTS idx_pull_requests_updated ON pull_requests (owner, repo, updated_at);
+
+CREATE TABLE IF NOT EXISTS pull_reviewers (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    reviewer TEXT NOT NULL,
+    reviews INTEGER NOT NULL,
+    PRIMARY KEY (owner, repo, number, reviewer)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS review_edges (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    author TEXT NOT NULL,
+    reviewer TEXT NOT NULL,
+    pulls INTEGER NOT NULL,
+    reviews INTEGER NOT NULL,
+    PRIMARY KEY (owner, repo, author, reviewer)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS review_layouts (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    graph_key TEXT NOT NULL,
+    positions TEXT NOT NULL,
+    PRIMARY KEY (owner, repo)
+);
+
+CREATE TABLE IF NOT EXISTS review_sync_state (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    last_updated_at TEXT,
+    synced_at TEXT,
+    PRIMARY KEY (owner, repo)
+);
+
+CREATE TABLE IF NOT EXISTS scheduled_runs (
+    job_id TEXT NOT NULL,
+    phase TEXT NOT NULL,
+    period TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at TEXT,
+    finished_at TEXT,
+    PRIMARY KEY (job_id, phase, period)
+);
+
+CREATE TABLE IF NOT EXISTS slack_uploads (
+    artifact TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    file_id TEXT NOT NULL,
+    permalink TEXT,
+    uploaded_at TEXT NOT NULL,
+    PRIMARY KEY (artifact, channel)
+);
+
+CREATE TABLE IF NOT EXISTS author_logins (
+    email TEXT PRIMARY KEY,
+    login TEXT,
+    resolved_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    owner TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    last_sha TEXT,
+    last_timestamp TEXT,
+    synced_at TEXT,
+    PRIMARY KEY (owner, repo)
+);
+"""
+
+
+def _parse_utc(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+def _touched_paths(files: Iterable[Tuple[str, int, int, Optional[str]]]) -> Dict[str, List[int]]:
+    # 🔥 Every file and each of its parent directories ('src/', 'src/api/'): {path: [churn, is_dir]}
+    touched: Dict[str, List[int]] = {}
+    for path, adds, dels, _ in files:
+        churn = (adds or 0) + (dels or 0)
+        touched.setdefault(path, [0, 0])[0] += churn
+        parts = path.split("/")[:-1]
+        for depth in range(1, len(parts) + 1):
+            touched.setdefault("/".join(parts[:depth]) + "/", [0, 1])[0] += churn
+    return touched
+
+class RepoStore:
+    """
+    Embedded SQLite store for ingested GitHub records, keyed by (owner, repo, sha).
+    One connection is shared across threads and guarded by a lock.
+    """
+
+    def __init__(self, path: str = REPO_STORE_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = connect(path, SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # 📥 Commits
+    def upsert_commits(self, owner: str, repo: str, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Inserts commits not stored yet and folds their per-file data into the
+        hotspot index. Returns the number of new commits.
+        """
+        records = list(records)
+        with self._lock, self._conn:
+            known = self.known_shas(owner, repo, [r["sha"] for r in records])
+            new_records = [r for r in records if r["sha"] not in known]
+            # Commits are immutable per SHA; IGNORE keeps each row's rowid stable for aggregate watermarks
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO commits "
+                "(owner, repo, sha, author, timestamp, additions, deletions, files_changed) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (owner, repo, r["sha"], r.get("author"), r.get("timestamp"),
+                     r.get("additions", 0), r.get("deletions", 0), r.get("files_changed", 0))
+                    for r in new_records
+                ]
+            )
+            for record in new_records:
+                if record.get("files"):
+                    self._index_files(owner, repo, record)
+        return len(new_records)
+
+    def _index_files(self, owner: str, repo: str, record: Dict[str, Any]):
+        # Every file and each of its parent directories gets a hotspot row
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO commit_files (owner, repo, sha, path, additions, deletions, status) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(owner, repo, record["sha"], path, adds, dels, status) for path, adds, dels, status in record["files"]]
+        )
+
+        touched = _touched_paths(record["files"])
+        timestamp = record.get("timestamp")
+        self._conn.executemany(
+            "INSERT INTO hotspots (owner, repo, path, is_dir, churn, touches, authors, last_touched) "
+            "VALUES (?, ?, ?, ?, ?, 1, 0, ?) "
+            "ON CONFLICT (owner, repo, path) DO UPDATE SET "
+            "churn = churn + excluded.churn, touches = touches + 1, "
+            "last_touched = MAX(COALESCE(last_touched, ''), COALESCE(excluded.last_touched, ''))",
+            [(owner, repo, path, is_dir, churn, timestamp) for path, (churn, is_dir) in touched.items()]
+        )
+
+        author = record.get("author") or "unknown"
+        for path in touched:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO hotspot_authors (owner, repo, path, author) VALUES (?, ?, ?, ?)",
+                (owner, repo, path, author)
+            ).rowcount
+            if inserted:
+                self._conn.execute(
+                    "UPDATE hotspots SET authors = authors + 1 WHERE owner = ? AND repo = ? AND path = ?",
+                    (owner, repo, path)
+                )
+
+    def top_hotspots(self, owner: str, repo: str, prefix: str = "", k: int = 10, directories: bool = False,
+                     since: Optional[str] = None, until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Top-k files (or directories) under a path prefix by churn, with touch
+        count, distinct authors and last-touched timestamp. With since/until,
+        all of those cover only the window's commits; otherwise the all-time
+        hotspot index answers.
+        """
+        if since or until:
+            return self._window_hotspots(owner, repo, prefix, k, directories, since, until)
+        query = (
+            "SELECT path, churn, touches, authors, last_touched FROM hotspots "
+            "WHERE owner = ? AND repo = ? AND is_dir = ?"
+        )
+        params: List[Any] = [owner, repo, int(directories)]
+        if prefix:
+            # Range scan on the primary key instead of LIKE
+            query += " AND path >= ? AND path < ?"
+            params += [prefix, prefix + "\U0010ffff"]
+        query += " ORDER BY churn DESC LIMIT ?"
+        params.append(k)
+
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params)]
+
+    def _window_hotspots(self, owner: str, repo: str, prefix: str, k: int, directories: bool,
+                         since: Optional[str], until: Optional[str]) -> List[Dict[str, Any]]:
+        # Folds the window's per-file rows the same way _index_files builds the all-time index
+        query = (
+            "SELECT c.sha, c.author, c.timestamp, f.path, f.additions, f.deletions FROM commits c "
+            "JOIN commit_files f ON f.owner = c.owner AND f.repo = c.repo AND f.sha = c.sha "
+            "WHERE c.owner = ? AND c.repo = ?"
+        )
+        params: List[Any] = [owner, repo]
+        if since:
+            query += " AND c.timestamp >= ?"
+            params.append(since)
+        if until:
+            query += " AND c.timestamp <= ?"
+            params.append(until)
+        query += " ORDER BY c.sha"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        spots: Dict[str, Dict[str, Any]] = {}
+        commits: Dict[str, List[Any]] = {}
+        for row in rows:
+            commits.setdefault(row["sha"], [row["author"], row["timestamp"], []])[2].append(
+                (row["path"], row["additions"], row["deletions"], None)
+            )
+        for author, timestamp, files in commits.values():
+            for path, (churn, is_dir) in _touched_paths(files).items():
+                if is_dir != int(directories) or not path.startswith(prefix):
+                    continue
+                spot = spots.setdefault(path, {
+                    "path": path, "churn": 0, "touches": 0, "authors": set(), "last_touched": ""
+                })
+                spot["churn"] += churn
+                spot["touches"] += 1
+                spot["authors"].add(author or "unknown")
+                spot["last_touched"] = max(spot["last_touched"], timestamp or "")
+
+        ranked = sorted(spots.values(), key=lambda spot: (-spot["churn"], spot["path"]))[:k]
+        return [{**spot, "authors": len(spot["authors"]), "last_touched": spot["last_touched"] or None} for spot in ranked]
+
+    def known_shas(self, owner: str, repo: str, shas: Iterable[str]) -> Set[str]:
+        shas = list(shas)
+        known = set()
+        with self._lock:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(shas), 500):
+                chunk = shas[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT sha FROM commits WHERE owner = ? AND repo = ? AND sha IN ({placeholders})",
+                    (owner, repo, *chunk)
+                )
+                known.update(row["sha"] for row in cursor)
+        return known
+
+    def _commit_query(self, owner: str, repo: str, since: Optional[str],
+                      until: Optional[str]) -> Tuple[str, List[Any]]:
+        query = f"SELECT {', '.join(COMMIT_FIELDS)} FROM commits WHERE owner = ? AND repo = ?"
+        params: List[Any] = [owner, repo]
+        if since:
+            query += " AND timestamp >= ?"
+            params.append(since)
+        if until:
+            query += " AND timestamp <= ?"
+            params.append(until)
+        return query + " ORDER BY timestamp DESC", params
+
+    def load_commits(self, owner: str, repo: str, since: Optional[str] = None,
+                     until: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Returns stored commit records (newest first), optionally limited to an
+        ISO-8601 [since, until] window on the commit timestamp.
+        """
+        query, params = self._commit_query(owner, repo, since, until)
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(query, params)]
+
+    def iter_commits(self, owner: str, repo: str, since: Optional[str] = None,
+                     until: Optional[str] = None, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """
+        Streams the same records as load_commits on a dedicated read connection,
+        so memory stays flat however large the window is.
+        """
+        if self.path == ":memory:":
+            yield from self.load_commits(owner, repo, since, until)
+            return
+
+        query, params = self._commit_query(owner, repo, since, until)
+        conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def iter_commit_columns(self, owner: str, repo: str, since: Optional[str] = None,
+                            until: Optional[str] = None, chunk_size: int = 65536) -> Iterator["CommitColumns"]:
+        """
+        Streams the same window as iter_commits, but as CommitColumns batches
+        built straight from row tuples: no per-commit dict is ever created.
+        """
+        from agents.commit_columns import CommitColumns, iter_column_chunks
+
+        if self.path == ":memory:":
+            yield from iter_column_chunks(self.load_commits(owner, repo, since, until), chunk_size)
+            return
+
+        query, params = self._commit_query(owner, repo, since, until)
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(query, params)
+            fields = [column[0] for column in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield CommitColumns.from_rows(rows, fields)
+        finally:
+            conn.close()
+
+    def query_commits(self, owner: str, repo: str, since: Optional[str] = None,
+                      until: Optional[str] = None) -> "CommitQuery":
+        return CommitQuery(self, owner, repo, since, until)
+
+    def iter_commits_after(self, owner: str, repo: str, rowid: int,
+                           batch_size: int = 1000) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Yields (rowid, record) for commits inserted after the given rowid, in insertion order."""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT rowid, {', '.join(COMMIT_FIELDS)} FROM commits "
+                    "WHERE rowid > ? AND owner = ? AND repo = ? ORDER BY rowid LIMIT ?",
+                    (rowid, owner, repo, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                record = dict(row)
+                rowid = record.pop("rowid")
+                yield rowid, record
+
+    # 🧮 Persisted analysis aggregates
+    def load_aggregate(self, owner: str, repo: str, rules_key: str) -> Optional[Tuple[int, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark, state FROM churn_aggregates WHERE owner = ? AND repo = ? AND rules_key = ?",
+                (owner, repo, rules_key)
+            ).fetchone()
+        return (row["watermark"], row["state"]) if row else None
+
+    def save_aggregate(self, owner: str, repo: str, rules_key: str, watermark: int, state: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO churn_aggregates (owner, repo, rules_key, watermark, state) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (owner, repo, rules_key, watermark, state)
+            )
+
+    # 👀 Pull request reviews
+    def upsert_pull_reviews(self, owner: str, repo: str, pull_reviews: Iterable[Dict[str, Any]]) -> int:
+        """
+        Stores PRs with their per-reviewer review counts. A refetched PR
+        replaces its earlier contribution to the weighted review_edges, so
+        edges stay exact however often a PR is updated. Returns the PR count.
+        """
+        pull_reviews = [pr for pr in pull_reviews if pr.get("author")]
+        with self._lock, self._conn:
+            for pr in pull_reviews:
+                number = pr["number"]
+                previous = self._conn.execute(
+                    "SELECT p.author, r.reviewer, r.reviews FROM pull_requests p "
+                    "JOIN pull_reviewers r ON r.owner = p.owner AND r.repo = p.repo AND r.number = p.number "
+                    "WHERE p.owner = ? AND p.repo = ? AND p.number = ?",
+                    (owner, repo, number)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE review_edges SET pulls = pulls - 1, reviews = reviews - ? "
+                    "WHERE owner = ? AND repo = ? AND author = ? AND reviewer = ?",
+                    [(row["reviews"], owner, repo, row["author"], row["reviewer"]) for row in previous]
+                )
+                self._conn.execute(
+                    "DELETE FROM pull_reviewers WHERE owner = ? AND repo = ? AND number = ?",
+                    (owner, repo, number)
+                )
+
+                reviews = pr.get("reviews") or {reviewer: 1 for reviewer in pr.get("reviewers", [])}
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO pull_requests (owner, repo, number, author, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (owner, repo, number, pr["author"], pr.get("updated_at"))
+                )
+                self._conn.executemany(
+                    "INSERT INTO pull_reviewers (owner, repo, number, reviewer, reviews) VALUES (?, ?, ?, ?, ?)",
+                    [(owner, repo, number, reviewer, count) for reviewer, count in reviews.items()]
+                )
+                self._conn.executemany(
+                    "INSERT INTO review_edges (owner, repo, author, reviewer, pulls, reviews) "
+                    "VALUES (?, ?, ?, ?, 1, ?) "
+                    "ON CONFLICT (owner, repo, author, reviewer) DO UPDATE SET "
+                    "pulls = pulls + 1, reviews = reviews + excluded.reviews",
+                    [(owner, repo, pr["author"], reviewer, count) for reviewer, count in reviews.items()]
+                )
+            self._conn.execute(
+                "DELETE FROM review_edges WHERE owner = ? AND repo = ? AND pulls <= 0", (owner, repo)
+            )
+        return len(pull_reviews)
+
+    def review_edges(self, owner: str, repo: str, since: Optional[str] = None) -> List[Tuple[str, str, int, int]]:
+        """
+        Returns (author, reviewer, pulls, reviews) for every review edge. With
+        'since', only PRs updated at or after it are counted.
+        """
+        if since:
+            query = (
+                "SELECT p.author, r.reviewer, COUNT(*), SUM(r.reviews) FROM pull_requests p "
+                "JOIN pull_reviewers r ON r.owner = p.owner AND r.repo = p.repo AND r.number = p.number "
+                "WHERE p.owner = ? AND p.repo = ? AND p.updated_at >= ? GROUP BY p.author, r.reviewer"
+            )
+            params: Tuple[Any, ...] = (owner, repo, since)
+        else:
+            query = "SELECT author, reviewer, pulls, reviews FROM review_edges WHERE owner = ? AND repo = ?"
+            params = (owner, repo)
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute(query, params)]
+
+    def load_layout(self, owner: str, repo: str) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT graph_key, positions FROM review_layouts WHERE owner = ? AND repo = ?",
+                (owner, repo)
+            ).fetchone()
+        return (row["graph_key"], row["positions"]) if row else None
+
+    def save_layout(self, owner: str, repo: str, graph_key: str, positions: str):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO review_layouts (owner, repo, graph_key, positions) VALUES (?, ?, ?, ?)",
+                (owner, repo, graph_key, positions)
+            )
+
+    def get_review_sync_state(self, owner: str, repo: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_updated_at, synced_at FROM review_sync_state WHERE owner = ? AND repo = ?",
+                (owner, repo)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def set_review_sync_state(self, owner: str, repo: str, last_updated_at: Optional[str]):
+        synced_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO review_sync_state (owner, repo, last_updated_at, synced_at) "
+                "VALUES (?, ?, ?, ?)",
+                (owner, repo, last_updated_at, synced_at)
+            )
+
+    # ⏰ Scheduled job runs: one row per job, phase and period, so restarts never repeat a finished run
+    def claim_scheduled_run(self, job_id: str, phase: str, period: str, max_attempts: int = 3,
+                            lease_seconds: float = 3600, backoff_seconds: float = 300) -> bool:
+        """
+        Marks the run as started and returns True, unless it already finished,
+        failed max_attempts times, failed too recently (backoff_seconds,
+        doubling per attempt) or is running under a lease younger than
+        lease_seconds. A run left 'running' by a crash is reclaimed once its
+        lease expires; that counts as an attempt.
+        """
+        now = datetime.now(timezone.utc)
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT status, attempts, started_at, finished_at FROM scheduled_runs "
+                "WHERE job_id = ? AND phase = ? AND period = ?",
+                (job_id, phase, period)
+            ).fetchone()
+            if row:
+                if row["status"] == "done" or row["attempts"] >= max_attempts:
+                    return False
+                if row["status"] == "running" and now < _parse_utc(row["started_at"]) + timedelta(seconds=lease_seconds):
+                    return False
+                if row["status"] == "failed" and now < _parse_utc(row["finished_at"] or row["started_at"]) + \
+                        timedelta(seconds=backoff_seconds * 2 ** (row["attempts"] - 1)):
+                    return False
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scheduled_runs (job_id, phase, period, status, attempts, started_at) "
+                "VALUES (?, ?, ?, 'running', ?, ?)",
+                (job_id, phase, period, (row["attempts"] if row else 0) + 1, now.strftime("%Y-%m-%dT%H:%M:%SZ"))
+            )
+        return True
+
+    def finish_scheduled_run(self, job_id: str, phase: str, period: str, status: str):
+        finished_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE scheduled_runs SET status = ?, finished_at = ? WHERE job_id = ? AND phase = ? AND period = ?",
+                (status, finished_at, job_id, phase, period)
+            )
+
+    # 📎 Slack uploads of artifacts, so an identical chart is linked instead of uploaded again
+    def find_slack_upload(self, artifact: str, channel: str, since: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        query = "SELECT file_id, permalink, uploaded_at FROM slack_uploads WHERE artifact = ? AND channel = ?"
+        params: List[Any] = [artifact, channel]
+        if since:
+            query += " AND uploaded_at >= ?"
+            params.append(since)
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+        return dict(row) if row else None
+
+    def record_slack_upload(self, artifact: str, channel: str, file_id: str, permalink: Optional[str]):
+        uploaded_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO slack_uploads (artifact, channel, file_id, permalink, uploaded_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (artifact, channel, file_id, permalink, uploaded_at)
+            )
+
+    def last_scheduled_run(self, job_id: str, phase: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT period, status, attempts, started_at, finished_at FROM scheduled_runs "
+                "WHERE job_id = ? AND phase = ? ORDER BY period DESC LIMIT 1",
+                (job_id, phase)
+            ).fetchone()
+        return dict(row) if row else None
+
+    # 👤 GitHub logins of commit emails, so the git mirror names authors like the API backends
+    def get_author_logins(self, emails: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Cached login per email; None means no GitHub account uses it, unresolved emails are absent."""
+        emails = list(emails)
+        logins: Dict[str, Optional[str]] = {}
+        with self._lock:
+            for i in range(0, len(emails), 500):
+                chunk = emails[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT email, login FROM author_logins WHERE email IN ({placeholders})", chunk
+                )
+                logins.update((row["email"], row["login"]) for row in cursor)
+        return logins
+
+    def set_author_logins(self, logins: Dict[str, Optional[str]]):
+        resolved_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO author_logins (email, login, resolved_at) VALUES (?, ?, ?)",
+                [(email, login, resolved_at) for email, login in logins.items()]
+            )
+
+    # 🔖 Sync watermark
+    def get_sync_state(self, owner: str, repo: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_sha, last_timestamp, synced_at FROM sync_state WHERE owner = ? AND repo = ?",
+                (owner, repo)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def set_sync_state(self, owner: str, repo: str, last_sha: Optional[str], last_timestamp: Optional[str]):
+        synced_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sync_state (owner, repo, last_sha, last_timestamp, synced_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (owner, repo, last_sha, last_timestamp, synced_at)
+            )
+
+
+class CommitQuery:
+    """
+    Re-iterable view over stored commits: every iteration opens a fresh stream,
+    so it can sit in graph state in place of a materialized list.
+    """
+
+    def __init__(self, store: RepoStore, owner: str, repo: str,
+                 since: Optional[str] = None, until: Optional[str] = None):
+        self.store = store
+        self.owner = owner
+        self.repo = repo
+        self.since = since
+        self.until = until
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.store.iter_commits(self.owner, self.repo, self.since, self.until)
+
+    def iter_columns(self, chunk_size: int = 65536) -> Iterator["CommitColumns"]:
+        return self.store.iter_commit_columns(self.owner, self.repo, self.since, self.until, chunk_size)
+
+
+_store: Optional[RepoStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> RepoStore:
+    """Returns the process-wide RepoStore at REPO_STORE_PATH."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RepoStore()
+    return _store
@@ -0,0 +1,83 @@
+# utils/report_window.py
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+# Reports without an explicit since/until cover the last REPORT_LOOKBACK_WEEKS complete weeks (Monday-Sunday, UTC)
+REPORT_LOOKBACK_WEEKS = int(os.getenv("REPORT_LOOKBACK_WEEKS", "1"))
+# Weekly series behind the forecasts reach this many weeks back, and a repo's first sync starts there
+REPORT_HISTORY_WEEKS = int(os.getenv("REPORT_HISTORY_WEEKS", "12"))
+
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _utc(value: str) -> datetime:
+    # Accepts dates and timestamps, with or without 'Z'
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+
+def _week_start(moment: datetime) -> datetime:
+    return (moment - timedelta(days=moment.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def default_window(now: Optional[datetime] = None, weeks: int = REPORT_LOOKBACK_WEEKS) -> Tuple[str, str]:
+    """(since, until) of the last 'weeks' complete weeks, as the ISO-8601 UTC strings commits are stored with."""
+    this_week = _week_start(now or datetime.now(timezone.utc))
+    since = this_week - timedelta(weeks=weeks)
+    until = this_week - timedelta(seconds=1)
+    return since.strftime(TIMESTAMP_FORMAT), until.strftime(TIMESTAMP_FORMAT)
+
+
+def resolve_window(since: Optional[str] = None, until: Optional[str] = None,
+                   now: Optional[datetime] = None) -> Tuple[str, str]:
+    """
+    Fills whatever is missing: no bounds gives the default window, a lone
+    'since' runs to now, a lone 'until' reaches REPORT_LOOKBACK_WEEKS back.
+    """
+    if since and until:
+        return since, until
+    if not since and not until:
+        return default_window(now)
+    if since:
+        return since, (now or datetime.now(timezone.utc)).strftime(TIMESTAMP_FORMAT)
+    start = _week_start(_utc(until)) - timedelta(weeks=REPORT_LOOKBACK_WEEKS - 1)
+    return start.strftime(TIMESTAMP_FORMAT), until
+
+
+def week_start(value: str) -> str:
+    """Monday (YYYY-MM-DD) of the week a date or timestamp falls in, like the weekly series keys."""
+    return _week_start(_utc(value)).strftime("%Y-%m-%d")
+
+
+def is_week_aligned(since: Optional[str], until: Optional[str]) -> bool:
+    """True when since opens a week and until closes one (a missing bound counts as aligned)."""
+    if since and _utc(since) != _week_start(_utc(since)):
+        return False
+    if until:
+        after = _utc(until) + timedelta(seconds=1)
+        if after != _week_start(after):
+            return False
+    return True
+
+
+def previous_week_end(value: str) -> str:
+    """Last second of the week before the one 'value' falls in."""
+    return (_week_start(_utc(value)) - timedelta(seconds=1)).strftime(TIMESTAMP_FORMAT)
+
+
+def history_start(since: str, weeks: int = REPORT_HISTORY_WEEKS) -> str:
+    """Start of the weekly history behind a window beginning at 'since'."""
+    return (_week_start(_utc(since)) - timedelta(weeks=weeks)).strftime(TIMESTAMP_FORMAT)
+
+
+def sync_floor(now: Optional[datetime] = None) -> str:
+    """Where a repo's first sync starts by default: the history behind the default window."""
+    return history_start(default_window(now)[0])
+
+
+def window_label(since: str, until: str) -> str:
+    """'Week of 2025-06-23' for a single week, otherwise '2025-06-02 to 2025-06-29'."""
+    if _utc(until) - _utc(since) < timedelta(weeks=1):
+        return f"Week of {since[:10]}"
+    return f"{since[:10]} to {until[:10]}"
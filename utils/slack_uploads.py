@@ -0,0 +1,55 @@
+# utils/slack_uploads.py
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from utils.artifacts import get_artifact, handle_key
+from utils.metrics import count
+from utils.repo_store import RepoStore, get_store
+
+# An identical chart posted to the same channel within this window links the earlier upload instead
+SLACK_UPLOAD_REUSE_HOURS = float(os.getenv("SLACK_UPLOAD_REUSE_HOURS", "168"))
+
+
+def upload_artifact(client, channel: str, handle: str, title: str, initial_comment: str,
+                    filename: str = "churn_chart.png", store: Optional[RepoStore] = None) -> str:
+    """
+    Posts an artifact to a Slack channel straight from memory and returns the
+    Slack file id. When the same bytes were uploaded to that channel within
+    SLACK_UPLOAD_REUSE_HOURS, the comment is posted with a link to that file
+    instead of uploading a duplicate. Slack errors propagate to the caller.
+    """
+    store = store or get_store()
+    key = handle_key(handle)
+
+    since = (datetime.now(timezone.utc) - timedelta(hours=SLACK_UPLOAD_REUSE_HOURS)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    previous = store.find_slack_upload(key, channel, since=since)
+    if previous and previous["permalink"]:
+        client.chat_postMessage(
+            channel=channel,
+            text=f"{initial_comment}\n\n📎 {title}: chart unchanged since {previous['uploaded_at'][:10]} - {previous['permalink']}"
+        )
+        count("slack_upload_dedup_hits")
+        print(f"♻️ Linked existing Slack file {previous['file_id']} for {title}")
+        return previous["file_id"]
+
+    # Name carries the content hash, so concurrent reports never collide on a filename
+    stem, extension = os.path.splitext(filename)
+    response = client.files_upload_v2(
+        channel=channel,
+        file=get_artifact(handle),
+        filename=f"{stem}-{key[:12]}{extension}",
+        title=title,
+        initial_comment=initial_comment
+    )
+    uploaded = response["file"]
+    # files_upload_v2 only returns the id and title; the permalink needs a files.info call
+    permalink = uploaded.get("permalink")
+    if not permalink:
+        try:
+            permalink = client.files_info(file=uploaded["id"])["file"].get("permalink")
+        except Exception as e:
+            print(f"⚠️ Could not look up the permalink of Slack file {uploaded['id']}: {e}")
+    store.record_slack_upload(key, channel, uploaded["id"], permalink)
+    count("slack_uploads")
+    return uploaded["id"]
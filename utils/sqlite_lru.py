@@ -0,0 +1,85 @@
+# utils/sqlite_lru.py
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+def connect(path: str, schema: str) -> sqlite3.Connection:
+    """
+    Opens a connection shareable across threads (callers guard it with a
+    lock) in WAL mode and applies schema. A file path's directory is created
+    first; ':memory:' gives a private in-memory database.
+    """
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(schema)
+    return conn
+
+
+class SqliteLru:
+    """
+    Base for the on-disk caches: one table whose rows carry a 'size' and a
+    'last_access' column, with least-recently-used rows evicted once the
+    sizes add up to more than max_bytes. Subclasses set SCHEMA, TABLE and
+    KEY (the primary-key columns) and count their own hits and misses.
+    """
+
+    SCHEMA = ""
+    TABLE = ""
+    KEY: Tuple[str, ...] = ()
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = connect(path, self.SCHEMA)
+        self._match = " AND ".join(f"{column} = ?" for column in self.KEY)
+        with self._lock:
+            self._size = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.TABLE}").fetchone()[0]
+
+    # Callers hold self._lock and a transaction around the helpers below
+    def _fetch(self, key: Sequence[Any], columns: str) -> Optional[sqlite3.Row]:
+        return self._conn.execute(f"SELECT {columns} FROM {self.TABLE} WHERE {self._match}", tuple(key)).fetchone()
+
+    def _touch(self, key: Sequence[Any]):
+        self._conn.execute(f"UPDATE {self.TABLE} SET last_access = ? WHERE {self._match}", (time.time(), *key))
+
+    def _delete(self, key: Sequence[Any], size: int):
+        self._conn.execute(f"DELETE FROM {self.TABLE} WHERE {self._match}", tuple(key))
+        self._size -= size
+
+    def _put_row(self, row: Dict[str, Any]):
+        """Inserts or replaces a row ('size' included, 'last_access' set to now), then evicts."""
+        key = tuple(row[column] for column in self.KEY)
+        previous = self._fetch(key, "size")
+        row = {**row, "last_access": time.time()}
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(row)}) VALUES ({', '.join('?' for _ in row)})",
+            tuple(row.values())
+        )
+        self._size += row["size"] - (previous["size"] if previous else 0)
+        self._evict()
+
+    def _evict(self):
+        if self._size <= self.max_bytes:
+            return
+        cursor = self._conn.execute(f"SELECT {', '.join(self.KEY)}, size FROM {self.TABLE} ORDER BY last_access ASC")
+        stale = []
+        for row in cursor:
+            if self._size <= self.max_bytes:
+                break
+            stale.append(tuple(row[column] for column in self.KEY))
+            self._size -= row["size"]
+        self._conn.executemany(f"DELETE FROM {self.TABLE} WHERE {self._match}", stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = self._conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()[0]
+            return {"hits": self.hits, "misses": self.misses, "entries": entries, "bytes": self._size}